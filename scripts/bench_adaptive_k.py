@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark - k fixo vs k adaptativo
+
+Compara o tamanho do prompt (caracteres e tokens estimados) e a taxa de acerto
+das fontes esperadas no conjunto de perguntas de data/benchmarks.
+
+Uso:
+    python3 scripts/bench_adaptive_k.py [--k 3] [--json]
+"""
+
+import argparse
+import json
+
+from bench_utils import hit, load_questions, open_vector_store, DEFAULT_QUESTIONS
+
+from config import settings
+from embeddings import EmbeddingService
+from llm_service import build_context, build_prompt, estimate_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de k adaptativo")
+    parser.add_argument("--k", type=int, default=3, help="k fixo de referência")
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    embeddings = EmbeddingService().get_embeddings()
+    store = open_vector_store(embeddings, settings.KNOWLEDGE_BASE_PATH, settings.VECTOR_STORE_PATH)
+    questions = load_questions(args.questions)
+    
+    rows = []
+    for item in questions:
+        question = item["question"]
+        
+        fixed = store.similarity_search(question, k=args.k)
+        results, info = store.adaptive_search(
+            question,
+            min_k=settings.ADAPTIVE_MIN_K,
+            max_k=settings.ADAPTIVE_MAX_K,
+            fetch_k=settings.ADAPTIVE_FETCH_K,
+            score_threshold=settings.ADAPTIVE_SCORE_THRESHOLD,
+            min_gap=settings.ADAPTIVE_MIN_GAP
+        )
+        adaptive = [doc for doc, _ in results]
+        
+        fixed_tokens = estimate_tokens(build_prompt(question, build_context(fixed)[0]))
+        adaptive_tokens = estimate_tokens(build_prompt(question, build_context(adaptive)[0]))
+        
+        rows.append({
+            "question": question,
+            "k": info["k"],
+            "cutoff_reason": info["cutoff_reason"],
+            "fixed_tokens": fixed_tokens,
+            "adaptive_tokens": adaptive_tokens,
+            "fixed_hit": hit(fixed, item.get("expected_files", [])),
+            "adaptive_hit": hit(adaptive, item.get("expected_files", [])),
+        })
+    
+    n = len(rows)
+    fixed_total = sum(r["fixed_tokens"] for r in rows)
+    adaptive_total = sum(r["adaptive_tokens"] for r in rows)
+    summary = {
+        "questions": n,
+        "fixed_k": args.k,
+        "avg_adaptive_k": round(sum(r["k"] for r in rows) / n, 2),
+        "avg_fixed_tokens": round(fixed_total / n, 1),
+        "avg_adaptive_tokens": round(adaptive_total / n, 1),
+        "prompt_reduction_pct": round(100 * (1 - adaptive_total / fixed_total), 1),
+        "fixed_hit_rate": round(sum(r["fixed_hit"] for r in rows) / n, 3),
+        "adaptive_hit_rate": round(sum(r["adaptive_hit"] for r in rows) / n, 3),
+    }
+    
+    if args.json:
+        print(json.dumps({"summary": summary, "questions": rows}, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"\n{'Pergunta':<55} {'k':>3} {'motivo':<16} {'fixo':>6} {'adapt':>6}")
+    print("-" * 92)
+    for r in rows:
+        print(f"{r['question'][:55]:<55} {r['k']:>3} {r['cutoff_reason']:<16} "
+              f"{r['fixed_tokens']:>6} {r['adaptive_tokens']:>6}")
+    
+    print("\n📊 Resumo")
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Parâmetros do índice HNSW do Chroma (recall x latência)
+
+Para cada configuração (M, construction_ef, search_ef) constrói uma coleção
+do Chroma sobre o mesmo corpus, com a métrica `--space`, e compara as
+respostas com a busca exata em NumPy (ground truth). Reporta recall@k,
+latência p50/p99 da query, tempo de build e memória (RSS acrescida pelo build).
+
+Corpus:
+    --store data/chroma_db   embeddings reais da coleção existente
+    --sizes 20000 100000     embeddings sintéticos (clusters, como bench_vector_compression)
+As queries são vetores separados do corpus (holdout) no caso real.
+
+Uso:
+    python3 scripts/bench_ann_index.py [--sizes 20000] [--store data/chroma_db] [--space l2] [--json]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_utils import ROOT_DIR, percentile
+from bench_vector_compression import synthetic_embeddings
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from vector_store import hnsw_metadata
+
+# (M, construction_ef, search_ef); a primeira é o padrão do Chroma
+CONFIGS = [
+    (16, 100, 10),
+    (16, 100, 50),
+    (16, 200, 100),
+    (32, 200, 100),
+    (8, 64, 10),
+]
+ADD_BATCH = 5000
+
+
+def rss_bytes() -> int:
+    """Memória residente do processo (Linux); 0 se indisponível"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def store_embeddings(path, n_queries: int, seed: int = 0):
+    """Embeddings da coleção existente; parte vira query (e sai do corpus)"""
+    client = chromadb.PersistentClient(path=str(path), settings=ChromaSettings(anonymized_telemetry=False))
+    collection = client.list_collections()[0]
+    vectors = np.asarray(collection.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    held_out = rng.choice(len(vectors), size=min(n_queries, len(vectors) // 10), replace=False)
+    mask = np.ones(len(vectors), dtype=bool)
+    mask[held_out] = False
+    return vectors[mask], vectors[held_out]
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> list:
+    """Top-k exato na métrica do índice (em blocos de queries)"""
+    if space == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+    truth = []
+    for start in range(0, len(queries), 64):
+        block = queries[start:start + 64]
+        dots = block @ vectors.T
+        scores = -dots if space == "ip" else sq_norms[None, :] - 2 * dots
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        truth.extend(set(row.tolist()) for row in top)
+    return truth
+
+
+def run_config(vectors, queries, truth, k: int, space: str, config) -> dict:
+    m, construction_ef, search_ef = config
+    with tempfile.TemporaryDirectory() as directory:
+        client = chromadb.PersistentClient(path=directory, settings=ChromaSettings(anonymized_telemetry=False))
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        collection = client.create_collection(
+            "bench", metadata=hnsw_metadata(space=space, m=m, construction_ef=construction_ef, search_ef=search_ef)
+        )
+        for offset in range(0, len(vectors), ADD_BATCH):
+            batch = vectors[offset:offset + ADD_BATCH]
+            collection.add(ids=[str(i) for i in range(offset, offset + len(batch))], embeddings=batch.tolist())
+        # Primeira query carrega o índice; fica fora das latências
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=k, include=[])
+        build_s = time.perf_counter() - start
+        rss_mb = (rss_bytes() - rss_before) / 1e6
+        
+        latencies, hits = [], 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(expected & {int(i) for i in result["ids"][0]})
+    
+    return {
+        "M": m, "construction_ef": construction_ef, "search_ef": search_ef,
+        "recall": round(hits / (k * len(queries)), 4),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "build_s": round(build_s, 2),
+        "rss_mb": round(rss_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos parâmetros HNSW")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[20_000], help="Corpora sintéticos")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--store", default=None, help="Vector store existente (ex.: data/chroma_db)")
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], default="l2")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    corpora = []
+    if args.store:
+        store = ROOT_DIR / args.store
+        corpora.append((f"store:{args.store}", *store_embeddings(store, args.queries)))
+    for size in args.sizes:
+        corpora.append((f"sintético {size:,}", *synthetic_embeddings(size, args.dim, args.queries)))
+    
+    report = []
+    for name, vectors, queries in corpora:
+        k = min(args.k, len(vectors))
+        truth = exact_neighbors(vectors, queries, k, args.space)
+        results = [run_config(vectors, queries, truth, k, args.space, config) for config in CONFIGS]
+        report.append({"corpus": name, "vectors": len(vectors), "dim": int(vectors.shape[1]), "results": results})
+    
+    if args.json:
+        print(json.dumps({"space": args.space, "k": args.k, "corpora": report}, indent=2))
+        return
+    
+    for corpus in report:
+        print(f"\n🧭 HNSW benchmark — {corpus['corpus']} ({corpus['vectors']:,} × {corpus['dim']}, "
+              f"space={args.space}, k={args.k})")
+        print("=" * 74)
+        print(f"{'M':>4} {'constr_ef':>10} {'search_ef':>10} {'recall':>8} {'p50':>9} {'p99':>9} "
+              f"{'build':>8} {'RSS +':>9}")
+        for r in corpus["results"]:
+            print(f"{r['M']:>4} {r['construction_ef']:>10} {r['search_ef']:>10} {r['recall']:>8.3f} "
+                  f"{r['p50_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms {r['build_s']:>7.1f}s {r['rss_mb']:>6.1f} MB")
+        print("=" * 74)
+
+
+if __name__ == "__main__":
+    main()
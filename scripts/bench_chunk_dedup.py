@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Dedup de chunks antes do embedding (chunk_dedup)
+
+Roda o ChunkDeduplicator sobre os chunks da KB e sobre um corpus sintético
+com sobreposição pesada (parágrafos da KB repetidos entre documentos, parte
+deles com pequenas edições). Reporta chamadas de embedding economizadas,
+redução do índice, tempo e a similaridade de Jaccard real (shingles) entre
+cada duplicata descartada e o seu canônico, para conferir o limiar.
+
+Uso:
+    python3 scripts/bench_chunk_dedup.py [--docs 2000] [--threshold 0.9] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bench_text_splitter import synthetic_corpus
+from bench_utils import ROOT_DIR
+
+from chunk_dedup import ChunkDeduplicator, MinHasher, _words
+from document_loader import KnowledgeBaseLoader
+from text_splitter import DocumentSplitter
+
+
+def perturb(paragraphs, fraction: float, seed: int = 7):
+    """Cópias com uma palavra trocada, simulando versões levemente editadas"""
+    rng = random.Random(seed)
+    edited = []
+    for p in rng.sample(paragraphs, int(len(paragraphs) * fraction)):
+        words = p.split(" ")
+        if len(words) > 20:
+            words[rng.randrange(len(words))] = "alterado"
+            edited.append(" ".join(words))
+    return paragraphs + edited
+
+
+def run(chunks, threshold: float) -> dict:
+    dedup = ChunkDeduplicator(threshold=threshold, record_pairs=True)
+    texts = [c.page_content for c in chunks]
+    start = time.perf_counter()
+    kept = dedup.filter(chunks)
+    elapsed = time.perf_counter() - start
+    
+    # Jaccard real entre duplicata e canônico (auditoria do MinHash)
+    hasher = MinHasher()
+    kept_texts = [c.page_content for c in kept]
+    similarities = []
+    for position, text in dedup.pairs:
+        a = set(hasher.shingles(_words(kept_texts[position])).tolist())
+        b = set(hasher.shingles(_words(text)).tolist())
+        similarities.append(len(a & b) / len(a | b))
+    
+    report = dedup.report(embedding_dim=768)
+    report["seconds"] = round(elapsed, 3)
+    report["chunks_per_s"] = round(len(texts) / elapsed, 1)
+    report["min_true_jaccard"] = round(min(similarities), 3) if similarities else None
+    report["below_threshold"] = sum(s < threshold for s in similarities)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do dedup de chunks")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    kb_docs = KnowledgeBaseLoader(ROOT_DIR / "data" / "knowledge_base").load_documents()
+    splitter = DocumentSplitter()
+    
+    paragraphs = [p for doc in kb_docs for p in doc.page_content.split("\n\n") if p.strip()]
+    corpus = synthetic_corpus(perturb(paragraphs, 0.3), args.docs)
+    
+    results = {
+        "kb": run(splitter.split_documents(kb_docs), args.threshold),
+        "synthetic": run(splitter.split_documents(corpus), args.threshold),
+    }
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"\n🧹 Chunk dedup benchmark (threshold={args.threshold})")
+    print("=" * 84)
+    print(f"{'corpus':<10} {'chunks':>8} {'mantidos':>9} {'exatos':>7} {'quase':>6} {'embeddings -':>13} "
+          f"{'índice':>7} {'chunks/s':>9} {'Jaccard mín':>12}")
+    for name, r in results.items():
+        jaccard = f"{r['min_true_jaccard']:.2f}" if r["min_true_jaccard"] is not None else "-"
+        print(f"{name:<10} {r['chunks_in']:>8,} {r['kept']:>9,} {r['exact_duplicates']:>7,} "
+              f"{r['near_duplicates']:>6,} {r['embedding_calls_saved']:>13,} "
+              f"{-r['index_reduction_pct']:>6.1f}% {r['chunks_per_s']:>9,.0f} {jaccard:>12}")
+    print("=" * 84)
+    below = sum(r["below_threshold"] for r in results.values())
+    print(f"Duplicatas com Jaccard real abaixo do limiar: {below}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Varredura de CHUNK_SIZE x CHUNK_OVERLAP (x RETRIEVAL_K)
+
+Para cada combinação da grade, divide a KB, constrói um vector store
+temporário com o embedder local determinístico (HashingEmbeddings, sem rede)
+e roda o conjunto de perguntas de data/benchmarks. Reporta número de chunks,
+tamanho do índice em disco, tempo de build, latência da busca, tokens de
+prompt por resposta e taxa de acerto das fontes esperadas.
+
+Os números absolutos de acerto são os de um embedder lexical; servem para
+comparar as combinações entre si, não com o Gemini.
+
+Uso:
+    python3 scripts/bench_chunking_sweep.py [--sizes 250 500 1000] [--overlaps 0 50 100] [--k 3] [--json]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import DEFAULT_QUESTIONS, hit, load_questions, percentile
+
+from config import settings
+from document_loader import KnowledgeBaseLoader
+from llm_service import build_context, build_prompt, estimate_tokens
+from local_embeddings import HashingEmbeddings
+from text_splitter import DocumentSplitter
+from vector_store import VectorStoreService
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def run(documents, questions, embeddings, chunk_size: int, overlap: int, ks) -> list:
+    chunks = DocumentSplitter(chunk_size=chunk_size, chunk_overlap=overlap).split_documents(documents)
+    with tempfile.TemporaryDirectory() as directory:
+        service = VectorStoreService(directory)
+        start = time.perf_counter()
+        service.create_vectorstore(chunks, embeddings)
+        build_s = time.perf_counter() - start
+        index_mb = directory_size(Path(directory)) / 1e6
+        
+        rows = []
+        for k in ks:
+            latencies, tokens, hits = [], [], 0
+            for item in questions:
+                start = time.perf_counter()
+                found = service.similarity_search(item["question"], k=k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                tokens.append(estimate_tokens(build_prompt(item["question"], build_context(found)[0])))
+                hits += hit(found, item.get("expected_files", []))
+            rows.append({
+                "chunk_size": chunk_size,
+                "overlap": overlap,
+                "k": k,
+                "chunks": len(chunks),
+                "index_mb": round(index_mb, 2),
+                "build_s": round(build_s, 2),
+                "search_p50_ms": round(percentile(latencies, 50), 2),
+                "prompt_tokens": round(sum(tokens) / len(tokens), 1),
+                "hit_rate": round(hits / len(questions), 3),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros de chunking")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 50, 100])
+    parser.add_argument("--k", type=int, nargs="+", default=[settings.RETRIEVAL_K])
+    parser.add_argument("--dim", type=int, default=384, help="Dimensão do embedder local")
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    documents = KnowledgeBaseLoader(settings.KNOWLEDGE_BASE_PATH).load_documents()
+    questions = load_questions(args.questions)
+    embeddings = HashingEmbeddings(dim=args.dim)
+    
+    results = []
+    for chunk_size in args.sizes:
+        for overlap in args.overlaps:
+            if overlap >= chunk_size:
+                continue
+            results.extend(run(documents, questions, embeddings, chunk_size, overlap, args.k))
+    
+    if args.json:
+        print(json.dumps({"embedder": embeddings.version, "questions": len(questions), "results": results},
+                         indent=2))
+        return
+    
+    current = (settings.CHUNK_SIZE, settings.CHUNK_OVERLAP, settings.RETRIEVAL_K)
+    print(f"\n📐 Chunking sweep ({len(questions)} perguntas, embedder {embeddings.version}, "
+          f"atual: size={current[0]} overlap={current[1]} k={current[2]})")
+    print("=" * 86)
+    print(f"{'size':>5} {'overlap':>8} {'k':>3} {'chunks':>7} {'índice':>9} {'build':>7} "
+          f"{'busca p50':>10} {'tokens/prompt':>14} {'acerto':>8}")
+    for r in results:
+        marker = " ◄" if (r["chunk_size"], r["overlap"], r["k"]) == current else ""
+        print(f"{r['chunk_size']:>5} {r['overlap']:>8} {r['k']:>3} {r['chunks']:>7,} {r['index_mb']:>6.2f} MB "
+              f"{r['build_s']:>6.2f}s {r['search_p50_ms']:>8.2f}ms {r['prompt_tokens']:>14.0f} "
+              f"{r['hit_rate']:>7.0%}{marker}")
+    print("=" * 86)
+    print("Para aplicar: CHUNK_SIZE, CHUNK_OVERLAP e RETRIEVAL_K no .env e reconstruir o índice.")
+
+
+if __name__ == "__main__":
+    main()
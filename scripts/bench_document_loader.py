@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Carregamento da knowledge base (KnowledgeBaseLoader)
+
+Compara o loader antigo (rglob serial, lista completa em memória) com
+iter_documents (leitura paralela em streaming) num corpus sintético:
+tempo total, tempo até o primeiro documento e pico de memória (tracemalloc).
+Também confere que os dois produzem os mesmos documentos.
+
+Uso:
+    python3 scripts/bench_document_loader.py [--files 100000] [--workers 8] [--json]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench_utils import ROOT_DIR  # noqa: F401  (coloca src/ no sys.path)
+
+from document_loader import KnowledgeBaseLoader
+from langchain_core.documents import Document
+
+CATEGORIES = ["conceitos", "estatisticas", "papers", "wikipedia"]
+
+
+def write_corpus(root: Path, n_files: int, seed: int = 42):
+    """Arquivos .txt no formato da KB (linha Source: + texto), ~1-3 KB cada"""
+    rng = random.Random(seed)
+    words = "nhanes imc peso altura média mediana regressão obesidade prevalência adultos amostra".split()
+    for i in range(n_files):
+        folder = root / CATEGORIES[i % len(CATEGORIES)] / f"lote_{i // 1000:03d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        body = "\n\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+                           for _ in range(rng.randint(2, 4)))
+        header = f"Source: https://example.org/doc/{i}\n" if i % 3 else ""
+        (folder / f"doc_{i:06d}.txt").write_text(f"{header}# Documento {i}\n\n{body}\n", encoding="utf-8")
+
+
+def legacy_load(kb_path: Path):
+    """Loader original: rglob serial, leitura completa e split por linhas"""
+    documents = []
+    for txt_file in kb_path.rglob("*.txt"):
+        content = txt_file.read_text(encoding='utf-8')
+        lines = content.split('\n')
+        source = txt_file.name
+        if lines[0].startswith('Source:'):
+            source = lines[0].replace('Source:', '').strip()
+        documents.append(Document(
+            page_content=content,
+            metadata={"source": source, "file": str(txt_file), "category": txt_file.parent.name}
+        ))
+    return documents
+
+
+def measure(consume):
+    """(segundos, segundos até o 1º documento, pico MB, documentos)"""
+    # Tempo sem tracemalloc (ele deixa as alocações bem mais lentas)
+    start = time.perf_counter()
+    first, count, docs = consume()
+    elapsed = time.perf_counter() - start
+    first_doc = (first - start) if first else elapsed
+    
+    tracemalloc.start()
+    consume()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, first_doc, peak, count, docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do KnowledgeBaseLoader")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--prefetch", type=int, default=64)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "kb"
+        print(f"⏳ Writing {args.files:,} files...")
+        write_corpus(root, args.files)
+        
+        def run_legacy():
+            docs = legacy_load(root)
+            # O loader antigo só entrega algo quando termina de ler tudo
+            return time.perf_counter(), len(docs), {(d.metadata["file"], d.page_content, d.metadata["source"]) for d in docs}
+        
+        def run_streaming():
+            loader = KnowledgeBaseLoader(root)
+            first, count, digest = None, 0, set()
+            for doc in loader.iter_documents(workers=args.workers, prefetch=args.prefetch):
+                if first is None:
+                    first = time.perf_counter()
+                count += 1
+                # Consumidor típico: processa e descarta (split/embedding)
+                digest.add((doc.metadata["file"], hash(doc.page_content), doc.metadata["source"]))
+            return first, count, digest
+        
+        legacy = measure(run_legacy)
+        streaming = measure(run_streaming)
+    
+    legacy_set = {(f, hash(c), s) for f, c, s in legacy[4]}
+    same = legacy_set == streaming[4]
+    
+    results = {
+        "files": args.files,
+        "identical_documents": same,
+        "legacy": {"seconds": round(legacy[0], 2), "first_doc_s": round(legacy[1], 3),
+                   "peak_mb": round(legacy[2], 1), "documents": legacy[3]},
+        "streaming": {"seconds": round(streaming[0], 2), "first_doc_s": round(streaming[1], 4),
+                      "peak_mb": round(streaming[2], 1), "documents": streaming[3],
+                      "workers": args.workers, "prefetch": args.prefetch},
+    }
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"\n📂 Document loader benchmark ({args.files:,} files)")
+    print("=" * 62)
+    print(f"{'loader':<12} {'tempo':>9} {'1º doc':>10} {'pico mem':>11} {'docs':>9}")
+    for name in ("legacy", "streaming"):
+        r = results[name]
+        print(f"{name:<12} {r['seconds']:>8.2f}s {r['first_doc_s']:>9.3f}s {r['peak_mb']:>8.1f} MB {r['documents']:>9,}")
+    print("=" * 62)
+    print(f"Mesmos documentos: {'✅' if same else '❌'}  (pico do legacy inclui a lista completa)")
+
+
+if __name__ == "__main__":
+    main()
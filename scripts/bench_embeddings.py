@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Latência de embedding de query por backend (local x Gemini)
+
+Embeda as perguntas de data/benchmarks com cada backend e reporta p50/p95
+por query e chunks/s em embed_documents sobre os chunks da KB. O backend
+"gemini" precisa de GEMINI_API_KEY (e de rede, ou do stand-in local); sem
+a chave ele é pulado.
+
+Uso:
+    python3 scripts/bench_embeddings.py [--backends local gemini] [--documents 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from bench_utils import DEFAULT_QUESTIONS, ROOT_DIR, load_questions, percentile
+
+from document_loader import KnowledgeBaseLoader
+from embeddings import EmbeddingService
+from text_splitter import DocumentSplitter
+
+
+def measure(embeddings, questions, texts, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        for question in questions:
+            start = time.perf_counter()
+            embeddings.embed_query(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    documents_s = time.perf_counter() - start
+    
+    return {
+        "version": embeddings.version,
+        "dim": len(vectors[0]) if vectors else 0,
+        "query_p50_ms": round(percentile(latencies, 50), 3),
+        "query_p95_ms": round(percentile(latencies, 95), 3),
+        "documents_per_s": round(len(texts) / documents_s, 1) if documents_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de embedding")
+    parser.add_argument("--backends", nargs="+", default=["local", "gemini"])
+    parser.add_argument("--documents", type=int, default=200, help="Chunks embedados em lote")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições das perguntas (só backend local)")
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    questions = [item["question"] for item in load_questions(args.questions)]
+    documents = KnowledgeBaseLoader(ROOT_DIR / "data" / "knowledge_base").load_documents()
+    texts = [c.page_content for c in DocumentSplitter().split_documents(documents)][:args.documents]
+    
+    results = {}
+    for backend in args.backends:
+        if backend == "gemini" and not os.getenv("GEMINI_API_KEY"):
+            results[backend] = {"skipped": "GEMINI_API_KEY não configurada"}
+            continue
+        embeddings = EmbeddingService(backend=backend).get_embeddings()
+        # Cada chamada remota custa quota: sem repetições
+        results[backend] = measure(embeddings, questions, texts, args.repeat if backend == "local" else 1)
+    
+    if args.json:
+        print(json.dumps({"questions": len(questions), "documents": len(texts), "results": results}, indent=2))
+        return
+    
+    print(f"\n🔢 Embedding backends ({len(questions)} perguntas, {len(texts)} chunks)")
+    print("=" * 78)
+    print(f"{'backend':<8} {'versão':<28} {'dim':>5} {'query p50':>11} {'query p95':>11} {'chunks/s':>10}")
+    for backend, r in results.items():
+        if "skipped" in r:
+            print(f"{backend:<8} (pulado: {r['skipped']})")
+            continue
+        print(f"{backend:<8} {r['version']:<28} {r['dim']:>5} {r['query_p50_ms']:>9.3f}ms "
+              f"{r['query_p95_ms']:>9.3f}ms {r['documents_per_s']:>10,.0f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Busca filtrada por categoria (listas de linhas pré-computadas)
+
+Corpus sintético com categorias de tamanhos bem diferentes (metade, um quarto,
+...). Para cada categoria compara a busca filtrada (pontua só as linhas da
+categoria, via MetadataFilter) com a alternativa de filtrar depois da busca:
+quantos dos top-k sem filtro sobram na categoria. A latência filtrada deve
+acompanhar o tamanho do subconjunto.
+
+Com --chroma mede também o caminho padrão (sem índice em memória): a mesma
+busca com `where={"category": ...}` numa coleção do Chroma, com latência e
+recall@k contra a busca exata filtrada. O build da coleção é lento; use
+--vectors 20000 ou menos.
+
+Uso:
+    python3 scripts/bench_filtered_search.py [--vectors 200000] [--dim 384] [--chroma] [--json]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from bench_utils import percentile
+from bench_vector_compression import synthetic_embeddings
+
+from vector_index import MetadataFilter, VectorIndex
+
+ADD_BATCH = 5000  # abaixo do lote máximo do Chroma
+
+# Fração do corpus em cada categoria
+CATEGORY_SHARES = {"wikipedia": 0.5, "papers": 0.25, "conceitos": 0.2, "estatisticas": 0.05}
+
+
+def chroma_filtered(vectors, metadatas, queries, k: int, categories, exact) -> dict:
+    """p50 e recall@k da busca do Chroma por categoria (None = sem filtro), contra `exact`"""
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        client = chromadb.PersistentClient(path=directory, settings=ChromaSettings(anonymized_telemetry=False))
+        collection = client.create_collection("bench")
+        for offset in range(0, len(vectors), ADD_BATCH):
+            end = min(offset + ADD_BATCH, len(vectors))
+            collection.add(ids=[str(i) for i in range(offset, end)], embeddings=vectors[offset:end].tolist(),
+                           metadatas=metadatas[offset:end])
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=k, include=[])
+        
+        for name in categories:
+            where = {"category": name} if name else None
+            latencies, hits = [], 0
+            for query, expected in zip(queries, exact[name]):
+                start = time.perf_counter()
+                found = collection.query(query_embeddings=[query.tolist()], n_results=k, where=where, include=[])
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len(set(expected.tolist()) & {int(i) for i in found["ids"][0]})
+            results[name] = {"chroma_p50_ms": round(percentile(latencies, 50), 2),
+                             "chroma_recall": round(hits / (k * len(queries)), 3)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca filtrada")
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--chroma", action="store_true", help="Medir também o `where` do Chroma (caminho padrão)")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    vectors, queries = synthetic_embeddings(args.vectors, args.dim, args.queries)
+    rng = np.random.default_rng(1)
+    names = list(CATEGORY_SHARES)
+    labels = rng.choice(len(names), size=len(vectors), p=list(CATEGORY_SHARES.values()))
+    metadatas = [{"category": names[label], "source": f"doc_{i // 50}"} for i, label in enumerate(labels)]
+    index = VectorIndex.build(vectors, [str(i) for i in range(len(vectors))], [""] * len(vectors), metadatas)
+    
+    start = time.perf_counter()
+    filters = MetadataFilter(metadatas)
+    filter_build_s = time.perf_counter() - start
+    
+    def timed(search):
+        latencies, found = [], []
+        for q in queries:
+            start = time.perf_counter()
+            rows, _ = search(q)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(rows)
+        return latencies, found
+    
+    flat_latencies, flat_found = timed(lambda q: index.search(q, k=args.k))
+    results = [{"category": "(sem filtro)", "rows": len(vectors), "p50_ms": round(percentile(flat_latencies, 50), 2),
+                "post_filter_kept": float(args.k)}]
+    exact = {None: flat_found}  # float32 sem compactação: busca exata
+    
+    for name in names:
+        rows = filters.rows(category=name)
+        latencies, found = timed(lambda q: index.search(q, k=args.k, rows=rows))
+        exact[name] = found
+        assert all(metadatas[row]["category"] == name for hits in found for row in hits)
+        # Filtrar depois: quantos dos top-k sem filtro seriam aproveitados
+        kept = np.mean([sum(metadatas[row]["category"] == name for row in hits) for hits in flat_found])
+        results.append({"category": name, "rows": int(len(rows)), "p50_ms": round(percentile(latencies, 50), 2),
+                        "post_filter_kept": round(float(kept), 2)})
+    
+    if args.chroma:
+        chroma = chroma_filtered(vectors, metadatas, queries, args.k, [None] + names, exact)
+        for result, name in zip(results, [None] + names):
+            result.update(chroma[name])
+    
+    if args.json:
+        print(json.dumps({"vectors": len(vectors), "dim": args.dim, "k": args.k,
+                          "filter_build_s": round(filter_build_s, 3), "results": results}, indent=2))
+        return
+    
+    print(f"\n🔎 Filtered search benchmark ({len(vectors):,} × {args.dim}, k={args.k}, "
+          f"filtros em {filter_build_s:.2f}s)")
+    width = 100 if args.chroma else 72
+    print("=" * width)
+    chroma_header = f" {'Chroma where':>13} {'recall':>7}" if args.chroma else ""
+    print(f"{'categoria':<14} {'linhas':>9} {'p50':>9} {'vs. sem filtro':>15} {'top-k pós-filtro':>17}{chroma_header}")
+    base = results[0]["p50_ms"]
+    for r in results:
+        chroma_cells = f" {r['chroma_p50_ms']:>11.2f}ms {r['chroma_recall']:>7.3f}" if args.chroma else ""
+        print(f"{r['category']:<14} {r['rows']:>9,} {r['p50_ms']:>7.2f}ms {r['p50_ms'] / base:>14.2f}x "
+              f"{r['post_filter_kept']:>11.1f}/{args.k}{chroma_cells}")
+    print("=" * width)
+
+
+if __name__ == "__main__":
+    main()
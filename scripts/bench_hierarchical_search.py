@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Busca hierárquica (centroides de categoria/documento -> chunks)
+
+Corpus sintético com a estrutura da KB: categorias, documentos dentro das
+categorias e chunks dentro dos documentos (cada nível é um ruído em torno do
+anterior). Para tamanhos crescentes compara a busca plana (todos os chunks)
+com o CentroidRouter em alguns valores de probe: latência, linhas pontuadas
+e recall@k contra a busca plana.
+
+Uso:
+    python3 scripts/bench_hierarchical_search.py [--sizes 20000 100000 400000] [--dim 256] [--json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bench_utils import percentile
+
+from vector_index import CentroidRouter, VectorIndex
+
+CATEGORIES = 8
+CHUNKS_PER_DOC = 40
+PROBES = [(4, 0), (16, 0), (16, 4)]  # (documentos, categorias)
+
+
+def synthetic_corpus(n: int, dim: int, n_queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_docs = max(n // CHUNKS_PER_DOC, 1)
+    category_centers = rng.standard_normal((CATEGORIES, dim)).astype(np.float32)
+    doc_category = rng.integers(0, CATEGORIES, size=n_docs)
+    doc_centers = category_centers[doc_category] + 0.6 * rng.standard_normal((n_docs, dim)).astype(np.float32)
+    chunk_doc = np.sort(rng.integers(0, n_docs, size=n))
+    vectors = doc_centers[chunk_doc] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    metadatas = [{"file": f"doc_{d}.txt", "category": f"cat_{doc_category[d]}"} for d in chunk_doc]
+    targets = rng.integers(0, n, size=n_queries)
+    queries = vectors[targets] + 0.4 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+    return vectors, metadatas, queries
+
+
+def timed_search(search, queries):
+    latencies, results, scanned = [], [], []
+    for q in queries:
+        start = time.perf_counter()
+        output = search(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(set(output[0].tolist()))
+        scanned.append(output[2]["rows_scanned"] if len(output) > 2 else None)
+    return latencies, results, scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca hierárquica")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000, 400_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    results = []
+    for size in args.sizes:
+        vectors, metadatas, queries = synthetic_corpus(size, args.dim, args.queries)
+        index = VectorIndex.build(vectors, [str(i) for i in range(size)], [""] * size, metadatas)
+        start = time.perf_counter()
+        router = CentroidRouter(index)
+        router_s = time.perf_counter() - start
+        
+        flat_lat, truth, _ = timed_search(lambda q: index.search(q, k=args.k), queries)
+        results.append({"chunks": size, "mode": "flat", "p50_ms": round(percentile(flat_lat, 50), 2),
+                        "rows_scanned": size, "recall": 1.0, "build_s": 0.0})
+        
+        for probe, probe_categories in PROBES:
+            latencies, found, scanned = timed_search(
+                lambda q: router.search(q, k=args.k, probe=probe, probe_categories=probe_categories), queries)
+            hits = sum(len(a & b) for a, b in zip(truth, found))
+            results.append({
+                "chunks": size,
+                "mode": f"docs={probe}" + (f" cats={probe_categories}" if probe_categories else ""),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "rows_scanned": int(np.mean(scanned)),
+                "recall": round(hits / (args.k * len(queries)), 4),
+                "build_s": round(router_s, 2),
+            })
+    
+    if args.json:
+        print(json.dumps({"dim": args.dim, "k": args.k, "results": results}, indent=2))
+        return
+    
+    print(f"\n🌲 Hierarchical search benchmark (dim={args.dim}, k={args.k}, {args.queries} queries)")
+    print("=" * 78)
+    print(f"{'chunks':>9} {'modo':<16} {'p50':>9} {'speedup':>8} {'linhas':>9} {'recall@' + str(args.k):>10} {'build':>7}")
+    flat = {}
+    for r in results:
+        if r["mode"] == "flat":
+            flat[r["chunks"]] = r["p50_ms"]
+        print(f"{r['chunks']:>9,} {r['mode']:<16} {r['p50_ms']:>7.2f}ms {flat[r['chunks']] / r['p50_ms']:>7.1f}x "
+              f"{r['rows_scanned']:>9,} {r['recall']:>10.3f} {r['build_s']:>6.2f}s")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
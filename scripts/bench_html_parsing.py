@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Extração de texto de páginas da Wikipedia (html_extract)
+
+Mede páginas/segundo de cada backend, em série e no pool de processos, e
+confere que o texto é idêntico ao do extrator original (html.parser), no
+corpus e em trechos com aninhamento inválido (MALFORMED_CASES), onde o lxml
+difere.
+
+Corpus: páginas salvas em --pages-dir (ex.: data/cache/http, arquivos .body
+ou .html) ou, por padrão, páginas sintéticas no formato da Wikipedia.
+
+Uso:
+    python3 scripts/bench_html_parsing.py [--pages-dir DIR] [--pages 200] [--workers N] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from html_extract import BACKENDS, extract_many, extract_text
+
+# HTML inválido comum em páginas reais: o lxml fecha o <p> antes de <div>/<ul>
+MALFORMED_CASES = [
+    "<p>Text <div>inner</div> tail</p>",
+    "<p>intro<ul><li>i</li></ul>after</p>",
+    "<p>one<p>two",
+]
+
+
+def synthetic_page(seed: int, paragraphs: int = 120) -> bytes:
+    """Página no formato da Wikipedia: navegação, infobox, referências, scripts e entidades"""
+    rng = random.Random(seed)
+    words = ("obesity body mass index survey nutrition examination regression mean median "
+             "prevalence cohort adults weight height sample population health").split()
+    
+    def sentence():
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+        return f'{text.capitalize()} <a href="/wiki/{rng.choice(words)}">{rng.choice(words)}</a>.'
+    
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"UTF-8\"><title>Article</title>",
+        "<style>.mw-body { color: #202122; }</style><script>var wgPageName = 'Article';</script></head><body>",
+        "<div id=\"mw-navigation\"><p>Navigation paragraph outside the content.</p></div>",
+        "<div id=\"mw-content-text\" class=\"mw-body-content\"><div class=\"mw-parser-output\">",
+        "<table class=\"infobox\"><tr><th>Field</th><td><p>Infobox paragraph</p></td></tr></table>",
+    ]
+    for i in range(paragraphs):
+        body = " ".join(sentence() for _ in range(rng.randint(2, 6)))
+        ref = f'<sup class="reference"><a href="#cite_note-{i}">[{i}]</a></sup>'
+        extras = rng.choice(["", " &amp; ", " <b>bold</b> ", " <i>ítálico</i> &nbsp;", " <!-- comment --> "])
+        parts.append(f"<p>{body}{ref}{extras}<span>{sentence()}</span></p>\n")
+        if i % 15 == 0:
+            parts.append(f"<h2><span class=\"mw-headline\">Section {i}</span></h2><p>\n</p>")
+        if i % 40 == 0:
+            parts.append("<figure><img src=\"x.png\" alt=\"figure\"><figcaption>Caption</figcaption></figure>")
+    parts.append("</div></div><div id=\"footer\"><p>Footer text</p></div></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def load_pages(pages_dir, n_pages: int):
+    if pages_dir:
+        paths = sorted(p for p in Path(pages_dir).iterdir() if p.suffix in (".body", ".html"))
+        return [p.read_bytes() for p in paths[:n_pages]]
+    return [synthetic_page(seed) for seed in range(n_pages)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extração de texto HTML")
+    parser.add_argument("--pages-dir", help="Pasta com páginas salvas (.body/.html)")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    pages = load_pages(args.pages_dir, args.pages)
+    if not pages:
+        raise SystemExit(f"❌ Nenhuma página em {args.pages_dir}")
+    total_mb = sum(len(p) for p in pages) / 1e6
+    
+    reference = extract_many(pages, "html.parser", workers=1)
+    malformed = [f'<html><body><div id="mw-content-text">{case}</div></body></html>' for case in MALFORMED_CASES]
+    malformed_reference = [extract_text(page, "html.parser") for page in malformed]
+    
+    results = []
+    for backend in BACKENDS:
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            texts = extract_many(pages, backend, workers=workers)
+            elapsed = time.perf_counter() - start
+            results.append({
+                "backend": backend,
+                "workers": workers,
+                "seconds": round(elapsed, 3),
+                "pages_per_s": round(len(pages) / elapsed, 1),
+                "matches_reference": texts == reference,
+                "malformed_matches": sum(extract_text(page, backend) == expected
+                                         for page, expected in zip(malformed, malformed_reference)),
+            })
+    
+    if args.json:
+        print(json.dumps({"pages": len(pages), "mb": round(total_mb, 2), "results": results}, indent=2))
+        return
+    
+    baseline = results[0]["pages_per_s"]
+    print(f"\n🧩 HTML parsing benchmark ({len(pages)} pages, {total_mb:.1f} MB)")
+    print("=" * 76)
+    print(f"{'backend':<12} {'workers':>7} {'tempo':>9} {'páginas/s':>10} {'speedup':>8} "
+          f"{'texto':>9} {'inválido':>9}")
+    for r in results:
+        same = "idêntico" if r["matches_reference"] else "DIFERENTE"
+        print(f"{r['backend']:<12} {r['workers']:>7} {r['seconds']:>8.2f}s {r['pages_per_s']:>10.1f} "
+              f"{r['pages_per_s'] / baseline:>7.1f}x {same:>9} {r['malformed_matches']:>5}/{len(MALFORMED_CASES)}")
+    print("=" * 76)
+
+
+if __name__ == "__main__":
+    main()
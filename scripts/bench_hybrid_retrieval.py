@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Retrieval denso vs lexical (BM25) vs híbrido (RRF)
+
+Reporta latência (média/p50/p95) e recall@k (fração de perguntas com alguma
+fonte esperada no top-k) no conjunto de perguntas de data/benchmarks.
+
+Uso:
+    python3 scripts/bench_hybrid_retrieval.py [--k 3] [--json]
+"""
+
+import argparse
+import json
+import time
+
+from bench_utils import hit, load_questions, open_vector_store, percentile, DEFAULT_QUESTIONS
+
+from config import settings
+from embeddings import EmbeddingService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de retrieval híbrido")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    embeddings = EmbeddingService().get_embeddings()
+    store = open_vector_store(embeddings, settings.KNOWLEDGE_BASE_PATH, settings.VECTOR_STORE_PATH)
+    questions = load_questions(args.questions)
+    
+    modes = {
+        "dense": lambda q: store.similarity_search(q, k=args.k),
+        "lexical": lambda q: [doc for doc, _ in store.lexical_search(q, k=args.k)],
+        "hybrid": lambda q: store.hybrid_search(
+            q,
+            k=args.k,
+            fetch_k=settings.HYBRID_FETCH_K,
+            rrf_k=settings.HYBRID_RRF_K,
+            lexical_shortcut=settings.HYBRID_LEXICAL_SHORTCUT,
+            lexical_min_score=settings.HYBRID_LEXICAL_MIN_SCORE,
+            lexical_ratio=settings.HYBRID_LEXICAL_RATIO
+        ),
+    }
+    
+    report = {}
+    for mode, search in modes.items():
+        latencies, hits, skipped = [], 0, 0
+        for item in questions:
+            start = time.perf_counter()
+            result = search(item["question"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            
+            if mode == "hybrid":
+                result, info = result
+                skipped += info["embedding_skipped"]
+            hits += hit(result, item.get("expected_files", []))
+        
+        report[mode] = {
+            f"recall@{args.k}": round(hits / len(questions), 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+        }
+        if mode == "hybrid":
+            report[mode]["embedding_calls_skipped"] = skipped
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    print(f"\n📊 Retrieval ({len(questions)} perguntas, k={args.k})")
+    for mode, stats in report.items():
+        print(f"\n  {mode}")
+        for key, value in stats.items():
+            print(f"    {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
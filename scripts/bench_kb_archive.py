@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark - KB em pastas vs arquivo empacotado (.kbpack)
+
+Num corpus sintético, mede para cada layout o tempo de carregar todos os
+documentos e o de listar as fontes (/api/sources), e confere que os
+documentos são idênticos. Com --drop-caches (Linux, root) o page cache é
+esvaziado antes de cada medição, simulando um cold start do container.
+
+Uso:
+    python3 scripts/bench_kb_archive.py [--files 100000] [--drop-caches] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from bench_document_loader import write_corpus
+
+from document_loader import KnowledgeBaseLoader
+from kb_archive import write_archive
+
+
+def drop_caches() -> bool:
+    """Esvazia o page cache do kernel; False se não houver permissão"""
+    try:
+        subprocess.run(["sync"], check=True)
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def timed(func, cold: bool):
+    if cold:
+        drop_caches()
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do arquivo empacotado da KB")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--drop-caches", action="store_true", help="Medir a frio (precisa de root)")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    cold = args.drop_caches and drop_caches()
+    if args.drop_caches and not cold:
+        print("⚠️ Sem permissão para esvaziar o page cache - medindo a quente")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "kb"
+        print(f"⏳ Writing {args.files:,} files...")
+        write_corpus(root, args.files)
+
+        layouts = {
+            "folders": {"use_archive": False},
+            "kbpack": {"archive_path": Path(tmp) / "raw.kbpack"},
+            "kbpack-zlib": {"archive_path": Path(tmp) / "zlib.kbpack"},
+        }
+        pack = {}
+        for name, compress in (("kbpack", False), ("kbpack-zlib", True)):
+            start = time.perf_counter()
+            summary = write_archive(root, layouts[name]["archive_path"], compress=compress)
+            pack[name] = {"pack_s": round(time.perf_counter() - start, 2), "mb": round(summary["archive_bytes"] / 1e6, 1)}
+
+        results, reference = {}, None
+        for name, options in layouts.items():
+            loader = KnowledgeBaseLoader(root, **options)
+            load_s, docs = timed(lambda: [(d.page_content, d.metadata) for d in loader.iter_documents()], cold)
+            sources_s, sources = timed(loader.list_sources, cold)
+            if reference is None:
+                reference = docs
+            results[name] = {
+                "load_s": round(load_s, 3),
+                "sources_s": round(sources_s, 4),
+                "documents": len(docs),
+                "sources": len(sources),
+                "identical": docs == reference,
+                **pack.get(name, {"mb": round(sum(p.stat().st_size for p in root.rglob("*.txt")) / 1e6, 1)}),
+            }
+
+    if args.json:
+        print(json.dumps({"files": args.files, "cold": cold, "results": results}, indent=2))
+        return
+
+    base = results["folders"]
+    print(f"\n📦 KB archive benchmark ({args.files:,} files, {'frio' if cold else 'quente'})")
+    print("=" * 74)
+    print(f"{'layout':<13} {'carregar':>9} {'speedup':>8} {'fontes':>9} {'speedup':>8} {'MB':>7} {'docs':>8}")
+    for name, r in results.items():
+        print(f"{name:<13} {r['load_s']:>8.2f}s {base['load_s'] / r['load_s']:>7.1f}x "
+              f"{r['sources_s']:>8.3f}s {base['sources_s'] / r['sources_s']:>7.1f}x {r['mb']:>7.1f} "
+              f"{r['documents']:>8,}{'' if r['identical'] else ' ❌'}")
+    print("=" * 74)
+    print(f"Empacotar: {pack['kbpack']['pack_s']:.2f}s (cru), {pack['kbpack-zlib']['pack_s']:.2f}s (zlib)")
+
+
+if __name__ == "__main__":
+    main()
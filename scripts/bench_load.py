@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API (open loop ou closed loop)
+
+Reproduz um mix de requisições de um JSONL contra a API e reporta vazão,
+latência p50/p95/p99/máx, erros por tipo e o tempo por etapa que /api/ask
+devolve em `timings`.
+
+Cada linha do JSONL vira um POST /api/ask com `question` e os campos de
+QuestionRequest presentes (k, hybrid, mmr, category...). Linhas com
+`endpoint` usam outra rota: {"endpoint": "/api/sources"} (GET) ou
+{"endpoint": "/api/stats/query", "method": "POST", "body": {...}}.
+
+Modos:
+    --mode closed --users 8        N usuários virtuais; cada um manda a próxima ao receber a resposta
+    --mode open --rate 5           chegadas a taxa constante (--poisson: intervalos exponenciais);
+                                   latência medida desde o instante agendado (sem coordinated omission)
+
+--spawn sobe o stand-in do Gemini e a API (uvicorn) localmente, com um vector
+store próprio em data/cache/, e encerra os dois ao final. --output grava o
+relatório JSON (com o commit) para comparar execuções entre commits.
+
+Uso:
+    python3 scripts/bench_load.py --spawn --mode closed --users 4 --duration 30 --output load.json
+    python3 scripts/bench_load.py --url http://localhost:8000 --mode open --rate 2 --requests 100
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_utils import DEFAULT_QUESTIONS, ROOT_DIR, load_questions, percentile
+from gemini_standin import start_standin
+
+ASK_FIELDS = ("k", "adaptive", "hybrid", "mmr", "fast_path", "category", "source")
+BENCH_VECTOR_STORE = "data/cache/chroma_db_bench"
+
+
+def build_request(item: dict, defaults: dict) -> tuple:
+    """(método, rota, corpo) de uma linha do mix"""
+    if "endpoint" in item:
+        method = item.get("method", "POST" if "body" in item else "GET").upper()
+        return method, item["endpoint"], item.get("body")
+    body = {**defaults, "question": item["question"]}
+    body.update({field: item[field] for field in ASK_FIELDS if field in item})
+    return "POST", "/api/ask", body
+
+
+class LoadRunner:
+    """Dispara as requisições e acumula um registro por requisição"""
+    
+    def __init__(self, base_url: str, requests_mix: list, timeout: float, seed: int = 0):
+        self.base_url = base_url.rstrip("/")
+        self.mix = requests_mix
+        self.timeout = timeout
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next = 0
+        self._order = list(range(len(requests_mix)))
+        random.Random(seed).shuffle(self._order)
+    
+    def next_request(self) -> tuple:
+        with self._lock:
+            index = self._order[self._next % len(self._order)]
+            self._next += 1
+        return self.mix[index]
+    
+    def send(self, request: tuple, scheduled: float = None):
+        """Executa uma requisição; a latência conta a partir de `scheduled` (open loop) ou do envio"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        method, path, body = request
+        start = time.perf_counter()
+        record = {"endpoint": path, "status": None, "error": None, "timings": {}}
+        try:
+            response = session.request(method, self.base_url + path, json=body, timeout=self.timeout)
+            record["status"] = response.status_code
+            if response.ok:
+                payload = response.json()
+                if isinstance(payload, dict):
+                    record["timings"] = payload.get("timings", {})
+                    record["route"] = payload.get("route")
+            else:
+                record["error"] = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            record["error"] = type(e).__name__
+        end = time.perf_counter()
+        record["latency_ms"] = (end - (scheduled if scheduled is not None else start)) * 1000
+        record["service_ms"] = (end - start) * 1000
+        with self._lock:
+            self.records.append(record)
+    
+    def closed_loop(self, users: int, duration: float, total: int, think_time: float):
+        """`users` threads em laço: próxima requisição só depois da resposta da anterior"""
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [total] if total else None
+        
+        def user():
+            while deadline is None or time.perf_counter() < deadline:
+                if remaining is not None:
+                    with self._lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self.send(self.next_request())
+                if think_time:
+                    time.sleep(think_time)
+        
+        threads = [threading.Thread(target=user, daemon=True) for _ in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    def open_loop(self, rate: float, duration: float, total: int, poisson: bool, max_inflight: int,
+                  seed: int = 0):
+        """Chegadas em horários fixos (ou Poisson), independentes das respostas"""
+        rng = random.Random(seed)
+        total = total or max(1, int(rate * duration))
+        start = time.perf_counter()
+        scheduled = start
+        with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+            for _ in range(total):
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, self.next_request(), scheduled)
+                scheduled += rng.expovariate(rate) if poisson else 1.0 / rate
+
+
+def summarize(records: list, elapsed_s: float) -> dict:
+    ok = [r for r in records if r["error"] is None]
+    latencies = [r["latency_ms"] for r in ok]
+    
+    def stats(values):
+        return {
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(max(values), 2) if values else 0.0,
+        }
+    
+    stages = {}
+    for r in ok:
+        for stage, value in r["timings"].items():
+            stages.setdefault(stage, []).append(value)
+    
+    endpoints = {}
+    for path in sorted({r["endpoint"] for r in records}):
+        subset = [r["latency_ms"] for r in ok if r["endpoint"] == path]
+        endpoints[path] = {"ok": len(subset), **stats(subset)}
+    
+    return {
+        "requests": len(records),
+        "ok": len(ok),
+        "elapsed_s": round(elapsed_s, 2),
+        "throughput_rps": round(len(ok) / elapsed_s, 2) if elapsed_s else 0.0,
+        "latency": stats(latencies),
+        "errors": dict(Counter(r["error"] for r in records if r["error"]).most_common()),
+        "routes": dict(Counter(r.get("route") for r in ok if r.get("route")).most_common()),
+        "stages": {stage: {"mean_ms": round(sum(v) / len(v), 2), **stats(v)} for stage, v in stages.items()},
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def spawn_api(args):
+    """Stand-in do Gemini numa thread + API num subprocesso; retorna (standin, api, base_url)"""
+    standin, gemini_url = start_standin(embed_latency=args.standin_embed_latency,
+                                        generate_latency=args.standin_latency,
+                                        distribution="lognormal", jitter=0.5,
+                                        error_rate=args.standin_error_rate)
+    env = {**os.environ, "GEMINI_BASE_URL": gemini_url, "GEMINI_API_KEY": "standin",
+           "EMBEDDING_BACKEND": "gemini", "VECTOR_STORE_PATH": BENCH_VECTOR_STORE}
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api_service:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL if args.json else None,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if api.poll() is not None:
+            raise RuntimeError(f"API encerrou na inicialização (código {api.returncode})")
+        try:
+            if requests.get(base_url + "/health", timeout=1).ok:
+                return standin, api, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    api.terminate()
+    raise RuntimeError(f"API não respondeu em {args.startup_timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--users", type=int, default=4, help="Usuários virtuais (closed loop)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pausa entre requisições de um usuário (s)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Chegadas por segundo (open loop)")
+    parser.add_argument("--poisson", action="store_true", help="Intervalos exponenciais no open loop")
+    parser.add_argument("--max-inflight", type=int, default=256, help="Requisições simultâneas (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração (s); ignorada com --requests")
+    parser.add_argument("--requests", type=int, default=0, help="Total de requisições (0 = pela duração)")
+    parser.add_argument("--warmup", type=int, default=2, help="Requisições descartadas antes da medição")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS), help="Mix de requisições (JSONL)")
+    parser.add_argument("--ask", default="{}", help='Campos padrão do /api/ask em JSON, ex.: \'{"hybrid": true}\'')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="Subir stand-in do Gemini + API localmente")
+    parser.add_argument("--port", type=int, default=8010, help="Porta da API com --spawn")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn com --spawn")
+    parser.add_argument("--standin-latency", type=float, default=0.5, help="Latência média da geração (s)")
+    parser.add_argument("--standin-embed-latency", type=float, default=0.02)
+    parser.add_argument("--standin-error-rate", type=float, default=0.0)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="Gravar o relatório JSON neste arquivo")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    defaults = json.loads(args.ask)
+    mix = [build_request(item, defaults) for item in load_questions(args.questions)]
+    
+    standin = api = None
+    base_url = args.url
+    if args.spawn:
+        standin, api, base_url = spawn_api(args)
+    
+    try:
+        warmup = LoadRunner(base_url, mix, args.timeout, args.seed)
+        for _ in range(args.warmup):
+            warmup.send(warmup.next_request())
+        
+        runner = LoadRunner(base_url, mix, args.timeout, args.seed)
+        start = time.perf_counter()
+        duration = 0 if args.requests else args.duration
+        if args.mode == "closed":
+            runner.closed_loop(args.users, duration, args.requests, args.think_time)
+        else:
+            runner.open_loop(args.rate, duration, args.requests, args.poisson, args.max_inflight, args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        if api:
+            api.terminate()
+            api.wait(timeout=30)
+        if standin:
+            standin.shutdown()
+    
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": "standin" if args.spawn else base_url,
+        "mode": args.mode,
+        "params": {"users": args.users, "think_time": args.think_time} if args.mode == "closed"
+                  else {"rate": args.rate, "poisson": args.poisson},
+        "mix": {"file": os.path.basename(args.questions), "size": len(mix), "ask_defaults": defaults},
+        **summarize(runner.records, elapsed),
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    
+    mode = (f"closed loop, {args.users} usuários" if args.mode == "closed"
+            else f"open loop, {args.rate}/s{' poisson' if args.poisson else ''}")
+    print(f"\n🚦 Load test — {report['target']} ({mode}, commit {report['commit']})")
+    print("=" * 72)
+    print(f"Requisições: {report['requests']} ({report['ok']} ok) em {report['elapsed_s']}s "
+          f"→ {report['throughput_rps']} req/s")
+    lat = report["latency"]
+    print(f"Latência: p50 {lat['p50_ms']:.0f} ms | p95 {lat['p95_ms']:.0f} ms | "
+          f"p99 {lat['p99_ms']:.0f} ms | máx {lat['max_ms']:.0f} ms")
+    if report["errors"]:
+        print("Erros: " + ", ".join(f"{kind} × {count}" for kind, count in report["errors"].items()))
+    if report["routes"]:
+        print("Rotas: " + ", ".join(f"{route} × {count}" for route, count in report["routes"].items()))
+    if report["stages"]:
+        print(f"\n{'etapa':<14} {'média':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for stage, s in report["stages"].items():
+            print(f"{stage:<14} {s['mean_ms']:>7.1f}ms {s['p50_ms']:>7.1f}ms {s['p95_ms']:>7.1f}ms "
+                  f"{s['p99_ms']:>7.1f}ms")
+    if len(report["endpoints"]) > 1:
+        print(f"\n{'endpoint':<20} {'ok':>6} {'p50':>9} {'p99':>9}")
+        for path, s in report["endpoints"].items():
+            print(f"{path:<20} {s['ok']:>6} {s['p50_ms']:>7.0f}ms {s['p99_ms']:>7.0f}ms")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Diversificação por MMR (select_mmr)
+
+Candidatos sintéticos no formato do problema do "IMC": grupos de chunks quase
+idênticos (o mesmo parágrafo em body_mass_index, obesity, overweight) em torno
+de alguns tópicos próximos da query. Compara o top-k por relevância com o top-k
+por MMR: similaridade média entre os escolhidos, grupos distintos cobertos e
+relevância média. Mede também a latência da seleção para 50 candidatos.
+
+Uso:
+    python3 scripts/bench_mmr.py [--candidates 50] [--k 5] [--dim 768] [--json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bench_utils import percentile
+
+from vector_store import select_mmr
+
+LAMBDAS = [0.7, 0.5, 0.3]
+
+
+def synthetic_candidates(n: int, dim: int, copies: int, rng):
+    """Query + n candidatos em grupos de `copies` quase duplicatas, ordenados por relevância"""
+    query = rng.standard_normal(dim).astype(np.float32)
+    n_groups = -(-n // copies)
+    topics = query + 0.8 * rng.standard_normal((n_groups, dim)).astype(np.float32)
+    groups = np.repeat(np.arange(n_groups), copies)[:n]
+    vectors = topics[groups] + 0.05 * rng.standard_normal((n, dim)).astype(np.float32)
+    order = np.argsort(((vectors - query) ** 2).sum(axis=1))
+    return query, vectors[order], groups[order]
+
+
+def selection_stats(query, vectors, groups, selected) -> dict:
+    unit = vectors[selected] / np.linalg.norm(vectors[selected], axis=1, keepdims=True)
+    pairwise = unit @ unit.T
+    k = len(selected)
+    relevance = unit @ (query / np.linalg.norm(query))
+    return {
+        "redundancy": float((pairwise.sum() - k) / (k * (k - 1))) if k > 1 else 0.0,
+        "groups": len(set(groups[selected].tolist())),
+        "relevance": float(relevance.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de MMR")
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--copies", type=int, default=3, help="Quase duplicatas por grupo")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    modes = ["top-k"] + [f"mmr λ={lam}" for lam in LAMBDAS]
+    totals = {mode: {"redundancy": 0.0, "groups": 0, "relevance": 0.0} for mode in modes}
+    latencies = []
+    
+    for _ in range(args.trials):
+        query, vectors, groups = synthetic_candidates(args.candidates, args.dim, args.copies, rng)
+        selections = {"top-k": list(range(args.k))}
+        for lam in LAMBDAS:
+            start = time.perf_counter()
+            selections[f"mmr λ={lam}"] = select_mmr(query, vectors, args.k, lambda_mult=lam)
+            latencies.append((time.perf_counter() - start) * 1000)
+        for mode, selected in selections.items():
+            for key, value in selection_stats(query, vectors, groups, selected).items():
+                totals[mode][key] += value
+    
+    results = [{"mode": mode, **{key: round(value / args.trials, 3) for key, value in stats.items()}}
+               for mode, stats in totals.items()]
+    timing = {"p50_ms": round(percentile(latencies, 50), 3), "p99_ms": round(percentile(latencies, 99), 3)}
+    
+    if args.json:
+        print(json.dumps({"candidates": args.candidates, "k": args.k, "dim": args.dim,
+                          "selection": timing, "results": results}, indent=2))
+        return
+    
+    print(f"\n🎯 MMR benchmark ({args.candidates} candidatos × {args.dim}, k={args.k}, "
+          f"grupos de {args.copies} quase duplicatas, {args.trials} queries)")
+    print("=" * 64)
+    print(f"{'modo':<12} {'similaridade média':>19} {'grupos distintos':>17} {'relevância':>11}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['redundancy']:>19.3f} {r['groups']:>13.2f}/{args.k} {r['relevance']:>11.3f}")
+    print("=" * 64)
+    print(f"Seleção MMR: p50 {timing['p50_ms']:.3f} ms, p99 {timing['p99_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
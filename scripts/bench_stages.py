@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Suíte por etapa com baseline e detecção de regressões
+
+Corpora sintéticos fixos (semente fixa, vocabulário tirado da KB) de 1k, 10k
+e 100k chunks, com o embedder local (HashingEmbeddings) no lugar do Gemini.
+Mede tempo e pico de memória (tracemalloc, em execução separada) de:
+    load       KnowledgeBaseLoader.load_documents (arquivos num diretório temporário)
+    split      DocumentSplitter.split_documents
+    index      VectorStoreService.create_vectorstore_from_batches (uma execução; memória = RSS acrescida)
+    search     VectorStoreService.similarity_search (ms por query, perguntas de data/benchmarks)
+    prompt     build_context + build_prompt de generate_response_with_sources (ms por pergunta)
+    embed      GeminiEmbeddings.embed_documents contra o stand-in sem latência,
+               menos o custo do próprio embedder: overhead por texto (uma vez, fora dos tamanhos)
+
+Tempo = melhor de --repeat execuções (search e prompt: média do melhor tempo
+de cada pergunta). Com baseline em
+data/benchmarks/stage_baseline.json, etapas mais lentas ou com mais memória que
+baseline × (1 + --threshold) são marcadas como regressão e o script sai com
+código 1. --save-baseline grava os números medidos como novo baseline (só as
+entradas dos tamanhos rodados; a baseline vale para a máquina em que foi gerada).
+
+Uso:
+    python3 scripts/bench_stages.py [--sizes 1000 10000 100000] [--threshold 0.2] [--save-baseline] [--json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench_ann_index import rss_bytes
+from bench_utils import DEFAULT_QUESTIONS, ROOT_DIR, load_questions
+from gemini_standin import start_standin
+
+from config import settings
+from document_loader import KnowledgeBaseLoader
+from embeddings import GeminiEmbeddings
+from llm_service import build_context, build_prompt
+from local_embeddings import HashingEmbeddings
+from text_splitter import DocumentSplitter
+from vector_store import VectorStoreService
+
+BASELINE = ROOT_DIR / "data" / "benchmarks" / "stage_baseline.json"
+CATEGORIES = ["conceitos", "estatisticas", "papers", "wikipedia"]
+CHUNKS_PER_DOC = 10
+INDEX_BATCH = 5000
+# Diferenças menores que isso são ruído, mesmo acima do threshold relativo
+MIN_DELTA_MS = 0.02
+MIN_DELTA_MB = 0.5
+
+
+def kb_vocabulary() -> list:
+    """Palavras da KB (com repetição, para manter a distribuição de frequências)"""
+    documents = KnowledgeBaseLoader(ROOT_DIR / "data" / "knowledge_base", use_archive=False).load_documents()
+    return [w for doc in documents for w in re.findall(r"\w+", doc.page_content.lower()) if len(w) > 2]
+
+
+def write_corpus(root: Path, n_chunks: int, vocabulary: list, seed: int = 0):
+    """~n_chunks/CHUNKS_PER_DOC arquivos no formato da KB, com ~CHUNKS_PER_DOC chunks de 500 chars cada"""
+    rng = random.Random(seed)
+    for i in range(max(n_chunks // CHUNKS_PER_DOC, 1)):
+        folder = root / CATEGORIES[i % len(CATEGORIES)] / f"lote_{i // 1000:03d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        # Parágrafos de 55 palavras (~400 chars): o splitter fecha ~um chunk por parágrafo
+        paragraphs = "\n\n".join(" ".join(rng.choices(vocabulary, k=55)) for _ in range(CHUNKS_PER_DOC))
+        (folder / f"doc_{i:06d}.txt").write_text(
+            f"Source: https://example.org/doc/{i}\n# Documento {i}\n\n{paragraphs}\n", encoding="utf-8")
+
+
+def measure(func, repeat: int):
+    """(melhor tempo em s, pico MB, resultado); o pico vem de uma execução extra sob tracemalloc"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def measure_each(func, items: list, repeat: int):
+    """(média do melhor tempo por item em s, pico MB, resultados): menos ruído que o melhor do lote"""
+    best = [float("inf")] * len(items)
+    for _ in range(repeat):
+        for i, item in enumerate(items):
+            start = time.perf_counter()
+            func(item)
+            best[i] = min(best[i], time.perf_counter() - start)
+    tracemalloc.start()
+    results = [func(item) for item in items]
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return sum(best) / len(best), peak, results
+
+
+def run_size(n_chunks: int, vocabulary: list, questions: list, embeddings, repeat: int) -> list:
+    rows = []
+    
+    def add(stage, seconds, peak, unit="ms"):
+        rows.append({"stage": stage, "size": n_chunks, "time_ms": round(seconds * 1000, 4),
+                     "unit": unit, "peak_mb": round(peak, 2)})
+    
+    with tempfile.TemporaryDirectory() as directory:
+        kb = Path(directory) / "kb"
+        write_corpus(kb, n_chunks, vocabulary)
+        loader = KnowledgeBaseLoader(kb, use_archive=False)
+        seconds, peak, documents = measure(loader.load_documents, repeat)
+        add("load", seconds, peak)
+        
+        splitter = DocumentSplitter(chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP)
+        seconds, peak, chunks = measure(lambda: splitter.split_documents(documents), repeat)
+        add("split", seconds, peak)
+        
+        # Build uma vez (caro em 100k) e sem tracemalloc, que o deixa ~10x mais lento;
+        # a memória é a RSS acrescida, que inclui o índice HNSW (C++) do Chroma
+        service = VectorStoreService(str(Path(directory) / "store"))
+        batches = [chunks[i:i + INDEX_BATCH] for i in range(0, len(chunks), INDEX_BATCH)]
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):
+            service.create_vectorstore_from_batches(batches, embeddings)
+        add("index", time.perf_counter() - start, (rss_bytes() - rss_before) / 1e6)
+        
+        k = settings.RETRIEVAL_K
+        seconds, peak, found = measure_each(lambda q: service.similarity_search(q, k=k), questions, repeat)
+        add("search", seconds, peak, unit="ms/query")
+        
+        seconds, peak, _ = measure_each(lambda item: build_prompt(item[0], build_context(item[1])[0]),
+                                        list(zip(questions, found)), repeat)
+        add("prompt", seconds, peak, unit="ms/pergunta")
+        
+        service.close()
+        rows.insert(0, {"stage": "corpus", "size": n_chunks, "documents": len(documents), "chunks": len(chunks)})
+    return rows
+
+
+def run_embed_overhead(texts: list, dim: int, repeat: int) -> dict:
+    """Overhead por texto do GeminiEmbeddings (requisição por texto) sobre o embedder em si"""
+    standin, url = start_standin(dim=dim)
+    settings.GEMINI_BASE_URL = url
+    os.environ["GEMINI_API_KEY"] = "standin"
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            remote = GeminiEmbeddings()
+        local = HashingEmbeddings(dim=dim)
+        remote_s, peak, _ = measure(lambda: remote.embed_documents(texts), repeat)
+        local_s, _, _ = measure(lambda: local.embed_documents(texts), repeat)
+    finally:
+        standin.shutdown()
+    return {"stage": "embed", "size": len(texts), "time_ms": round((remote_s - local_s) * 1000 / len(texts), 4),
+            "unit": "ms/texto de overhead", "peak_mb": round(peak, 2)}
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Marca cada linha com a razão sobre o baseline e se é regressão"""
+    regressions = []
+    for row in results:
+        if "time_ms" not in row:
+            continue
+        base = baseline.get(f"{row['stage']}/{row['size']}")
+        if not base:
+            continue
+        row["time_ratio"] = round(row["time_ms"] / base["time_ms"], 3) if base["time_ms"] else None
+        row["peak_ratio"] = round(row["peak_mb"] / base["peak_mb"], 3) if base["peak_mb"] else None
+        slower = (row["time_ms"] > base["time_ms"] * (1 + threshold)
+                  and row["time_ms"] - base["time_ms"] > MIN_DELTA_MS)
+        bigger = (row["peak_mb"] > base["peak_mb"] * (1 + threshold)
+                  and row["peak_mb"] - base["peak_mb"] > MIN_DELTA_MB)
+        row["regression"] = [name for name, flag in (("time", slower), ("memory", bigger)) if flag]
+        if row["regression"]:
+            regressions.append(row)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks por etapa")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Chunks por corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por etapa (vale a melhor)")
+    parser.add_argument("--dim", type=int, default=384, help="Dimensão do embedder local")
+    parser.add_argument("--embed-texts", type=int, default=200, help="Textos no teste de overhead do embedding")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Piora relativa que conta como regressão")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Gravar os resultados como baseline")
+    parser.add_argument("--questions", default=str(DEFAULT_QUESTIONS))
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    vocabulary = kb_vocabulary()
+    questions = [item["question"] for item in load_questions(args.questions)]
+    embeddings = HashingEmbeddings(dim=args.dim)
+    
+    results = []
+    for size in args.sizes:
+        print(f"⏳ corpus {size:,} chunks...", file=sys.stderr)
+        results.extend(run_size(size, vocabulary, questions, embeddings, args.repeat))
+    texts = [" ".join(random.Random(i).choices(vocabulary, k=55)) for i in range(args.embed_texts)]
+    results.append(run_embed_overhead(texts, args.dim, args.repeat))
+    
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.threshold)
+    
+    if args.save_baseline:
+        # Atualiza só as entradas medidas agora (ex.: --sizes 1000 preserva 10k e 100k)
+        baseline.update({f"{r['stage']}/{r['size']}": {"time_ms": r["time_ms"], "peak_mb": r["peak_mb"]}
+                         for r in results if "time_ms" in r})
+        baseline_path.write_text(json.dumps({
+            "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+            "embedder": embeddings.version,
+            "results": baseline,
+        }, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    
+    if args.json:
+        print(json.dumps({"threshold": args.threshold, "baseline": bool(baseline), "results": results,
+                          "regressions": len(regressions)}, indent=2, ensure_ascii=False))
+    else:
+        print(f"\n⏱️  Stage benchmarks (embedder {embeddings.version}, melhor de {args.repeat}, "
+              f"threshold {args.threshold:.0%}{'' if baseline else ', sem baseline'})")
+        print("=" * 84)
+        print(f"{'etapa':<8} {'chunks':>8} {'tempo':>12} {'unidade':<22} {'pico':>10} {'vs baseline':>16}")
+        for r in results:
+            if "time_ms" not in r:
+                print(f"{'corpus':<8} {r['size']:>8,} ({r['documents']:,} documentos → {r['chunks']:,} chunks)")
+                continue
+            versus = ""
+            if "time_ratio" in r:
+                versus = f"×{r['time_ratio'] or 0:.2f} / ×{r['peak_ratio'] or 0:.2f}"
+                if r["regression"]:
+                    versus += " ⚠️"
+            print(f"{r['stage']:<8} {r['size']:>8,} {r['time_ms']:>12.3f} {r['unit']:<22} "
+                  f"{r['peak_mb']:>7.2f} MB {versus:>16}")
+        print("=" * 84)
+        if regressions:
+            print(f"⚠️ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}: "
+                  + ", ".join(f"{r['stage']}/{r['size']} ({'+'.join(r['regression'])})" for r in regressions))
+        if args.save_baseline:
+            print(f"💾 Baseline gravado em {baseline_path}")
+    
+    sys.exit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
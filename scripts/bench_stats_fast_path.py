@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Fast path estatístico (stats table, sem LLM)
+
+Reporta a taxa de acerto do roteador (perguntas respondidas pelo fast path),
+a precisão da intenção extraída nas perguntas rotuladas e a latência.
+
+Uso:
+    python3 scripts/bench_stats_fast_path.py [--table PATH] [--csv PATH] [--rag] [--json] [--check]
+
+Com --check, sai com código 1 se alguma pergunta rotulada falhar (intenção
+errada, fast path que deveria responder e não responde, ou resposta direta
+para uma pergunta que deveria ir ao RAG).
+"""
+
+import argparse
+import json
+import time
+
+from bench_utils import ROOT_DIR, DEFAULT_QUESTIONS, load_questions, percentile
+
+from config import settings
+from stats_engine import StatsEngine
+from stats_router import StatsRouter
+
+DEFAULT_TABLE = ROOT_DIR / settings.KNOWLEDGE_BASE_PATH / "estatisticas" / "stats_table.json"
+LABELLED_QUESTIONS = ROOT_DIR / "data" / "benchmarks" / "stats_questions.jsonl"
+
+
+def time_router(router, questions, repeat=50):
+    """Latência (µs) de StatsRouter.answer por pergunta, melhor de `repeat` execuções"""
+    latencies = []
+    for question in questions:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            router.answer(question)
+            best = min(best, time.perf_counter() - start)
+        latencies.append(best * 1e6)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do fast path estatístico")
+    parser.add_argument("--table", default=str(DEFAULT_TABLE))
+    parser.add_argument("--csv", default=str(ROOT_DIR / settings.NHANES_CSV_PATH),
+                        help="CSV para o StatsEngine (combinações fora da stats table)")
+    parser.add_argument("--rag", action="store_true",
+                        help="Cronometrar também o caminho RAG (requer GEMINI_API_KEY)")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--check", action="store_true", help="Falhar se alguma pergunta rotulada errar")
+    args = parser.parse_args()
+    
+    try:
+        engine = StatsEngine(args.csv, str(ROOT_DIR / settings.STATS_CACHE_PATH))
+    except FileNotFoundError:
+        engine = None
+    
+    router = StatsRouter.from_file(args.table, min_confidence=settings.STATS_MIN_CONFIDENCE, engine=engine)
+    if router is None:
+        raise SystemExit(f"❌ Stats table não encontrada: {args.table} (rode o builder com o CSV)")
+    
+    labelled = load_questions(LABELLED_QUESTIONS)
+    traffic = [q["question"] for q in load_questions(DEFAULT_QUESTIONS)]
+    
+    # Precisão da intenção nas perguntas rotuladas
+    correct, false_positive, missed = 0, 0, 0
+    failures = []
+    for item in labelled:
+        answered = router.answer(item["question"]) is not None
+        expected = item["expected"]
+        if expected is None:
+            false_positive += answered
+            if answered:
+                failures.append(item["question"])
+            continue
+        if not answered:
+            missed += 1
+            failures.append(item["question"])
+            continue
+        intent = router.parse(item["question"])
+        if all(intent[key] == value for key, value in expected.items()):
+            correct += 1
+        else:
+            failures.append(item["question"])
+    
+    hits = [q for q in traffic if router.answer(q) is not None]
+    latencies = time_router(router, traffic + [item["question"] for item in labelled])
+    
+    report = {
+        "traffic_questions": len(traffic),
+        "traffic_hit_rate": round(len(hits) / len(traffic), 3),
+        "labelled_questions": len(labelled),
+        "labelled_correct": correct,
+        "labelled_missed": missed,
+        "labelled_false_positives": false_positive,
+        "labelled_failures": failures,
+        "router_p50_us": round(percentile(latencies, 50), 1),
+        "router_p99_us": round(percentile(latencies, 99), 1),
+    }
+    
+    if args.rag and hits:
+        from rag_pipeline import RAGPipeline
+        pipeline = RAGPipeline()
+        rag_latencies = []
+        for question in hits:
+            start = time.perf_counter()
+            pipeline.query(question, fast_path=False)
+            rag_latencies.append((time.perf_counter() - start) * 1000)
+        report["rag_p50_ms_for_hits"] = round(percentile(rag_latencies, 50), 1)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("\n📊 Fast path estatístico")
+        for key, value in report.items():
+            print(f"   {key}: {value}")
+    
+    if args.check and failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
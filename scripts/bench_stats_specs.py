@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Gerador declarativo de estatísticas (kb_stats)
+
+Compara o tempo de cálculo de N specs estratificadas numa passada única por
+agrupamento (compute_stats) com um groupby por documento, à medida que o
+número de specs cresce. Usa um DataFrame sintético com variáveis e
+categorias extras para chegar a centenas de documentos.
+
+Uso:
+    python3 scripts/bench_stats_specs.py [--rows N] [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from kb_stats import add_derived_columns, all_groupings, compute_stats, stratified_specs
+
+
+def synthetic_df(rows: int, n_variables: int, seed: int = 42) -> pd.DataFrame:
+    """Dataset no formato do NHANES, com variáveis numéricas e categorias extras"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Idade": rng.integers(18, 81, rows),
+        "Sexo": rng.integers(1, 3, rows),
+        "Altura_cm": rng.normal(168, 10, rows).round(1),
+        "Peso_kg": rng.normal(80, 18, rows).round(1),
+        "Raca": rng.integers(1, 7, rows),
+        "Escolaridade": rng.integers(1, 6, rows),
+        "Renda": rng.integers(1, 5, rows),
+    })
+    df["IMC"] = (df["Peso_kg"] / (df["Altura_cm"] / 100) ** 2).round(1)
+    for i in range(n_variables):
+        df[f"Var{i:02d}"] = rng.normal(100, 15, rows)
+    return add_derived_columns(df)
+
+
+def naive_stats(df: pd.DataFrame, specs) -> dict:
+    """Referência: um groupby (ou agg) por spec, como o gerador antigo"""
+    results = {}
+    for spec in specs:
+        results[spec.name] = {
+            var: df.groupby(list(spec.group_by), observed=False)[var].agg(list(spec.stats)).round(2)
+            for var in spec.variables
+        }
+    return results
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do gerador declarativo de estatísticas")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    variables = ["IMC", "Peso_kg", "Altura_cm", "Idade"] + [f"Var{i:02d}" for i in range(12)]
+    groupings = all_groupings(["FaixaEtaria", "SexoNome", "Raca", "Escolaridade", "Renda"], max_size=2)
+    df = synthetic_df(args.rows, n_variables=12)
+    all_specs = stratified_specs(variables, groupings)
+    
+    results = []
+    for n_specs in (4, 16, 64, len(all_specs)):
+        specs = all_specs[:n_specs]
+        
+        # Sanidade: os dois caminhos produzem os mesmos números
+        fused = compute_stats(df, specs)
+        naive = naive_stats(df, specs)
+        for spec in specs:
+            for var in spec.variables:
+                pd.testing.assert_frame_equal(fused[spec.name][var], naive[spec.name][var], check_names=False)
+        
+        results.append({
+            "specs": n_specs,
+            "groupings": len({spec.group_by for spec in specs}),
+            "single_pass_ms": round(best_of(lambda: compute_stats(df, specs), args.repeat), 1),
+            "per_spec_ms": round(best_of(lambda: naive_stats(df, specs), args.repeat), 1),
+        })
+    
+    if args.json:
+        print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+        return
+    
+    print(f"\n📊 Stats specs benchmark ({args.rows:,} rows, best of {args.repeat})")
+    print("=" * 60)
+    print(f"{'specs':>6} {'groupings':>10} {'single pass':>13} {'per spec':>10} {'speedup':>8}")
+    for r in results:
+        speedup = r["per_spec_ms"] / r["single_pass_ms"] if r["single_pass_ms"] else 0.0
+        print(f"{r['specs']:>6} {r['groupings']:>10} {r['single_pass_ms']:>10.1f} ms "
+              f"{r['per_spec_ms']:>7.1f} ms {speedup:>7.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
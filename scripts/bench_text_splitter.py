@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Chunking: RecursiveCharacterTextSplitter vs OffsetChunker
+
+Corpus sintético montado com parágrafos da própria KB (mesma mistura de
+separadores). Mede tempo e pico de memória (tracemalloc) de:
+    langchain  RecursiveCharacterTextSplitter.split_documents (implementação anterior)
+    documents  DocumentSplitter.split_documents (Documents com offsets no metadata)
+    offsets    DocumentSplitter.split_offsets (só (doc, start, end), sem strings)
+e confere que os chunks são idênticos aos do LangChain, na KB e no corpus.
+
+Uso:
+    python3 scripts/bench_text_splitter.py [--docs 5000] [--chunk-size 500] [--chunk-overlap 50] [--json]
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+import tracemalloc
+
+from bench_utils import ROOT_DIR
+
+from document_loader import KnowledgeBaseLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from text_splitter import SEPARATORS, DocumentSplitter
+
+
+def synthetic_corpus(paragraphs, n_docs: int, seed: int = 42):
+    """Documentos de ~20-60 parágrafos sorteados da KB"""
+    rng = random.Random(seed)
+    return [
+        Document(page_content="\n\n".join(rng.choice(paragraphs) for _ in range(rng.randint(20, 60))),
+                 metadata={"source": f"https://example.org/doc/{i}", "file": f"doc_{i}.txt", "category": "synthetic"})
+        for i in range(n_docs)
+    ]
+
+
+def measure(func):
+    """(segundos, pico MB, resultado); tempo medido sem tracemalloc"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do chunking")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # avisos de chunk maior que chunk_size do LangChain
+    
+    kb_docs = KnowledgeBaseLoader(ROOT_DIR / "data" / "knowledge_base").load_documents()
+    paragraphs = [p for doc in kb_docs for p in doc.page_content.split("\n\n") if p.strip()]
+    corpus = synthetic_corpus(paragraphs, args.docs)
+    total_mb = sum(len(d.page_content) for d in corpus) / 1e6
+    
+    reference = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+                                               length_function=len, separators=SEPARATORS)
+    splitter = DocumentSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    
+    identical_kb = ([c.page_content for c in reference.split_documents(kb_docs)] ==
+                    [c.page_content for c in splitter.split_documents(kb_docs)])
+    
+    runs = {
+        "langchain": lambda: reference.split_documents(corpus),
+        "documents": lambda: splitter.split_documents(corpus),
+        "offsets": lambda: splitter.split_offsets(corpus),
+    }
+    results, outputs = {}, {}
+    for name, func in runs.items():
+        elapsed, peak, chunks = measure(func)
+        outputs[name] = chunks
+        results[name] = {"seconds": round(elapsed, 3), "peak_mb": round(peak, 1), "chunks": len(chunks),
+                         "mb_per_s": round(total_mb / elapsed, 1)}
+    
+    expected = [c.page_content for c in outputs["langchain"]]
+    identical_corpus = (
+        [c.page_content for c in outputs["documents"]] == expected
+        and [corpus[c.doc_id].page_content[c.start:c.end] for c in outputs["offsets"]] == expected
+    )
+    
+    summary = {"docs": args.docs, "mb": round(total_mb, 1), "identical_kb": identical_kb,
+               "identical_corpus": identical_corpus, "results": results}
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    
+    base = results["langchain"]
+    print(f"\n✂️  Chunking benchmark ({args.docs:,} docs, {total_mb:.1f} MB, "
+          f"chunk_size={args.chunk_size}, overlap={args.chunk_overlap})")
+    print("=" * 66)
+    print(f"{'splitter':<11} {'tempo':>9} {'MB/s':>7} {'speedup':>8} {'pico mem':>11} {'chunks':>9}")
+    for name, r in results.items():
+        print(f"{name:<11} {r['seconds']:>8.2f}s {r['mb_per_s']:>7.1f} {base['seconds'] / r['seconds']:>7.1f}x "
+              f"{r['peak_mb']:>8.1f} MB {r['chunks']:>9,}")
+    print("=" * 66)
+    print(f"Chunks idênticos ao LangChain: KB {'✅' if identical_kb else '❌'}  "
+          f"corpus {'✅' if identical_corpus else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Utilitários compartilhados pelos scripts de benchmark
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+DEFAULT_QUESTIONS = ROOT_DIR / "data" / "benchmarks" / "questions.jsonl"
+
+
+def load_questions(path=DEFAULT_QUESTIONS) -> List[dict]:
+    """Carrega o conjunto de perguntas (JSONL com question e expected_files)"""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                questions.append(json.loads(line))
+    return questions
+
+
+def open_vector_store(embeddings, kb_path: str = "data/knowledge_base",
+                      vs_path: str = "data/chroma_db"):
+    """Carrega o vector store existente ou constrói um novo a partir da KB"""
+    from document_loader import KnowledgeBaseLoader
+    from text_splitter import DocumentSplitter
+    from vector_store import VectorStoreService
+    
+    service = VectorStoreService(vs_path)
+    if (Path(vs_path) / "chroma.sqlite3").exists():
+        service.load_vectorstore(embeddings)
+    else:
+        documents = KnowledgeBaseLoader(kb_path).load_documents()
+        chunks = DocumentSplitter().split_documents(documents)
+        service.create_vectorstore(chunks, embeddings)
+    return service
+
+
+def hit(documents, expected_files) -> bool:
+    """True se algum documento recuperado vem de um dos arquivos esperados"""
+    files = {os.path.basename(doc.metadata.get("file", "")) for doc in documents}
+    return bool(files & set(expected_files))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por interpolação linear (sem numpy)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Vetores compactos: float16/int8, truncamento/PCA e rescoring
+
+Corpus sintético de embeddings (clusters gaussianos em 768 dimensões, com
+espectro decrescente como embeddings reais) e queries perto dos clusters.
+Para cada configuração do VectorIndex reporta memória residente da busca,
+latência por query e recall@k contra a busca exata em float32.
+
+Uso:
+    python3 scripts/bench_vector_compression.py [--vectors 100000] [--dim 768] [--queries 200] [--k 10] [--json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bench_utils import percentile
+
+from vector_index import VectorIndex
+
+CONFIGS = [
+    {"precision": "float32"},
+    {"precision": "float16"},
+    {"precision": "int8"},
+    {"precision": "int8", "rescore": 1},
+    {"precision": "float32", "dims": 256},
+    {"precision": "float32", "dims": 128, "projection": "pca"},
+    {"precision": "int8", "dims": 128, "projection": "pca"},
+    {"precision": "int8", "dims": 128, "projection": "pca", "rescore": 10},
+]
+
+
+def synthetic_embeddings(n: int, dim: int, n_queries: int, seed: int = 0):
+    """Clusters com variância concentrada nas primeiras direções (como embeddings de texto)"""
+    rng = np.random.default_rng(seed)
+    spectrum = (1.0 / np.sqrt(np.arange(1, dim + 1))).astype(np.float32)
+    # Base ortonormal aleatória: a variância não fica alinhada às primeiras coordenadas
+    basis, _ = np.linalg.qr(rng.standard_normal((dim, dim)).astype(np.float32))
+    centers = rng.standard_normal((max(n // 200, 1), dim)).astype(np.float32) * spectrum
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = (centers[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32) * spectrum) @ basis
+    queries = (centers[rng.integers(0, len(centers), size=n_queries)]
+               + 0.35 * rng.standard_normal((n_queries, dim)).astype(np.float32) * spectrum) @ basis
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def label(config: dict) -> str:
+    parts = [config["precision"]]
+    if config.get("dims"):
+        parts.append(f"{config.get('projection', 'truncate')}{config['dims']}")
+    if "rescore" in config:
+        parts.append(f"rescore×{config['rescore']}")
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vetores compactos")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    vectors, queries = synthetic_embeddings(args.vectors, args.dim, args.queries)
+    ids = [str(i) for i in range(len(vectors))]
+    empty = [""] * len(vectors)
+    metadatas = [{}] * len(vectors)
+    
+    exact = VectorIndex.build(vectors, ids, empty, metadatas)
+    truth = [set(exact.search(q, k=args.k)[0].tolist()) for q in queries]
+    
+    results = []
+    for config in CONFIGS:
+        start = time.perf_counter()
+        index = VectorIndex.build(vectors, ids, empty, metadatas, **config)
+        build_s = time.perf_counter() - start
+        
+        latencies, hits = [], 0
+        for q, expected in zip(queries, truth):
+            start = time.perf_counter()
+            rows, _ = index.search(q, k=args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(expected & set(rows.tolist()))
+        
+        results.append({
+            "config": label(config),
+            "memory_mb": round(index.memory_bytes() / 1e6, 1),
+            "build_s": round(build_s, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            f"recall@{args.k}": round(hits / (args.k * len(queries)), 4),
+        })
+    
+    if args.json:
+        print(json.dumps({"vectors": args.vectors, "dim": args.dim, "results": results}, indent=2))
+        return
+    
+    base = results[0]
+    print(f"\n🗜️  Vector compression benchmark ({args.vectors:,} × {args.dim}, {args.queries} queries, k={args.k})")
+    print("=" * 80)
+    print(f"{'config':<28} {'memória':>10} {'redução':>8} {'p50':>8} {'p95':>8} {'recall@' + str(args.k):>10}")
+    for r in results:
+        print(f"{r['config']:<28} {r['memory_mb']:>7.1f} MB {base['memory_mb'] / r['memory_mb']:>7.1f}x "
+              f"{r['p50_ms']:>6.2f}ms {r['p95_ms']:>6.2f}ms {r[f'recall@{args.k}']:>10.3f}")
+    print("=" * 80)
+    print("Configurações compactas reordenam a shortlist com os vetores float32 (mmap em disco no serviço).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Índice vetorial particionado (scatter-gather entre processos)
+
+Persiste um VectorIndex sintético grande, sobe ShardedIndex com 1, 2, 4...
+shards e mede a latência por query contra a busca no próprio processo,
+conferindo que o top-k intercalado é idêntico ao da busca sem shards.
+O speedup é limitado pelo número de CPUs da máquina (impresso no topo):
+com menos núcleos que shards, os processos disputam a mesma CPU.
+
+Uso:
+    python3 scripts/bench_vector_shards.py [--vectors 200000] [--dim 384] [--shards 1 2 4] [--json]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_utils import percentile
+from bench_vector_compression import synthetic_embeddings
+
+from vector_index import VectorIndex
+from vector_shards import ShardedIndex
+
+
+def measure(search, queries, k):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        rows, _ = search(q, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(rows.tolist())
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice particionado")
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--precision", default="float32")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    vectors, queries = synthetic_embeddings(args.vectors, args.dim, args.queries)
+    n = len(vectors)
+    index = VectorIndex.build(vectors, [str(i) for i in range(n)], [""] * n, [{}] * n, precision=args.precision)
+    del vectors
+    
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        base_latencies, truth = measure(index.search, queries, args.k)
+        results = [{"shards": 0, "p50_ms": round(percentile(base_latencies, 50), 2),
+                    "p95_ms": round(percentile(base_latencies, 95), 2), "startup_s": 0.0, "identical": True}]
+        
+        for n_shards in args.shards:
+            start = time.perf_counter()
+            sharded = ShardedIndex(directory, n, n_shards, rescore=index.rescore)
+            startup_s = time.perf_counter() - start
+            try:
+                latencies, found = measure(sharded.search, queries, args.k)
+            finally:
+                sharded.close()
+            results.append({
+                "shards": n_shards,
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "startup_s": round(startup_s, 2),
+                "identical": found == truth,
+            })
+    
+    if args.json:
+        print(json.dumps({"vectors": n, "dim": args.dim, "cpus": os.cpu_count(), "results": results}, indent=2))
+        return
+    
+    base = results[0]["p50_ms"]
+    print(f"\n🧩 Vector shards benchmark ({n:,} × {args.dim} {args.precision}, k={args.k}, "
+          f"{os.cpu_count()} CPU(s))")
+    print("=" * 66)
+    print(f"{'shards':<12} {'p50':>9} {'p95':>9} {'speedup':>8} {'startup':>8} {'top-k igual':>12}")
+    for r in results:
+        name = "no processo" if r["shards"] == 0 else str(r["shards"])
+        print(f"{name:<12} {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms {base / r['p50_ms']:>7.2f}x "
+              f"{r['startup_s']:>7.2f}s {str(r['identical']):>12}")
+    print("=" * 66)
+
+
+if __name__ == "__main__":
+    main()
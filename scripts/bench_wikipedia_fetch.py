@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Scraping da Wikipedia no builder (stand-in local, sem rede)
+
+Mede o tempo de scrape_all_wikipedia para N artigos: serial (uma requisição
+por vez, sem o sleep fixo antigo), concorrente com cache frio, cache quente
+(revalidação 304) e offline (só disco).
+
+Uso:
+    python3 scripts/bench_wikipedia_fetch.py [--articles 11 50 200] [--latency 0.2] [--json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+
+from build_nhanes_knowledge_base import NHANESKnowledgeBaseBuilder
+from wikipedia_standin import start_standin
+
+# Espera fixa entre artigos da versão serial original
+ORIGINAL_SLEEP = 2.0
+
+
+def timed_scrape(builder, articles) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraped = builder.scrape_all_wikipedia(articles)
+    if scraped != len(articles):
+        raise RuntimeError(f"Só {scraped}/{len(articles)} artigos salvos")
+    return time.perf_counter() - start
+
+
+def timed_serial(builder, articles) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for topic, name in articles.items():
+            builder.scrape_wikipedia(topic, name)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scraping da Wikipedia")
+    parser.add_argument("--articles", type=int, nargs="+", default=[11, 50, 200])
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência do stand-in por requisição (s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--min-interval", type=float, default=0.02)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+    
+    server, base_url = start_standin(latency=args.latency)
+    results = []
+    try:
+        for n in args.articles:
+            articles = {f"Article_{i:04d}": f"article_{i:04d}" for i in range(n)}
+            with tempfile.TemporaryDirectory() as tmp:
+                def builder(offline=False):
+                    return NHANESKnowledgeBaseBuilder(
+                        output_dir=f"{tmp}/kb", wikipedia_base_url=base_url, http_cache_dir=f"{tmp}/http",
+                        offline=offline, max_concurrency=args.concurrency, min_interval=args.min_interval,
+                    )
+                
+                serial = timed_serial(builder(), articles)
+                cold = timed_scrape(builder(), articles)
+                warm = timed_scrape(builder(), articles)
+                offline = timed_scrape(builder(offline=True), articles)
+            
+            results.append({
+                "articles": n,
+                "serial_s": round(serial, 3),
+                "serial_original_s": round(serial + ORIGINAL_SLEEP * n, 3),
+                "cold_s": round(cold, 3),
+                "warm_s": round(warm, 3),
+                "offline_s": round(offline, 3),
+                "articles_per_s_cold": round(n / cold, 1),
+            })
+    finally:
+        server.shutdown()
+    
+    if args.json:
+        print(json.dumps({"latency": args.latency, "concurrency": args.concurrency, "results": results}, indent=2))
+        return
+    
+    print(f"\n📚 Wikipedia scraping benchmark (latência {args.latency}s, {args.concurrency} por host)")
+    print("=" * 78)
+    print(f"{'artigos':>8} {'original*':>10} {'serial':>9} {'frio':>9} {'quente':>9} {'offline':>9} {'art/s':>7}")
+    for r in results:
+        print(f"{r['articles']:>8} {r['serial_original_s']:>9.1f}s {r['serial_s']:>8.2f}s {r['cold_s']:>8.2f}s "
+              f"{r['warm_s']:>8.2f}s {r['offline_s']:>8.2f}s {r['articles_per_s_cold']:>7.1f}")
+    print("=" * 78)
+    print(f"* serial + sleep fixo de {ORIGINAL_SLEEP:.0f}s por artigo (versão anterior)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Build DAG - Etapas do build com entradas/saídas declaradas e fingerprints
+
+Cada Stage declara arquivos de entrada, saídas, dependências e o código que a
+implementa. O fingerprint (sha256 do conteúdo das entradas, do código, dos
+parâmetros e das saídas das dependências) decide se a etapa roda de novo.
+Etapas independentes rodam em paralelo; o log de cada uma é impresso em bloco
+quando ela termina.
+"""
+
+import hashlib
+import inspect
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+STATE_VERSION = 1
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], object]
+    outputs: Sequence[Path]
+    inputs: Sequence[Path] = ()         # arquivos ou pastas (conteúdo entra no fingerprint)
+    deps: Sequence[str] = ()            # etapas que precisam terminar antes
+    code: Sequence[object] = ()         # funções/módulos cujo código entra no fingerprint
+    params: dict = field(default_factory=dict)
+
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """sys.stdout que manda o print de cada thread de etapa para um buffer próprio"""
+    
+    def __init__(self, target):
+        self.target = target
+        self.local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.target).write(text)
+    
+    def flush(self):
+        self.target.flush()
+
+
+class FileHasher:
+    """sha256 de arquivos, reaproveitado enquanto tamanho e mtime não mudam"""
+    
+    def __init__(self, cache: Optional[dict] = None):
+        self.cache = cache or {}
+        self.lock = threading.Lock()
+    
+    def file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached and cached[:2] == signature:
+            return cached[2]
+        
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with self.lock:
+            self.cache[key] = signature + [digest.hexdigest()]
+        return digest.hexdigest()
+    
+    def tree_hash(self, paths: Sequence[Path]) -> str:
+        """Hash de arquivos e pastas (caminho relativo + conteúdo); ausentes contam como ausentes"""
+        digest = hashlib.sha256()
+        for root in paths:
+            root = Path(root)
+            if root.is_dir():
+                files = sorted(p for p in root.rglob("*") if p.is_file())
+                for path in files:
+                    digest.update(f"{path.relative_to(root.parent)}={self.file_hash(path)}\n".encode())
+            elif root.is_file():
+                digest.update(f"{root.name}={self.file_hash(root)}\n".encode())
+            else:
+                digest.update(f"{root}=missing\n".encode())
+        return digest.hexdigest()
+
+
+def _code_hash(objects: Sequence[object]) -> str:
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BuildGraph:
+    """
+    Executa etapas em ordem topológica, em paralelo, pulando as inalteradas
+
+    O estado (fingerprints + cache de hashes) fica em state_dir/build_state.json
+    e o relatório da última execução em state_dir/build_report.json.
+    """
+    
+    def __init__(self, stages: Sequence[Stage], state_dir="data/cache/build", max_workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_dir = Path(state_dir)
+        self.max_workers = max_workers or len(self.stages) or 1
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Etapa '{stage.name}' depende de etapa inexistente '{dep}'")
+        self._check_cycles()
+        
+        self.state = self._load_state()
+        self.hasher = FileHasher(self.state.get("files"))
+    
+    def _check_cycles(self):
+        visiting, done = set(), set()
+        
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependências envolvendo '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+        
+        for name in self.stages:
+            visit(name)
+    
+    def _load_state(self) -> dict:
+        path = self.state_dir / "build_state.json"
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                return state
+        return {"version": STATE_VERSION, "stages": {}, "files": {}}
+    
+    def _save(self, report: dict):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state["files"] = self.hasher.cache
+        with open(self.state_dir / "build_state.json", "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        with open(self.state_dir / "build_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    def fingerprint(self, stage: Stage) -> str:
+        """Entradas + código + parâmetros + saídas das dependências"""
+        payload = {
+            "inputs": self.hasher.tree_hash(stage.inputs),
+            "code": _code_hash(stage.code),
+            "params": stage.params,
+            "deps": {dep: self.state["stages"].get(dep, {}).get("outputs_hash") for dep in stage.deps},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _is_fresh(self, stage: Stage, fingerprint: str) -> bool:
+        previous = self.state["stages"].get(stage.name)
+        return bool(
+            previous
+            and previous.get("fingerprint") == fingerprint
+            # Saídas editadas ou apagadas à mão também forçam a reexecução
+            and previous.get("outputs_hash") == self.hasher.tree_hash(stage.outputs)
+        )
+    
+    def _run_stage(self, stage: Stage, force: bool, stdout: _ThreadLocalStdout) -> dict:
+        start = time.perf_counter()
+        fingerprint = self.fingerprint(stage)
+        if not force and self._is_fresh(stage, fingerprint):
+            return {"stage": stage.name, "status": "skipped", "seconds": round(time.perf_counter() - start, 4),
+                    "result": self.state["stages"][stage.name].get("result"), "log": ""}
+        
+        stdout.local.buffer = io.StringIO()
+        try:
+            result = stage.func()
+            status = "built"
+        except Exception as e:
+            print(f"  ❌ Stage {stage.name} failed: {e}")
+            result, status = None, "failed"
+        finally:
+            log = stdout.local.buffer.getvalue()
+            stdout.local.buffer = None
+        
+        if status == "built":
+            self.state["stages"][stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs_hash": self.hasher.tree_hash(stage.outputs),
+                "result": result if isinstance(result, (int, float, str, type(None))) else str(result),
+            }
+        return {"stage": stage.name, "status": status, "seconds": round(time.perf_counter() - start, 4),
+                "result": result if status == "built" else None, "log": log}
+    
+    def run(self, force: bool = False) -> dict:
+        """Roda o grafo; etapas cujas dependências falharam são marcadas como 'blocked'"""
+        start = time.perf_counter()
+        stdout = _ThreadLocalStdout(sys.stdout)
+        sys.stdout = stdout
+        
+        results: Dict[str, dict] = {}
+        pending = dict(self.stages)
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                while pending or running:
+                    for name, stage in list(pending.items()):
+                        dep_status = [results.get(dep, {}).get("status") for dep in stage.deps]
+                        if any(s in ("failed", "blocked") for s in dep_status):
+                            results[name] = {"stage": name, "status": "blocked", "seconds": 0.0,
+                                             "result": None, "log": ""}
+                            del pending[name]
+                        elif all(s in ("built", "skipped") for s in dep_status):
+                            running[pool.submit(self._run_stage, stage, force, stdout)] = name
+                            del pending[name]
+                    
+                    if not running:
+                        continue
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        result = future.result()
+                        results[running.pop(future)] = result
+                        stdout.target.write(result["log"])
+        finally:
+            sys.stdout = stdout.target
+        
+        report = {
+            "seconds": round(time.perf_counter() - start, 4),
+            "stages": [
+                {k: v for k, v in results[name].items() if k != "log"} for name in self.stages
+            ],
+        }
+        self._save(report)
+        return report
+
+
+def print_build_report(report: dict):
+    icons = {"built": "🔨", "skipped": "⏭️ ", "failed": "❌", "blocked": "⛔"}
+    print(f"\n  {'Etapa':<12} {'Status':<10} {'Tempo':>9}  Resultado")
+    for stage in report["stages"]:
+        print(f"  {stage['stage']:<12} {icons[stage['status']]} {stage['status']:<7} "
+              f"{stage['seconds']:>8.3f}s  {stage['result'] if stage['result'] is not None else '-'}")
+    print(f"  Total: {report['seconds']:.3f}s")
+
@@ -5,23 +5,78 @@ Gera documentos a partir de: Wikipedia + Papers + CSV + Conceitos
 
 Uso:
     python3 build_nhanes_knowledge_base.py
+    python3 build_nhanes_knowledge_base.py --xpt-dir data/raw/xpt --cycles 2015-2016 2017-2018
 """
 
+import argparse
+import asyncio
+import json
 import os
+import sys
 import time
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 from pathlib import Path
 
+# kb_archive e document_loader ficam em src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import html_extract
+import kb_archive
+import kb_stats
+import nhanes_ingest
+from build_dag import BuildGraph, Stage, print_build_report
+from html_extract import BACKENDS, DEFAULT_BACKEND, extract_many, extract_text
+from http_cache import CachedFetcher, HostRateLimiter, HTTPCache
+from kb_archive import default_archive_path, write_archive
+from kb_stats import (STATS_SPECS, add_derived_columns, compute_stats, render_document,
+                      required_columns, stats_table_rows)
+from nhanes_ingest import available_cycles, ingest_cycles, load_cycles, parquet_columns, partition_path, print_report
+
+
+STATS_TABLE_FILE = "stats_table.json"
+
+# Ciclo descrito pelos documentos de estatísticas
+STATS_CYCLE = "2015-2016"
+
+WIKIPEDIA_URL = "https://en.wikipedia.org/wiki"
+
+WIKIPEDIA_ARTICLES = {
+    "National_Health_and_Nutrition_Examination_Survey": "nhanes_overview",
+    "Body_mass_index": "body_mass_index",
+    "Obesity": "obesity",
+    "Overweight": "overweight",
+    "Linear_regression": "linear_regression",
+    "Ordinary_least_squares": "ols_regression",
+    "Coefficient_of_determination": "r_squared",
+    "Normal_distribution": "normal_distribution",
+    "Statistical_hypothesis_testing": "hypothesis_testing",
+    "Epidemiology": "epidemiology",
+    "Public_health": "public_health",
+}
+
 
 class NHANESKnowledgeBaseBuilder:
     """Builder para Knowledge Base sobre NHANES e Estatística"""
     
-    def __init__(self, output_dir="data/knowledge_base", csv_path="data/raw/nhanes_2015_2016.csv"):
+    def __init__(self, output_dir="data/knowledge_base", csv_path="data/raw/nhanes_2015_2016.csv",
+                 parquet_dir="data/cache/nhanes_parquet", wikipedia_base_url=None,
+                 http_cache_dir="data/cache/http", offline=False, max_concurrency=4, min_interval=0.2,
+                 parser_backend=DEFAULT_BACKEND, parse_workers=None, state_dir="data/cache/build"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.csv_path = csv_path
+        self.parquet_dir = Path(parquet_dir)
+        
+        # Wikipedia: URL base configurável (stand-in local em testes) e cache HTTP
+        self.wikipedia_base_url = (wikipedia_base_url or os.getenv("WIKIPEDIA_BASE_URL") or WIKIPEDIA_URL).rstrip("/")
+        self.http_cache_dir = Path(http_cache_dir)
+        self.offline = offline
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.parser_backend = parser_backend
+        self.parse_workers = parse_workers
+        self.state_dir = Path(state_dir)
         
         self.session = requests.Session()
         self.session.headers.update({
@@ -32,68 +87,79 @@ class NHANESKnowledgeBaseBuilder:
     # WIKIPEDIA SCRAPING
     # =========================================================================
     
+    def _save_wikipedia(self, topic, output_name, text):
+        """Salvar o artigo como documento (False se o conteúdo for curto demais)"""
+        if not text or len(text) <= 500:
+            return False
+        
+        output_path = self.output_dir / "wikipedia" / f"{output_name}.txt"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Source sempre com a URL pública (mesmo usando um stand-in local)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"Source: {WIKIPEDIA_URL}/{topic}\n")
+            f.write(f"Topic: {topic.replace('_', ' ')}\n\n")
+            f.write(text[:15000])
+        
+        print(f"  ✅ Saved: {output_name}.txt ({len(text)} chars)")
+        return True
+    
     def scrape_wikipedia(self, topic, output_name):
         """Scrape artigo da Wikipedia"""
-        url = f"https://en.wikipedia.org/wiki/{topic}"
+        url = f"{self.wikipedia_base_url}/{topic}"
         try:
             print(f"  📄 Wikipedia: {topic}")
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for tag in soup(['script', 'style', 'sup', 'table', 'img']):
-                tag.decompose()
-            
-            content = soup.find('div', {'id': 'mw-content-text'})
-            if not content:
-                return False
-            
-            paragraphs = content.find_all('p')
-            text = '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-            
-            if len(text) > 500:
-                output_path = self.output_dir / "wikipedia" / f"{output_name}.txt"
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(f"Source: {url}\n")
-                    f.write(f"Topic: {topic.replace('_', ' ')}\n\n")
-                    f.write(text[:15000])
-                
-                print(f"  ✅ Saved: {output_name}.txt ({len(text)} chars)")
-                return True
-            return False
+            text = extract_text(response.content, self.parser_backend)
+            return self._save_wikipedia(topic, output_name, text)
         except Exception as e:
             print(f"  ❌ Error: {e}")
             return False
     
-    def scrape_all_wikipedia(self):
-        """Scrape todos os artigos relevantes da Wikipedia"""
+    def scrape_all_wikipedia(self, articles=None):
+        """
+        Scrape todos os artigos relevantes da Wikipedia
+
+        Downloads em paralelo com limite por host e cache HTTP em disco
+        (revalidação por ETag/Last-Modified). Com offline=True só o cache é usado.
+        """
         print("\n📚 WIKIPEDIA ARTICLES")
         print("=" * 50)
         
-        articles = {
-            "National_Health_and_Nutrition_Examination_Survey": "nhanes_overview",
-            "Body_mass_index": "body_mass_index",
-            "Obesity": "obesity",
-            "Overweight": "overweight",
-            "Linear_regression": "linear_regression",
-            "Ordinary_least_squares": "ols_regression",
-            "Coefficient_of_determination": "r_squared",
-            "Normal_distribution": "normal_distribution",
-            "Statistical_hypothesis_testing": "hypothesis_testing",
-            "Epidemiology": "epidemiology",
-            "Public_health": "public_health",
-        }
+        articles = articles or WIKIPEDIA_ARTICLES
+        fetcher = CachedFetcher(
+            cache=HTTPCache(self.http_cache_dir),
+            limiter=HostRateLimiter(self.max_concurrency, self.min_interval),
+            mode="offline" if self.offline else "online",
+            headers=dict(self.session.headers),
+        )
+        
+        start = time.perf_counter()
+        urls = [f"{self.wikipedia_base_url}/{topic}" for topic in articles]
+        try:
+            results = asyncio.run(fetcher.fetch_all(urls))
+        finally:
+            fetcher.close()
+        
+        # Parsing (CPU-bound) separado do download, num pool de processos
+        pages = [r.content for r in results if not isinstance(r, Exception)]
+        texts = iter(extract_many(pages, self.parser_backend, self.parse_workers)) if pages else iter(())
         
         success = 0
-        for topic, name in articles.items():
-            if self.scrape_wikipedia(topic, name):
+        cached = 0
+        for (topic, name), result in zip(articles.items(), results):
+            print(f"  📄 Wikipedia: {topic}")
+            if isinstance(result, Exception):
+                print(f"  ❌ Error: {result}")
+                continue
+            cached += result.from_cache
+            if self._save_wikipedia(topic, name, next(texts)):
                 success += 1
-            time.sleep(2)
         
-        print(f"\n✅ Wikipedia: {success}/{len(articles)} articles scraped")
+        elapsed = time.perf_counter() - start
+        print(f"\n✅ Wikipedia: {success}/{len(articles)} articles scraped "
+              f"({cached} from cache, {elapsed:.2f}s)")
         return success
     
     # =========================================================================
@@ -501,154 +567,84 @@ Source: Análise de Dados
     # ESTATÍSTICAS DO CSV
     # =========================================================================
     
-    def generate_csv_stats(self):
-        """Gerar documentos de estatísticas a partir do CSV NHANES"""
+    def ingest_xpt(self, xpt_dir, cycles=None, chunksize=50_000, force=False):
+        """Converter arquivos XPT (DEMO + BMX) de um ou mais ciclos em cache Parquet"""
+        print("\n📦 XPT INGESTION")
+        print("=" * 50)
+        
+        report = ingest_cycles(xpt_dir, self.parquet_dir, cycles, chunksize=chunksize, force=force)
+        print_report(report)
+        
+        print(f"\n✅ XPT: {len(report['cycles'])} cycles in {self.parquet_dir}")
+        return report
+    
+    def _load_dataset(self, columns):
+        """
+        Carrega só as colunas necessárias: cache Parquet (se o ciclo foi ingerido) ou CSV
+
+        Returns:
+            (DataFrame, total de colunas disponíveis, fonte) ou None
+        """
+        if STATS_CYCLE in available_cycles(self.parquet_dir):
+            df = load_cycles(self.parquet_dir, columns, [STATS_CYCLE])
+            n_columns = len(parquet_columns(self.parquet_dir, STATS_CYCLE))
+            return df, n_columns, str(partition_path(self.parquet_dir, STATS_CYCLE))
+        
+        if os.path.exists(self.csv_path):
+            n_columns = len(pd.read_csv(self.csv_path, nrows=0).columns)
+            return pd.read_csv(self.csv_path, usecols=columns), n_columns, str(self.csv_path)
+        
+        return None
+    
+    def generate_csv_stats(self, specs=None):
+        """
+        Gerar documentos de estatísticas a partir do CSV NHANES
+
+        Args:
+            specs: Lista de StatsSpec (padrão: STATS_SPECS). Todas as specs
+                   são calculadas numa única passada por agrupamento.
+        """
         print("\n📊 CSV STATISTICS")
         print("=" * 50)
         
-        if not os.path.exists(self.csv_path):
+        specs = STATS_SPECS if specs is None else specs
+        loaded = self._load_dataset(required_columns(specs))
+        if loaded is None:
             print(f"  ⚠️  CSV não encontrado: {self.csv_path}")
-            print("  ℹ️  Coloque o arquivo nhanes_2015_2016.csv em data/raw/")
+            print("  ℹ️  Coloque o arquivo nhanes_2015_2016.csv em data/raw/ (ou use --xpt-dir)")
             return 0
+        df, n_columns, source = loaded
         
         stats_dir = self.output_dir / "estatisticas"
         stats_dir.mkdir(parents=True, exist_ok=True)
         
-        df = pd.read_csv(self.csv_path)
         df = df[df['Idade'] >= 18].copy()
         
-        print(f"  📂 Loaded: {len(df):,} records")
-        
-        docs_created = 0
-        
-        # 1. Resumo Geral
-        resumo = f"""# NHANES 2015-2016 - Resumo do Dataset
-
-Source: data/raw/nhanes_2015_2016.csv
-
-## Informações Gerais
-- Total de registros (adultos): {len(df):,}
-- Variáveis disponíveis: {len(df.columns)}
-
-## Estatísticas Descritivas
-
-### IMC (Índice de Massa Corporal)
-- N: {df['IMC'].notna().sum():,}
-- Média: {df['IMC'].mean():.2f}
-- Mediana: {df['IMC'].median():.2f}
-- Desvio Padrão: {df['IMC'].std():.2f}
-- Mínimo: {df['IMC'].min():.2f}
-- Máximo: {df['IMC'].max():.2f}
-
-### Peso (kg)
-- Média: {df['Peso_kg'].mean():.2f}
-- Mediana: {df['Peso_kg'].median():.2f}
-- Desvio Padrão: {df['Peso_kg'].std():.2f}
-
-### Altura (cm)
-- Média: {df['Altura_cm'].mean():.2f}
-- Mediana: {df['Altura_cm'].median():.2f}
-- Desvio Padrão: {df['Altura_cm'].std():.2f}
-"""
-        
-        with open(stats_dir / "resumo_geral.txt", 'w', encoding='utf-8') as f:
-            f.write(resumo)
-        print("  ✅ Created: resumo_geral.txt")
-        docs_created += 1
+        print(f"  📂 Loaded: {len(df):,} records ({len(df.columns)}/{n_columns} columns from {source})")
         
-        # 2. IMC por Faixa Etária
-        df['FaixaEtaria'] = pd.cut(df['Idade'], 
-                                    bins=[18, 29, 44, 59, 120],
-                                    labels=['18-29', '30-44', '45-59', '60+'])
+        results = compute_stats(add_derived_columns(df), specs)
         
-        imc_idade = df.groupby('FaixaEtaria')['IMC'].agg(['count', 'mean', 'median', 'std']).round(2)
-        
-        imc_doc = f"""# IMC por Faixa Etária - NHANES 2015-2016
-
-Source: data/raw/nhanes_2015_2016.csv
-
-## Estatísticas por Grupo
-
-| Faixa Etária | N | Média | Mediana | DP |
-|--------------|---|-------|---------|-----|
-"""
-        for idx, row in imc_idade.iterrows():
-            imc_doc += f"| {idx} | {int(row['count']):,} | {row['mean']:.2f} | {row['median']:.2f} | {row['std']:.2f} |\n"
-        
-        imc_doc += f"""
-## Interpretação
-
-A faixa etária **45-59 anos** apresenta o maior IMC médio, 
-classificado como **obesidade** segundo a OMS (IMC ≥ 30).
-
-### Classificação OMS do IMC
-- < 18.5: Baixo peso
-- 18.5 - 24.9: Normal
-- 25.0 - 29.9: Sobrepeso
-- ≥ 30.0: Obesidade
-"""
-        
-        with open(stats_dir / "imc_por_idade.txt", 'w', encoding='utf-8') as f:
-            f.write(imc_doc)
-        print("  ✅ Created: imc_por_idade.txt")
-        docs_created += 1
-        
-        # 3. Peso por Sexo
-        sexo_map = {1: 'Masculino', 2: 'Feminino'}
-        df['SexoNome'] = df['Sexo'].map(sexo_map)
-        peso_sexo = df.groupby('SexoNome')['Peso_kg'].agg(['count', 'mean', 'median', 'std']).round(2)
-        
-        peso_doc = f"""# Peso por Sexo - NHANES 2015-2016
-
-Source: data/raw/nhanes_2015_2016.csv
-
-## Estatísticas por Sexo
-
-| Sexo | N | Média (kg) | Mediana (kg) | DP |
-|------|---|------------|--------------|-----|
-"""
-        for idx, row in peso_sexo.iterrows():
-            peso_doc += f"| {idx} | {int(row['count']):,} | {row['mean']:.2f} | {row['median']:.2f} | {row['std']:.2f} |\n"
-        
-        with open(stats_dir / "peso_por_sexo.txt", 'w', encoding='utf-8') as f:
-            f.write(peso_doc)
-        print("  ✅ Created: peso_por_sexo.txt")
-        docs_created += 1
-        
-        # 4. Correlações
-        corr_vars = ['Idade', 'Altura_cm', 'Peso_kg', 'IMC']
-        corr_matrix = df[corr_vars].corr().round(3)
-        
-        corr_doc = f"""# Matriz de Correlação - NHANES 2015-2016
-
-Source: data/raw/nhanes_2015_2016.csv
-
-## Correlações de Pearson
-
-|  | Idade | Altura | Peso | IMC |
-|--|-------|--------|------|-----|
-| Idade | 1.000 | {corr_matrix.loc['Idade', 'Altura_cm']:.3f} | {corr_matrix.loc['Idade', 'Peso_kg']:.3f} | {corr_matrix.loc['Idade', 'IMC']:.3f} |
-| Altura | {corr_matrix.loc['Altura_cm', 'Idade']:.3f} | 1.000 | {corr_matrix.loc['Altura_cm', 'Peso_kg']:.3f} | {corr_matrix.loc['Altura_cm', 'IMC']:.3f} |
-| Peso | {corr_matrix.loc['Peso_kg', 'Idade']:.3f} | {corr_matrix.loc['Peso_kg', 'Altura_cm']:.3f} | 1.000 | {corr_matrix.loc['Peso_kg', 'IMC']:.3f} |
-| IMC | {corr_matrix.loc['IMC', 'Idade']:.3f} | {corr_matrix.loc['IMC', 'Altura_cm']:.3f} | {corr_matrix.loc['IMC', 'Peso_kg']:.3f} | 1.000 |
-
-## Interpretação
-
-### Correlações Fortes (|r| > 0.5)
-- **Peso × IMC**: Muito forte (esperado)
-- **Altura × Peso**: Moderada a forte
-
-### Classificação de Cohen
-- |r| < 0.1: Desprezível
-- |r| 0.1 - 0.3: Fraca
-- |r| 0.3 - 0.5: Moderada
-- |r| > 0.5: Forte
-"""
-        
-        with open(stats_dir / "correlacoes.txt", 'w', encoding='utf-8') as f:
-            f.write(corr_doc)
-        print("  ✅ Created: correlacoes.txt")
-        docs_created += 1
+        docs_created = 0
+        table_rows = []
+        
+        for spec in specs:
+            text = render_document(spec, results[spec.name], n_records=len(df), n_columns=n_columns)
+            with open(stats_dir / f"{spec.name}.txt", 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"  ✅ Created: {spec.name}.txt")
+            docs_created += 1
+            table_rows += stats_table_rows(spec, results[spec.name])
+        
+        # Tabela estruturada (fast path de perguntas estatísticas, sem LLM)
+        stats_table = {
+            "source": source,
+            "population": "adultos 18+",
+            "n_records": int(len(df)),
+            "rows": table_rows,
+        }
+        with open(stats_dir / STATS_TABLE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(stats_table, f, ensure_ascii=False, indent=2)
+        print(f"  ✅ Created: {STATS_TABLE_FILE} ({len(table_rows)} rows)")
         
         print(f"\n✅ CSV Stats: {docs_created} documents created")
         return docs_created
@@ -657,26 +653,74 @@ Source: data/raw/nhanes_2015_2016.csv
     # RUN ALL
     # =========================================================================
     
-    def run_all(self):
-        """Executar todo o build da Knowledge Base"""
+    def _wikipedia_stage(self):
+        scraped = self.scrape_all_wikipedia()
+        if scraped == 0:
+            # Sem nenhum artigo (rede/cache indisponível): etapa falha e roda de novo no próximo build
+            raise RuntimeError("nenhum artigo da Wikipedia foi salvo")
+        return scraped
+    
+    def build_stages(self, xpt_dir=None, cycles=None, chunksize=50_000):
+        """Etapas do build com entradas, saídas, código e dependências declarados"""
+        cls = NHANESKnowledgeBaseBuilder
+        cycles = list(cycles or [STATS_CYCLE])
+        
+        stages = [
+            Stage("wikipedia", self._wikipedia_stage,
+                  outputs=[self.output_dir / "wikipedia"],
+                  code=[cls.scrape_all_wikipedia, cls._save_wikipedia, html_extract],
+                  params={"articles": WIKIPEDIA_ARTICLES, "base_url": self.wikipedia_base_url}),
+            Stage("papers", self.create_paper_summaries,
+                  outputs=[self.output_dir / "papers"],
+                  code=[cls.create_paper_summaries]),
+            Stage("concepts", self.create_concept_docs,
+                  outputs=[self.output_dir / "conceitos"],
+                  code=[cls.create_concept_docs]),
+            Stage("stats", self.generate_csv_stats,
+                  inputs=[Path(self.csv_path), partition_path(self.parquet_dir, STATS_CYCLE)],
+                  outputs=[self.output_dir / "estatisticas"],
+                  code=[cls.generate_csv_stats, cls._load_dataset, kb_stats],
+                  deps=["ingest"] if xpt_dir else []),
+            # Arquivo único com toda a KB, lido pelo loader e por /api/sources
+            Stage("archive", lambda: write_archive(self.output_dir)["documents"],
+                  inputs=[self.output_dir],
+                  outputs=[default_archive_path(self.output_dir)],
+                  deps=["wikipedia", "papers", "concepts", "stats"],
+                  code=[kb_archive]),
+        ]
+        if xpt_dir:
+            stages.append(Stage(
+                "ingest", lambda: self.ingest_xpt(xpt_dir, cycles, chunksize=chunksize)["rows"],
+                inputs=[Path(xpt_dir)],
+                outputs=[partition_path(self.parquet_dir, cycle).parent for cycle in cycles],
+                code=[cls.ingest_xpt, nhanes_ingest],
+                params={"cycles": cycles},
+            ))
+        return stages
+    
+    def run_all(self, force=False, xpt_dir=None, cycles=None, workers=None, chunksize=50_000):
+        """
+        Executar todo o build da Knowledge Base
+
+        As etapas independentes rodam em paralelo e as que não tiveram entradas,
+        código ou dependências alterados são puladas (force=True refaz tudo).
+        """
         print("\n" + "=" * 60)
         print("🚀 BUILDING NHANES KNOWLEDGE BASE")
         print("=" * 60)
         
-        total = 0
-        
-        total += self.scrape_all_wikipedia()
-        total += self.create_paper_summaries()
-        total += self.create_concept_docs()
-        total += self.generate_csv_stats()
+        graph = BuildGraph(self.build_stages(xpt_dir, cycles, chunksize), state_dir=self.state_dir, max_workers=workers)
+        report = graph.run(force=force)
         
         print("\n" + "=" * 60)
         print("✅ KNOWLEDGE BASE BUILD COMPLETE!")
         print("=" * 60)
         
+        print_build_report(report)
+        
         total_files = sum(1 for _ in self.output_dir.rglob('*.txt'))
         
-        print(f"📊 Total documents: {total_files}")
+        print(f"\n📊 Total documents: {total_files}")
         print(f"📁 Location: {self.output_dir}")
         
         print("\n📂 Breakdown:")
@@ -691,5 +735,23 @@ Source: data/raw/nhanes_2015_2016.csv
 
 
 if __name__ == "__main__":
-    builder = NHANESKnowledgeBaseBuilder()
-    builder.run_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build da Knowledge Base NHANES")
+    parser.add_argument("--xpt-dir", help="Pasta com os XPT do NHANES (DEMO_I.XPT, BMX_I.XPT, ...)")
+    parser.add_argument("--cycles", nargs="+", default=[STATS_CYCLE], help="Ciclos a ingerir (ex.: 2015-2016 2017-2018)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Linhas por chunk na leitura dos XPT")
+    parser.add_argument("--ingest-only", action="store_true", help="Só converter os XPT em Parquet")
+    parser.add_argument("--wikipedia-url", help="URL base dos artigos (padrão: WIKIPEDIA_BASE_URL ou en.wikipedia.org)")
+    parser.add_argument("--offline", action="store_true", help="Usar só o cache HTTP (sem rede)")
+    parser.add_argument("--parser", default=DEFAULT_BACKEND, choices=list(BACKENDS),
+                        help="Backend de parsing do HTML (lxml é mais rápido, mas difere em HTML inválido)")
+    parser.add_argument("--force", action="store_true", help="Refazer todas as etapas, mesmo sem mudanças")
+    parser.add_argument("--workers", type=int, help="Etapas em paralelo (padrão: todas)")
+    args = parser.parse_args()
+    
+    builder = NHANESKnowledgeBaseBuilder(wikipedia_base_url=args.wikipedia_url, offline=args.offline,
+                                         parser_backend=args.parser)
+    if args.ingest_only:
+        builder.ingest_xpt(args.xpt_dir, args.cycles, chunksize=args.chunksize, force=args.force)
+    else:
+        builder.run_all(force=args.force, xpt_dir=args.xpt_dir, cycles=args.cycles, workers=args.workers,
+                        chunksize=args.chunksize)
\ No newline at end of file
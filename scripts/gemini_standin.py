@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Stand-in local da API do Gemini para testes de carga e latência do serviço
+
+Serve os endpoints REST v1beta usados pelo SDK google-generativeai:
+    GET  /v1beta/models                              (list_models do GeminiService)
+    POST /v1beta/models/<m>:embedContent             (GeminiEmbeddings)
+    POST /v1beta/models/<m>:batchEmbedContents
+    POST /v1beta/models/<m>:generateContent          (GeminiService)
+    POST /v1beta/models/<m>:streamGenerateContent    (array JSON em pedaços)
+    GET  /stats                                      (contadores do stand-in)
+
+Respostas determinísticas: embeddings do HashingEmbeddings (o mesmo texto gera
+sempre o mesmo vetor, com vizinhança lexical que faz sentido para o retrieval) e
+respostas montadas a partir da pergunta e do contexto do prompt. Latência
+(fixa, uniforme ou lognormal), taxa de erro e limite de requisições por minuto
+(429 RESOURCE_EXHAUSTED) são configuráveis; os sorteios usam uma semente fixa.
+
+Uso:
+    python3 scripts/gemini_standin.py [--port 8766] [--generate-latency 0.8] [--error-rate 0.01] [--rpm 60]
+    GEMINI_BASE_URL=http://127.0.0.1:8766 GEMINI_API_KEY=standin python3 start_api.py
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# local_embeddings fica em src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from local_embeddings import HashingEmbeddings
+
+GENERATE_MODEL = "models/gemini-standin"
+EMBED_MODEL = "models/embedding-001"
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+ERROR_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def sample_latency(rng: random.Random, mean: float, distribution: str, jitter: float) -> float:
+    """Latência em segundos com média `mean`; `jitter` = amplitude relativa (uniform) ou sigma (lognormal)"""
+    if mean <= 0:
+        return 0.0
+    if distribution == "uniform":
+        return rng.uniform(mean * (1 - jitter), mean * (1 + jitter))
+    if distribution == "lognormal":
+        # mu = -sigma²/2 mantém a média; a cauda longa aparece no p99
+        return mean * rng.lognormvariate(-jitter ** 2 / 2, jitter)
+    return mean
+
+
+def prompt_text(body: dict) -> str:
+    """Texto concatenado de todas as partes de `contents`"""
+    return "\n".join(part.get("text", "") for content in body.get("contents", [])
+                     for part in content.get("parts", []))
+
+
+def answer_for(prompt: str, words: int) -> str:
+    """Resposta determinística: a pergunta do PROMPT_TEMPLATE + as primeiras palavras do contexto"""
+    match = re.search(r"PERGUNTA:\s*(.*?)\s*RESPOSTA:", prompt, re.S)
+    question = match.group(1).strip() if match else prompt.strip()[:200]
+    n_sources = len(re.findall(r"\[Fonte \d+\]", prompt))
+    context = re.sub(r"\[Fonte \d+\]:", " ", prompt.split("PERGUNTA:")[0].split("CONTEXTO:")[-1])
+    excerpt = " ".join(context.split()[:words])
+    return f"(stand-in) {question} — com base em {n_sources} fonte(s): {excerpt}".strip()
+
+
+def candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}]}
+
+
+class GeminiStandinHandler(BaseHTTPRequestHandler):
+    # Sobrescritos por start_standin (uma subclasse por servidor)
+    embed_latency = 0.0
+    generate_latency = 0.0
+    distribution = "fixed"
+    jitter = 0.0
+    error_rate = 0.0
+    error_status = 500
+    rpm = 0
+    answer_words = 60
+    stream_chunk_words = 8
+    stream_delay = 0.0
+    embeddings = None
+    rng = None
+    window = None
+    stats = None
+    _lock = threading.Lock()
+    
+    def _send_json(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, status: int, message: str, headers=None):
+        self._send_json(status, {"error": {"code": status, "message": message,
+                                           "status": ERROR_STATUS.get(status, "UNKNOWN")}}, headers)
+    
+    def _admit(self, method: str):
+        """Conta a requisição e decide (sob lock) se ela sofre rate limit ou erro injetado"""
+        cls = type(self)
+        with self._lock:
+            cls.stats["requests"][method] = cls.stats["requests"].get(method, 0) + 1
+            if cls.rpm:
+                now = time.monotonic()
+                while cls.window and now - cls.window[0] >= 60:
+                    cls.window.popleft()
+                if len(cls.window) >= cls.rpm:
+                    cls.stats["rate_limited"] += 1
+                    return 429, max(1, int(60 - (now - cls.window[0]) + 0.999))
+                cls.window.append(now)
+            if cls.error_rate and cls.rng.random() < cls.error_rate:
+                cls.stats["errors"] += 1
+                return cls.error_status, None
+            latency = self.embed_latency if "mbed" in method else self.generate_latency
+            return None, sample_latency(cls.rng, latency, self.distribution, self.jitter)
+    
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/stats":
+            with self._lock:
+                self._send_json(200, type(self).stats)
+            return
+        models = [
+            {"name": GENERATE_MODEL, "displayName": "Gemini stand-in", "version": "standin",
+             "supportedGenerationMethods": ["generateContent", "countTokens"]},
+            {"name": EMBED_MODEL, "displayName": "Embedding stand-in", "version": "standin",
+             "supportedGenerationMethods": ["embedContent"]},
+        ]
+        if path == "/v1beta/models":
+            self._send_json(200, {"models": models})
+            return
+        for model in models:
+            if path == f"/v1beta/{model['name']}":
+                self._send_json(200, model)
+                return
+        self._send_error(404, f"not found: {path}")
+    
+    def do_POST(self):
+        match = re.fullmatch(r"/v1beta/models/([^:/]+):(\w+)", self.path.split("?")[0])
+        if not match:
+            self._send_error(404, f"not found: {self.path}")
+            return
+        method = match.group(2)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        
+        status, value = self._admit(method)
+        if status == 429:
+            self._send_error(429, "Resource has been exhausted (stand-in rpm limit).",
+                             {"Retry-After": str(value)})
+            return
+        if status:
+            self._send_error(status, "Injected stand-in error.")
+            return
+        time.sleep(value)
+        
+        if method == "embedContent":
+            text = " ".join(part.get("text", "") for part in body.get("content", {}).get("parts", []))
+            self._send_json(200, {"embedding": {"values": self.embeddings.embed_query(text)}})
+        elif method == "batchEmbedContents":
+            texts = [" ".join(part.get("text", "") for part in request.get("content", {}).get("parts", []))
+                     for request in body.get("requests", [])]
+            self._send_json(200, {"embeddings": [{"values": v} for v in self.embeddings.embed_documents(texts)]})
+        elif method == "generateContent":
+            self._send_json(200, candidate(answer_for(prompt_text(body), self.answer_words)))
+        elif method == "streamGenerateContent":
+            self._stream(answer_for(prompt_text(body), self.answer_words))
+        else:
+            self._send_error(404, f"method not supported by the stand-in: {method}")
+    
+    def _stream(self, answer: str):
+        """Array JSON escrito pedaço a pedaço (formato do streaming REST), sem Content-Length"""
+        words = answer.split(" ")
+        pieces = [" ".join(words[i:i + self.stream_chunk_words]) + " "
+                  for i in range(0, len(words), self.stream_chunk_words)]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.end_headers()
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.stream_delay)
+            self.wfile.write(("[" if i == 0 else ",\n").encode("utf-8"))
+            self.wfile.write(json.dumps(candidate(piece)).encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"]")
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_standin(port: int = 0, embed_latency: float = 0.0, generate_latency: float = 0.0,
+                  distribution: str = "fixed", jitter: float = 0.0, error_rate: float = 0.0,
+                  error_status: int = 500, rpm: int = 0, answer_words: int = 60,
+                  stream_chunk_words: int = 8, stream_delay: float = 0.0, dim: int = 768, seed: int = 0):
+    """Sobe o stand-in numa thread; retorna (server, base_url). Encerrar com server.shutdown()"""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution deve ser uma de {DISTRIBUTIONS}, recebido '{distribution}'")
+    handler = type("Handler", (GeminiStandinHandler,), {
+        "embed_latency": embed_latency, "generate_latency": generate_latency,
+        "distribution": distribution, "jitter": jitter,
+        "error_rate": error_rate, "error_status": error_status, "rpm": rpm,
+        "answer_words": answer_words, "stream_chunk_words": stream_chunk_words, "stream_delay": stream_delay,
+        "embeddings": HashingEmbeddings(dim=dim), "rng": random.Random(seed), "window": deque(),
+        "stats": {"requests": {}, "errors": 0, "rate_limited": 0},
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in local da API do Gemini")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Latência média do embedding (s)")
+    parser.add_argument("--generate-latency", type=float, default=0.8, help="Latência média da geração (s)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="Amplitude relativa (uniform) ou sigma (lognormal) da latência")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de requisições com erro")
+    parser.add_argument("--error-status", type=int, choices=[500, 503], default=500)
+    parser.add_argument("--rpm", type=int, default=0, help="Requisições por minuto antes do 429 (0 = sem limite)")
+    parser.add_argument("--answer-words", type=int, default=60, help="Palavras do contexto na resposta")
+    parser.add_argument("--stream-chunk-words", type=int, default=8)
+    parser.add_argument("--stream-delay", type=float, default=0.05, help="Intervalo entre pedaços do streaming (s)")
+    parser.add_argument("--dim", type=int, default=768, help="Dimensão dos embeddings")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    options = {key: value for key, value in vars(args).items() if key != "port"}
+    server, base_url = start_standin(args.port, **options)
+    print(f"🤖 Gemini stand-in: {base_url} (geração {args.generate_latency}s {args.distribution}, "
+          f"erros {args.error_rate:.0%}, rpm {args.rpm or '∞'}) — Ctrl+C para sair")
+    print(f"   GEMINI_BASE_URL={base_url} GEMINI_API_KEY=standin")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,116 @@
+"""
+HTML Extract - Texto dos parágrafos de artigos da Wikipedia, com backends plugáveis
+
+O extrator original (BeautifulSoup com html.parser) remove
+script/style/sup/table/img, pega a primeira div#mw-content-text e junta o
+texto dos <p> não vazios com linha em branco; é o padrão. lxml é opt-in: em
+HTML bem formado gera o mesmo texto, mas fecha o <p> em aninhamentos
+inválidos (<p>Texto <div>x</div> fim</p> vira "Texto", não "Texto x fim"; <p>
+sem fechamento também muda), então o texto pode diferir em páginas reais.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml.html
+except ImportError:  # lxml é opcional
+    lxml = None
+
+
+REMOVED_TAGS = ['script', 'style', 'sup', 'table', 'img']
+
+Markup = Union[bytes, str]
+
+
+def _extract_bs4(html: Markup, features: str) -> Optional[str]:
+    soup = BeautifulSoup(html, features)
+    
+    for tag in soup(REMOVED_TAGS):
+        tag.decompose()
+    
+    content = soup.find('div', {'id': 'mw-content-text'})
+    if not content:
+        return None
+    
+    paragraphs = content.find_all('p')
+    return '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+
+
+def _extract_lxml(html: Markup) -> Optional[str]:
+    # Mesma detecção de encoding do BeautifulSoup para bytes
+    if isinstance(html, bytes):
+        html = UnicodeDammit(html, is_html=True).unicode_markup
+    root = lxml.html.document_fromstring(html)
+    
+    # drop_tree remove o elemento e o conteúdo, preservando o texto que vem depois (tail),
+    # como decompose() no BeautifulSoup
+    for element in list(root.iter(*REMOVED_TAGS)):
+        element.drop_tree()
+    
+    content = root.xpath("(//div[@id='mw-content-text'])[1]")
+    if not content:
+        return None
+    
+    texts = (str(p.text_content()).strip() for p in content[0].iter('p'))
+    return '\n\n'.join(text for text in texts if text)
+
+
+BACKENDS: Dict[str, Callable[[Markup], Optional[str]]] = {
+    "html.parser": partial(_extract_bs4, features="html.parser"),
+}
+if lxml is not None:
+    BACKENDS["lxml"] = _extract_lxml
+    BACKENDS["bs4-lxml"] = partial(_extract_bs4, features="lxml")
+
+# O extrator original; lxml (mais rápido) só com --parser lxml
+DEFAULT_BACKEND = "html.parser"
+
+
+def extract_text(html: Markup, backend: str = DEFAULT_BACKEND) -> Optional[str]:
+    """Texto dos parágrafos do artigo (None se não houver div#mw-content-text)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend indisponível: {backend} (use {', '.join(BACKENDS)})")
+    return BACKENDS[backend](html)
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def extract_many(
+    pages: Sequence[Markup],
+    backend: str = DEFAULT_BACKEND,
+    workers: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Extrai várias páginas num pool de processos (parsing é CPU-bound)
+
+    Os processos saem de um forkserver (spawn onde não há), nunca de fork: o
+    build chama isto de uma thread do DAG enquanto outras etapas rodam, e um
+    fork copiaria locks presos por essas threads.
+
+    Args:
+        pages: HTML de cada página (bytes ou str)
+        backend: Nome em BACKENDS
+        workers: Processos (padrão: CPUs; 1 = sem pool)
+
+    Returns:
+        Textos na mesma ordem de `pages`
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend indisponível: {backend} (use {', '.join(BACKENDS)})")
+    
+    workers = min(workers or os.cpu_count() or 1, len(pages))
+    if workers <= 1:
+        return [extract_text(page, backend) for page in pages]
+    
+    chunksize = max(1, len(pages) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        return list(pool.map(partial(extract_text, backend=backend), pages, chunksize=chunksize))
@@ -0,0 +1,175 @@
+"""
+HTTP Cache - Downloads assíncronos com limite por host e cache em disco
+
+O cache guarda corpo + ETag/Last-Modified de cada URL e revalida com
+If-None-Match/If-Modified-Since (304 = reaproveita o corpo). No modo offline
+só o cache é usado, então builds e testes rodam sem rede.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+MODES = ("online", "offline", "refresh")
+
+
+class OfflineCacheMiss(Exception):
+    """URL pedida no modo offline sem resposta em cache"""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    content: bytes
+    from_cache: bool = False   # corpo veio do disco (offline ou 304)
+    revalidated: bool = False  # servidor respondeu 304 Not Modified
+    elapsed: float = 0.0
+
+
+class HostRateLimiter:
+    """
+    Limite de cortesia por host: N requisições simultâneas e intervalo mínimo
+    entre inícios de requisição (hosts diferentes não esperam uns pelos outros)
+    """
+    
+    def __init__(self, max_concurrency: int = 4, min_interval: float = 0.1):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+    
+    def _host_state(self, host: str):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+            self._locks[host] = asyncio.Lock()
+        return self._semaphores[host], self._locks[host]
+    
+    async def acquire(self, url: str):
+        host = urlsplit(url).netloc
+        semaphore, lock = self._host_state(host)
+        await semaphore.acquire()
+        
+        # Espaça os inícios de requisição no mesmo host
+        async with lock:
+            wait = self._last_start.get(host, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+    
+    def release(self, url: str):
+        self._semaphores[urlsplit(url).netloc].release()
+
+
+class HTTPCache:
+    """Respostas em disco: <sha256>.body + <sha256>.json (url, status, etag, last_modified)"""
+    
+    def __init__(self, cache_dir="data/cache/http"):
+        self.cache_dir = Path(cache_dir)
+    
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+    
+    def get(self, url: str) -> Optional[dict]:
+        body_path, meta_path = self._paths(url)
+        if not (body_path.exists() and meta_path.exists()):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["content"] = body_path.read_bytes()
+        return meta
+    
+    def put(self, url: str, status: int, content: bytes, headers):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        body_path.write_bytes(content)
+        meta = {
+            "url": url,
+            "status": status,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+
+class CachedFetcher:
+    """
+    Busca várias URLs em paralelo (asyncio + requests em threads)
+
+    Modos:
+        online: usa o cache com revalidação condicional
+        offline: só o cache (OfflineCacheMiss se faltar)
+        refresh: ignora o cache e baixa tudo de novo
+    """
+    
+    def __init__(
+        self,
+        cache: Optional[HTTPCache] = None,
+        limiter: Optional[HostRateLimiter] = None,
+        mode: str = "online",
+        timeout: float = 15,
+        headers: Optional[dict] = None
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Modo inválido: {mode} (use {', '.join(MODES)})")
+        self.cache = cache or HTTPCache()
+        self.limiter = limiter or HostRateLimiter()
+        self.mode = mode
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_maxsize=max(self.limiter.max_concurrency, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    async def fetch(self, url: str) -> FetchResult:
+        start = time.perf_counter()
+        cached = self.cache.get(url) if self.mode != "refresh" else None
+        
+        if self.mode == "offline":
+            if cached is None:
+                raise OfflineCacheMiss(f"Sem cache para {url} (modo offline)")
+            return FetchResult(url, cached["status"], cached["content"], from_cache=True,
+                               elapsed=time.perf_counter() - start)
+        
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        await self.limiter.acquire(url)
+        try:
+            response = await asyncio.to_thread(self.session.get, url, headers=headers, timeout=self.timeout)
+        finally:
+            self.limiter.release(url)
+        
+        if response.status_code == 304 and cached:
+            return FetchResult(url, cached["status"], cached["content"], from_cache=True, revalidated=True,
+                               elapsed=time.perf_counter() - start)
+        
+        response.raise_for_status()
+        self.cache.put(url, response.status_code, response.content, response.headers)
+        return FetchResult(url, response.status_code, response.content, elapsed=time.perf_counter() - start)
+    
+    async def fetch_all(self, urls: Sequence[str]) -> List:
+        """Resultados na ordem de `urls`; falhas voltam como a exceção correspondente"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+    
+    def close(self):
+        self.session.close()
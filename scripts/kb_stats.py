@@ -0,0 +1,361 @@
+"""
+Estatísticas declarativas da Knowledge Base
+
+Cada documento de estatísticas é descrito por um StatsSpec (variáveis,
+agrupamento, estatísticas e template). compute_stats agrupa as specs e faz
+uma única agregação por agrupamento distinto (mais uma matriz de correlação),
+em vez de um groupby por documento.
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+SOURCE = "data/raw/nhanes_2015_2016.csv"
+
+# Colunas derivadas (mesmas faixas de src/stats_engine.py)
+DERIVED_COLUMNS = {
+    "FaixaEtaria": {"from": "Idade", "bins": [18, 29, 44, 59, 120],
+                    "labels": ['18-29', '30-44', '45-59', '60+']},
+    "SexoNome": {"from": "Sexo", "map": {1: 'Masculino', 2: 'Feminino'}},
+}
+
+# Nome do agrupamento na stats table (lida pelo StatsRouter)
+TABLE_GROUP_NAMES = {"SexoNome": "Sexo"}
+
+VARIABLE_LABELS = {"IMC": "IMC", "Peso_kg": "Peso (kg)", "Altura_cm": "Altura (cm)", "Idade": "Idade"}
+
+GROUP_LABELS = {"FaixaEtaria": "Faixa Etária", "SexoNome": "Sexo"}
+
+STAT_LABELS = {"count": "N", "mean": "Média", "median": "Mediana", "std": "DP",
+               "min": "Mínimo", "max": "Máximo"}
+
+
+@dataclass
+class StatsSpec:
+    """Um documento de estatísticas: variáveis x agrupamento x estatísticas"""
+    name: str
+    variables: Sequence[str]
+    group_by: Tuple[str, ...] = ()
+    stats: Sequence[str] = ("count", "mean", "median", "std")
+    kind: str = "grouped"  # summary | grouped | correlation
+    decimals: Optional[int] = 2  # arredondamento antes de renderizar
+    template: Optional[str] = None  # None = template genérico
+    row_template: str = "| {group} | {count:,} | {mean:.2f} | {median:.2f} | {std:.2f} |"
+    title: str = ""
+
+
+RESUMO_TEMPLATE = """# NHANES 2015-2016 - Resumo do Dataset
+
+Source: data/raw/nhanes_2015_2016.csv
+
+## Informações Gerais
+- Total de registros (adultos): {n_records:,}
+- Variáveis disponíveis: {n_columns}
+
+## Estatísticas Descritivas
+
+### IMC (Índice de Massa Corporal)
+- N: {IMC_count:,}
+- Média: {IMC_mean:.2f}
+- Mediana: {IMC_median:.2f}
+- Desvio Padrão: {IMC_std:.2f}
+- Mínimo: {IMC_min:.2f}
+- Máximo: {IMC_max:.2f}
+
+### Peso (kg)
+- Média: {Peso_kg_mean:.2f}
+- Mediana: {Peso_kg_median:.2f}
+- Desvio Padrão: {Peso_kg_std:.2f}
+
+### Altura (cm)
+- Média: {Altura_cm_mean:.2f}
+- Mediana: {Altura_cm_median:.2f}
+- Desvio Padrão: {Altura_cm_std:.2f}
+"""
+
+IMC_IDADE_TEMPLATE = """# IMC por Faixa Etária - NHANES 2015-2016
+
+Source: data/raw/nhanes_2015_2016.csv
+
+## Estatísticas por Grupo
+
+| Faixa Etária | N | Média | Mediana | DP |
+|--------------|---|-------|---------|-----|
+{rows}
+## Interpretação
+
+A faixa etária **45-59 anos** apresenta o maior IMC médio, 
+classificado como **obesidade** segundo a OMS (IMC ≥ 30).
+
+### Classificação OMS do IMC
+- < 18.5: Baixo peso
+- 18.5 - 24.9: Normal
+- 25.0 - 29.9: Sobrepeso
+- ≥ 30.0: Obesidade
+"""
+
+PESO_SEXO_TEMPLATE = """# Peso por Sexo - NHANES 2015-2016
+
+Source: data/raw/nhanes_2015_2016.csv
+
+## Estatísticas por Sexo
+
+| Sexo | N | Média (kg) | Mediana (kg) | DP |
+|------|---|------------|--------------|-----|
+{rows}"""
+
+CORRELACOES_TEMPLATE = """# Matriz de Correlação - NHANES 2015-2016
+
+Source: data/raw/nhanes_2015_2016.csv
+
+## Correlações de Pearson
+
+|  | Idade | Altura | Peso | IMC |
+|--|-------|--------|------|-----|
+| Idade | 1.000 | {Idade_Altura_cm:.3f} | {Idade_Peso_kg:.3f} | {Idade_IMC:.3f} |
+| Altura | {Altura_cm_Idade:.3f} | 1.000 | {Altura_cm_Peso_kg:.3f} | {Altura_cm_IMC:.3f} |
+| Peso | {Peso_kg_Idade:.3f} | {Peso_kg_Altura_cm:.3f} | 1.000 | {Peso_kg_IMC:.3f} |
+| IMC | {IMC_Idade:.3f} | {IMC_Altura_cm:.3f} | {IMC_Peso_kg:.3f} | 1.000 |
+
+## Interpretação
+
+### Correlações Fortes (|r| > 0.5)
+- **Peso × IMC**: Muito forte (esperado)
+- **Altura × Peso**: Moderada a forte
+
+### Classificação de Cohen
+- |r| < 0.1: Desprezível
+- |r| 0.1 - 0.3: Fraca
+- |r| 0.3 - 0.5: Moderada
+- |r| > 0.5: Forte
+"""
+
+STATS_SPECS = [
+    StatsSpec(
+        name="resumo_geral",
+        kind="summary",
+        variables=["IMC", "Peso_kg", "Altura_cm", "Idade"],
+        stats=["count", "mean", "median", "std", "min", "max"],
+        decimals=None,
+        template=RESUMO_TEMPLATE,
+    ),
+    StatsSpec(
+        name="imc_por_idade",
+        variables=["IMC"],
+        group_by=("FaixaEtaria",),
+        template=IMC_IDADE_TEMPLATE,
+    ),
+    StatsSpec(
+        name="peso_por_sexo",
+        variables=["Peso_kg"],
+        group_by=("SexoNome",),
+        template=PESO_SEXO_TEMPLATE,
+    ),
+    StatsSpec(
+        name="correlacoes",
+        kind="correlation",
+        variables=["Idade", "Altura_cm", "Peso_kg", "IMC"],
+        decimals=3,
+        template=CORRELACOES_TEMPLATE,
+    ),
+]
+
+
+def stratified_specs(
+    variables: Sequence[str],
+    groupings: Sequence[Sequence[str]],
+    stats: Sequence[str] = ("count", "mean", "median", "std")
+) -> List[StatsSpec]:
+    """Gera uma spec (template genérico) para cada variável x agrupamento"""
+    specs = []
+    for variable in variables:
+        for group_by in groupings:
+            suffix = "_".join(g.lower() for g in group_by)
+            specs.append(StatsSpec(
+                name=f"{variable.lower()}_por_{suffix}",
+                variables=[variable],
+                group_by=tuple(group_by),
+                stats=tuple(stats),
+            ))
+    return specs
+
+
+def all_groupings(columns: Sequence[str], max_size: int = 2) -> List[Tuple[str, ...]]:
+    """Todos os agrupamentos com até `max_size` colunas"""
+    return [combo for size in range(1, max_size + 1) for combo in combinations(columns, size)]
+
+
+def required_columns(specs: Sequence[StatsSpec]) -> List[str]:
+    """Colunas do dataset usadas pelas specs (inclui a origem das colunas derivadas)"""
+    columns = ["Idade"]  # filtro de adultos
+    for spec in specs:
+        for col in list(spec.variables) + list(spec.group_by):
+            col = DERIVED_COLUMNS[col]["from"] if col in DERIVED_COLUMNS else col
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Adiciona as colunas derivadas (faixas e rótulos) declaradas em DERIVED_COLUMNS"""
+    for name, rule in DERIVED_COLUMNS.items():
+        if rule["from"] not in df.columns:
+            continue
+        if "bins" in rule:
+            df[name] = pd.cut(df[rule["from"]], bins=rule["bins"], labels=rule["labels"])
+        else:
+            df[name] = df[rule["from"]].map(rule["map"])
+    return df
+
+
+# =============================================================================
+# CÁLCULO
+# =============================================================================
+
+def _aggregate(data, stats: Sequence[str]):
+    """
+    Uma chamada vetorizada por estatística cobrindo todas as colunas
+
+    data.agg([...]) itera coluna x estatística; count()/mean()/... calculam
+    todas as colunas de uma vez. Índice/colunas resultantes: (variável, estatística).
+    """
+    if isinstance(data, pd.DataFrame):
+        # Sem agrupamento: Series indexada por (variável, estatística)
+        return pd.concat({stat: getattr(data, stat)() for stat in stats}).swaplevel()
+    return pd.concat({stat: getattr(data, stat)() for stat in stats}, axis=1).swaplevel(axis=1)
+
+
+def compute_stats(df: pd.DataFrame, specs: Sequence[StatsSpec]) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Calcula todas as specs com o mínimo de passadas sobre o DataFrame
+
+    Returns:
+        {spec.name: {variável: DataFrame grupos x estatísticas}}; para
+        correlações, {spec.name: {"corr": matriz}}
+    """
+    # Plano: união de variáveis e estatísticas por agrupamento distinto
+    plans: Dict[Tuple[str, ...], Tuple[List[str], List[str]]] = {}
+    corr_vars: List[str] = []
+    for spec in specs:
+        if spec.kind == "correlation":
+            corr_vars += [v for v in spec.variables if v not in corr_vars]
+            continue
+        variables, stats = plans.setdefault(tuple(spec.group_by), ([], []))
+        variables += [v for v in spec.variables if v not in variables]
+        stats += [s for s in spec.stats if s not in stats]
+    
+    frames = {}
+    for group_by, (variables, stats) in plans.items():
+        if group_by:
+            frames[group_by] = _aggregate(df.groupby(list(group_by), observed=False)[variables], stats)
+        else:
+            # Sem agrupamento: uma linha "Total"
+            overall = _aggregate(df[variables], stats)
+            frames[group_by] = pd.DataFrame([overall], index=["Total"])
+    corr = df[corr_vars].corr() if corr_vars else None
+    
+    results = {}
+    for spec in specs:
+        if spec.kind == "correlation":
+            matrix = corr.loc[list(spec.variables), list(spec.variables)]
+            results[spec.name] = {"corr": matrix.round(spec.decimals) if spec.decimals is not None else matrix}
+            continue
+        
+        frame = frames[tuple(spec.group_by)]
+        per_variable = {}
+        for variable in spec.variables:
+            table = frame[variable][list(spec.stats)]
+            per_variable[variable] = table.round(spec.decimals) if spec.decimals is not None else table
+        results[spec.name] = per_variable
+    return results
+
+
+# =============================================================================
+# RENDERIZAÇÃO
+# =============================================================================
+
+def _group_label(group) -> str:
+    return " / ".join(str(g) for g in group) if isinstance(group, tuple) else str(group)
+
+
+def _row_values(table: pd.DataFrame) -> List[dict]:
+    rows = []
+    for group, values in zip(table.index, table.to_dict("records")):
+        if "count" in values:
+            values["count"] = int(values["count"])
+        values["group"] = _group_label(group)
+        rows.append(values)
+    return rows
+
+
+def _render_generic(spec: StatsSpec, result: Dict[str, pd.DataFrame]) -> str:
+    groups = " e ".join(GROUP_LABELS.get(g, g) for g in spec.group_by)
+    title = spec.title or " / ".join(VARIABLE_LABELS.get(v, v) for v in spec.variables) + (
+        f" por {groups}" if groups else "")
+    
+    header = [groups or "Grupo"] + [STAT_LABELS.get(s, s) for s in spec.stats]
+    lines = [f"# {title} - NHANES 2015-2016", "", f"Source: {SOURCE}", ""]
+    for variable, table in result.items():
+        lines += [f"## {VARIABLE_LABELS.get(variable, variable)}", "",
+                  "| " + " | ".join(header) + " |",
+                  "|" + "|".join("---" for _ in header) + "|"]
+        for row in _row_values(table):
+            cells = [row["group"]] + [
+                f"{row[s]:,}" if s == "count" else f"{row[s]:.2f}" for s in spec.stats
+            ]
+            lines.append("| " + " | ".join(cells) + " |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_document(spec: StatsSpec, result: dict, n_records: int, n_columns: int) -> str:
+    """Renderiza o texto do documento a partir do resultado da spec"""
+    if spec.kind == "correlation":
+        matrix = result["corr"]
+        values = {f"{a}_{b}": matrix.loc[a, b] for a in matrix.index for b in matrix.columns}
+        return spec.template.format(**values)
+    
+    if spec.kind == "summary":
+        values = {"n_records": n_records, "n_columns": n_columns}
+        for variable, table in result.items():
+            for stat, value in table.iloc[0].items():
+                values[f"{variable}_{stat}"] = int(value) if stat == "count" else value
+        return spec.template.format(**values)
+    
+    if spec.template is None:
+        return _render_generic(spec, result)
+    
+    rows = "".join(
+        spec.row_template.format(**row) + "\n"
+        for table in result.values()
+        for row in _row_values(table)
+    )
+    return spec.template.format(rows=rows)
+
+
+def stats_table_rows(spec: StatsSpec, result: dict) -> List[dict]:
+    """Linhas da stats table (formato lido pelo StatsRouter)"""
+    rows = []
+    if spec.kind == "correlation":
+        matrix = result["corr"]
+        for var in matrix.index:
+            for other in matrix.columns:
+                if var != other:
+                    rows.append({"variable": var, "group_by": None, "group": "Total",
+                                 "statistic": "corr", "with": other,
+                                 "value": float(matrix.loc[var, other])})
+        return rows
+    
+    group_by = ",".join(TABLE_GROUP_NAMES.get(g, g) for g in spec.group_by) or None
+    for variable, table in result.items():
+        for group, values in table.iterrows():
+            for statistic, value in values.items():
+                if pd.notna(value):
+                    rows.append({"variable": variable, "group_by": group_by,
+                                 "group": _group_label(group), "statistic": statistic,
+                                 "value": round(float(value), 3)})
+    return rows
@@ -0,0 +1,229 @@
+"""
+Ingestão NHANES - Arquivos XPT (SAS transport) -> cache Parquet por ciclo
+
+Cada componente (DEMO, BMX) é lido em chunks com pd.read_sas, mantendo só as
+colunas usadas e já convertidas para tipos compactos. Os componentes são
+unidos por SEQN e gravados em data/cache/nhanes_parquet/cycle=<ciclo>/.
+Builds seguintes leem só as colunas necessárias do Parquet.
+"""
+
+import json
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+
+INGEST_VERSION = 1
+
+# Ciclo -> sufixo dos arquivos (DEMO_I.XPT, BMX_I.XPT, ...)
+CYCLES = {
+    "1999-2000": "",
+    "2001-2002": "B",
+    "2003-2004": "C",
+    "2005-2006": "D",
+    "2007-2008": "E",
+    "2009-2010": "F",
+    "2011-2012": "G",
+    "2013-2014": "H",
+    "2015-2016": "I",
+    "2017-2018": "J",
+}
+
+# Componente -> {variável NHANES: coluna do dataset}
+COMPONENTS = {
+    "DEMO": {"SEQN": "SEQN", "RIDAGEYR": "Idade", "RIAGENDR": "Sexo"},
+    "BMX": {"SEQN": "SEQN", "BMXHT": "Altura_cm", "BMXWT": "Peso_kg", "BMXBMI": "IMC"},
+}
+
+# Tipos compactos (XPT guarda tudo como float64)
+DTYPES = {
+    "SEQN": "int32",
+    "Idade": "float32",
+    "Sexo": "Int8",
+    "Altura_cm": "float32",
+    "Peso_kg": "float32",
+    "IMC": "float32",
+}
+
+PARTITION_FILE = "part-0.parquet"
+META_FILE = "meta.json"
+
+
+def find_xpt(xpt_dir: Path, component: str, cycle: str) -> Path:
+    """Arquivo XPT do componente no ciclo (ex.: DEMO_I.XPT), sem diferenciar maiúsculas"""
+    suffix = CYCLES[cycle]
+    name = f"{component}_{suffix}.xpt" if suffix else f"{component}.xpt"
+    
+    # Também aceita subpasta por ciclo (xpt_dir/2015-2016/DEMO_I.XPT)
+    for folder in (xpt_dir / cycle, xpt_dir):
+        if folder.is_dir():
+            for path in folder.iterdir():
+                if path.name.lower() == name.lower():
+                    return path
+    raise FileNotFoundError(f"XPT não encontrado: {name} ({cycle}) em {xpt_dir}")
+
+
+def partition_path(cache_dir, cycle: str) -> Path:
+    return Path(cache_dir) / f"cycle={cycle}" / PARTITION_FILE
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    for col, dtype in DTYPES.items():
+        if col in df.columns:
+            # Inteiros: SEQN (sem ausentes) e códigos categóricos (Int8 aceita NaN)
+            values = df[col] if dtype.startswith("float") else df[col].round()
+            df[col] = values.astype(dtype)
+    return df
+
+
+def read_component(path: Path, columns: Dict[str, str], chunksize: int = 50_000) -> pd.DataFrame:
+    """
+    Lê um XPT em chunks, projetando e convertendo cada chunk antes de acumular
+
+    Só as colunas de `columns` (já renomeadas e compactadas) ficam em memória;
+    o arquivo inteiro em float64 nunca é materializado.
+    """
+    parts = []
+    with pd.read_sas(path, format="xport", chunksize=chunksize) as reader:
+        for chunk in reader:
+            missing = [c for c in columns if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Colunas ausentes em {path.name}: {', '.join(missing)}")
+            parts.append(_downcast(chunk[list(columns)].rename(columns=columns)))
+    
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(columns.values()))
+
+
+def _fingerprint(paths: Sequence[Path]) -> dict:
+    files = {p.name: [p.stat().st_size, p.stat().st_mtime_ns] for p in paths}
+    return {"files": files, "components": COMPONENTS, "version": INGEST_VERSION}
+
+
+def ingest_cycle(xpt_dir, cache_dir, cycle: str, chunksize: int = 50_000, force: bool = False) -> dict:
+    """
+    Converte um ciclo (DEMO + BMX) em Parquet; pula se o cache já corresponde aos XPT
+
+    Returns:
+        Relatório do ciclo: linhas, colunas, segundos, pico de memória e tamanho
+    """
+    xpt_dir = Path(xpt_dir)
+    out_path = partition_path(cache_dir, cycle)
+    meta_path = out_path.parent / META_FILE
+    
+    sources = {component: find_xpt(xpt_dir, component, cycle) for component in COMPONENTS}
+    fingerprint = _fingerprint(list(sources.values()))
+    
+    if not force and out_path.exists() and meta_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") == fingerprint:
+            return dict(meta["report"], skipped=True)
+    
+    start = time.perf_counter()
+    tracemalloc.reset_peak()
+    
+    merged = None
+    for component, columns in COMPONENTS.items():
+        frame = read_component(sources[component], columns, chunksize=chunksize)
+        # DEMO é a base (todos os participantes); exames entram por SEQN
+        merged = frame if merged is None else merged.merge(frame, on="SEQN", how="left")
+    
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    merged.to_parquet(out_path, index=False)
+    
+    report = {
+        "cycle": cycle,
+        "rows": int(len(merged)),
+        "columns": list(merged.columns),
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 1),
+        "in_memory_mb": round(merged.memory_usage(deep=True).sum() / 1e6, 2),
+        "xpt_mb": round(sum(p.stat().st_size for p in sources.values()) / 1e6, 2),
+        "parquet_mb": round(out_path.stat().st_size / 1e6, 2),
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "report": report}, f, indent=2)
+    
+    return dict(report, skipped=False)
+
+
+def ingest_cycles(
+    xpt_dir,
+    cache_dir: str = "data/cache/nhanes_parquet",
+    cycles: Optional[Sequence[str]] = None,
+    chunksize: int = 50_000,
+    force: bool = False
+) -> dict:
+    """Ingestão de vários ciclos com relatório de tempo e pico de memória"""
+    cycles = list(cycles or ["2015-2016"])
+    unknown = [c for c in cycles if c not in CYCLES]
+    if unknown:
+        raise ValueError(f"Ciclos desconhecidos: {', '.join(unknown)} (use {', '.join(CYCLES)})")
+    
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    
+    start = time.perf_counter()
+    try:
+        reports = [ingest_cycle(xpt_dir, cache_dir, cycle, chunksize, force) for cycle in cycles]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    
+    report = {
+        "cycles": reports,
+        "rows": sum(r["rows"] for r in reports),
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_mb": max((r["peak_mb"] for r in reports if not r["skipped"]), default=0.0),
+        # Pico do processo inteiro (ru_maxrss em KB no Linux)
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    with open(Path(cache_dir) / "ingest_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def available_cycles(cache_dir) -> List[str]:
+    """Ciclos já convertidos para Parquet, em ordem cronológica"""
+    return [c for c in CYCLES if partition_path(cache_dir, c).exists()]
+
+
+def load_cycles(cache_dir, columns: Optional[Sequence[str]] = None, cycles: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lê só as colunas pedidas dos ciclos em cache (todos, por padrão)
+
+    Com mais de um ciclo, a coluna "Ciclo" identifica a origem de cada linha.
+    """
+    cycles = list(cycles or available_cycles(cache_dir))
+    if not cycles:
+        raise FileNotFoundError(f"Nenhum ciclo NHANES em cache: {cache_dir}")
+    
+    frames = []
+    for cycle in cycles:
+        frame = pd.read_parquet(partition_path(cache_dir, cycle), columns=list(columns) if columns else None)
+        if len(cycles) > 1:
+            frame["Ciclo"] = cycle
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def parquet_columns(cache_dir, cycle: str) -> List[str]:
+    """Colunas disponíveis no Parquet de um ciclo (lê só o schema)"""
+    import pyarrow.parquet as pq
+    return pq.read_schema(partition_path(cache_dir, cycle)).names
+
+
+def print_report(report: dict):
+    print(f"  {'Ciclo':<10} {'Linhas':>8} {'Tempo':>8} {'Pico':>9} {'XPT':>9} {'Parquet':>9}")
+    for r in report["cycles"]:
+        status = " (cache)" if r["skipped"] else ""
+        print(f"  {r['cycle']:<10} {r['rows']:>8,} {r['seconds']:>7.2f}s {r['peak_mb']:>6.1f} MB "
+              f"{r['xpt_mb']:>6.1f} MB {r['parquet_mb']:>6.2f} MB{status}")
+    print(f"  Total: {report['rows']:,} linhas em {report['seconds']:.2f}s, "
+          f"pico {report['peak_mb']:.1f} MB (RSS máx. do processo {report['max_rss_mb']:.0f} MB)")
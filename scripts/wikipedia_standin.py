@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Stand-in local da Wikipedia para testes e benchmarks do builder
+
+Serve /wiki/<Tópico> com HTML no formato da Wikipedia (div#mw-content-text),
+ETag e Last-Modified determinísticos, respostas 304 para requisições
+condicionais e latência artificial configurável.
+
+Uso:
+    python3 scripts/wikipedia_standin.py [--port 8765] [--latency 0.3]
+    python3 scripts/build_nhanes_knowledge_base.py --wikipedia-url http://127.0.0.1:8765/wiki
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# Data fixa: Last-Modified não muda entre execuções
+LAST_MODIFIED = formatdate(1_700_000_000, usegmt=True)
+
+
+def article_html(topic: str) -> bytes:
+    """HTML determinístico de um artigo (parágrafos suficientes para passar do mínimo do builder)"""
+    title = topic.replace("_", " ")
+    paragraphs = "".join(
+        f"<p>{title} — parágrafo {i}. Texto de teste gerado pelo stand-in local, "
+        f"com conteúdo estável para que o cache e a revalidação possam ser verificados.</p>"
+        for i in range(1, 9)
+    )
+    return (
+        f"<html><head><title>{title}</title><script>var x = 1;</script></head><body>"
+        f"<h1>{title}</h1><div id=\"mw-content-text\">{paragraphs}"
+        f"<table><tr><td>infobox</td></tr></table></div></body></html>"
+    ).encode("utf-8")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests_served = 0
+    not_modified = 0
+    _lock = threading.Lock()
+    
+    def do_GET(self):
+        if not self.path.startswith("/wiki/"):
+            self.send_error(404)
+            return
+        
+        time.sleep(self.latency)
+        body = article_html(unquote(self.path[len("/wiki/"):]))
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        
+        with self._lock:
+            type(self).requests_served += 1
+        
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            with self._lock:
+                type(self).not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_standin(port: int = 0, latency: float = 0.0):
+    """Sobe o stand-in numa thread; retorna (server, base_url). Encerrar com server.shutdown()"""
+    handler = type("Handler", (StandinHandler,), {"latency": latency, "requests_served": 0, "not_modified": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/wiki"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in local da Wikipedia")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Latência artificial por requisição (s)")
+    args = parser.parse_args()
+    
+    server, base_url = start_standin(args.port, args.latency)
+    print(f"🌐 Wikipedia stand-in: {base_url} (latência {args.latency}s) — Ctrl+C para sair")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
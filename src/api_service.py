@@ -2,18 +2,23 @@
 ASK NHANES - REST API com FastAPI
 """
 
+import hmac
 import os
 import sys
 from datetime import datetime
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
 # Adicionar src ao path
 sys.path.insert(0, os.path.dirname(__file__))
 
+from config import settings
+from profiling import MemoryTracker, profile_call, sample_stacks
 from rag_pipeline import RAGPipeline
 
 # =============================================================================
@@ -23,14 +28,34 @@ from rag_pipeline import RAGPipeline
 class QuestionRequest(BaseModel):
     """Request para pergunta"""
     question: str = Field(..., min_length=3, max_length=500, description="Pergunta do usuário")
-    k: int = Field(default=3, ge=1, le=10, description="Número de documentos a recuperar")
+    k: int = Field(default=settings.RETRIEVAL_K, ge=1, le=10, description="Número de documentos a recuperar")
+    adaptive: bool = Field(default=False, description="Escolher k pela distribuição dos scores (ignora k)")
+    hybrid: bool = Field(default=False, description="Busca híbrida BM25 + vetorial")
+    mmr: bool = Field(default=False, description="Diversificar os chunks (Maximal Marginal Relevance)")
+    fast_path: bool = Field(default=False, description="Responder estatísticas direto da stats table (opt-in)")
+    category: Optional[str] = Field(default=None, description="Buscar só numa categoria: wikipedia, papers, conceitos, estatisticas")
+    source: Optional[str] = Field(default=None, description="Buscar só numa fonte (como aparece em sources)")
 
 class AnswerResponse(BaseModel):
     """Response com resposta"""
     answer: str
     sources: list[str]
     num_sources: int
+    k_used: int
+    cutoff_reason: str
+    route: str
     processing_time: float
+    timings: dict[str, float] = Field(default={}, description="Tempo (ms) por etapa: stats, retrieve, generate")
+    profile: Optional[str] = Field(default=None, description="Relatório do cProfile (header X-Profile, admin)")
+
+class StatsQueryRequest(BaseModel):
+    """Request para consulta estatística sob demanda"""
+    column: str = Field(..., description="Coluna numérica: IMC, Peso_kg, Altura_cm, Idade")
+    metric: str = Field(default="mean", description="count, mean, median, std, min, max, percentile, corr")
+    group_by: list[str] = Field(default=[], description="Agrupamentos: Sexo, FaixaEtaria")
+    percentiles: list[float] = Field(default=[], description="Percentis (0-100) para metric=percentile")
+    with_column: Optional[str] = Field(default=None, description="Segunda coluna para metric=corr")
+    min_age: Optional[float] = Field(default=18, description="Idade mínima (18 = adultos)")
 
 class HealthResponse(BaseModel):
     """Response do health check"""
@@ -86,6 +111,21 @@ app.add_middleware(
 # Pipeline global (inicializado no startup)
 pipeline: Optional[RAGPipeline] = None
 
+# tracemalloc do worker (só liga via /admin/memory/start)
+memory_tracker = MemoryTracker()
+
+def is_admin(x_admin_token: Optional[str]) -> bool:
+    """ADMIN_TOKEN configurado e igual ao token enviado"""
+    return bool(settings.ADMIN_TOKEN and x_admin_token
+                and hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN))
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Endpoints de profiling: 404 sem ADMIN_TOKEN configurado, 403 com token errado"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Token de admin inválido")
+
 @app.on_event("startup")
 async def startup_event():
     """Inicializa o pipeline no startup"""
@@ -97,9 +137,19 @@ async def startup_event():
         print("❌ ERRO: GEMINI_API_KEY não configurada!")
         raise ValueError("GEMINI_API_KEY não configurada")
     
-    pipeline = RAGPipeline(gemini_api_key=api_key)
+    pipeline = RAGPipeline(
+        knowledge_base_path=settings.KNOWLEDGE_BASE_PATH,
+        vector_store_path=settings.VECTOR_STORE_PATH,
+        gemini_api_key=api_key
+    )
     print("✅ Pipeline inicializado!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Encerra os processos shard do índice vetorial"""
+    if pipeline:
+        pipeline.vector_store_service.close()
+
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
@@ -138,48 +188,95 @@ async def get_stats():
     )
 
 @app.post("/api/ask", response_model=AnswerResponse, tags=["Q&A"])
-async def ask_question(request: QuestionRequest):
+async def ask_question(
+    request: QuestionRequest,
+    x_profile: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None)
+):
     """
     Faz uma pergunta ao sistema
     
     - **question**: Pergunta em português
     - **k**: Número de documentos a recuperar (1-10)
+    - **adaptive**: Escolhe k pelos scores de similaridade (entre ADAPTIVE_MIN_K e ADAPTIVE_MAX_K)
+    - **hybrid**: Combina busca por palavras-chave (BM25) e vetorial
+    - **mmr**: Evita chunks quase iguais de fontes diferentes (over-fetch + MMR)
+    - **fast_path**: Opt-in; perguntas de estatística (ex.: IMC médio por faixa etária)
+      são respondidas direto da tabela gerada a partir do CSV, sem chamar o LLM
+    - **category** / **source**: Restringem a busca a uma categoria ou fonte da KB
+    
+    Com os headers `X-Profile: 1` e `X-Admin-Token` válido, a requisição roda
+    sob cProfile e o relatório volta em `profile`; sem token válido (ou sem
+    ADMIN_TOKEN configurado) o X-Profile é ignorado.
     
     Retorna a resposta com as fontes utilizadas.
     """
     if not pipeline:
         raise HTTPException(status_code=503, detail="Pipeline não inicializado")
+    profiling = bool(x_profile) and is_admin(x_admin_token)
     
     import time
     start = time.time()
     
     try:
-        result = pipeline.query(request.question, k=request.k)
+        query_args = dict(
+            k=request.k, adaptive=request.adaptive,
+            hybrid=request.hybrid, fast_path=request.fast_path, mmr=request.mmr,
+            category=request.category, source=request.source
+        )
+        profile = None
+        if profiling:
+            result, profile = profile_call(pipeline.query, request.question, **query_args)
+        else:
+            result = pipeline.query(request.question, **query_args)
         processing_time = time.time() - start
         
         return AnswerResponse(
             answer=result["answer"],
             sources=result["sources"],
             num_sources=result["num_sources"],
-            processing_time=round(processing_time, 2)
+            k_used=result["k_used"],
+            cutoff_reason=result["cutoff_reason"],
+            route=result["route"],
+            processing_time=round(processing_time, 2),
+            timings=result.get("timings", {}),
+            profile=profile
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/stats/query", tags=["Stats"])
+async def stats_query(request: StatsQueryRequest):
+    """
+    Agregações sob demanda sobre o dataset NHANES (sem LLM)
+    
+    Ex.: IMC médio por sexo e faixa etária, percentis do IMC, correlação
+    entre peso e altura por sexo. Resultados são memoizados.
+    """
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Pipeline não inicializado")
+    if not pipeline.stats_engine:
+        raise HTTPException(status_code=503, detail="Dataset NHANES não disponível")
+    
+    try:
+        return pipeline.query_stats(
+            request.column,
+            request.metric,
+            group_by=request.group_by,
+            percentiles=request.percentiles,
+            with_column=request.with_column,
+            min_age=request.min_age
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/sources", tags=["Info"])
 async def list_sources():
     """Lista todas as fontes disponíveis na knowledge base"""
-    from pathlib import Path
-    
-    kb_path = Path("data/knowledge_base")
-    sources = []
+    from document_loader import KnowledgeBaseLoader
     
-    for txt_file in kb_path.rglob("*.txt"):
-        sources.append({
-            "file": txt_file.name,
-            "category": txt_file.parent.name,
-            "path": str(txt_file)
-        })
+    # Do índice do .kbpack quando existir (sem percorrer as pastas)
+    sources = KnowledgeBaseLoader("data/knowledge_base").list_sources()
     
     return {
         "total": len(sources),
@@ -197,3 +294,53 @@ async def rebuild_index():
         return {"status": "success", "message": "Índice reconstruído com sucesso"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# =============================================================================
+# PROFILING (ADMIN)
+# =============================================================================
+
+@app.post("/admin/profile/cpu", response_class=PlainTextResponse, tags=["Admin"],
+          dependencies=[Depends(require_admin)])
+async def profile_cpu(
+    seconds: float = Query(default=10.0, gt=0, le=60),
+    interval: float = Query(default=0.005, ge=0.001, le=1.0)
+):
+    """
+    Amostra as pilhas de todas as threads deste worker por `seconds`
+    
+    Retorna stacks colapsadas (uma por linha, "frames;separados contagem"),
+    prontas para flamegraph.pl, speedscope ou inferno.
+    """
+    collapsed, summary = await run_in_threadpool(sample_stacks, seconds, interval)
+    return PlainTextResponse(collapsed, headers={
+        "X-Worker-Pid": str(os.getpid()),
+        "X-Profile-Samples": str(summary["samples"])
+    })
+
+@app.post("/admin/memory/start", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def memory_start(frames: int = Query(default=10, ge=1, le=100)):
+    """Liga o tracemalloc neste worker (as alocações ficam mais lentas até o stop)"""
+    return {"pid": os.getpid(), **memory_tracker.start(frames)}
+
+@app.get("/admin/memory/top", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def memory_top(limit: int = Query(default=20, ge=1, le=200)):
+    """Maiores alocações vivas, por linha de código"""
+    try:
+        top = memory_tracker.top(limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"pid": os.getpid(), **memory_tracker.status(), "top": top}
+
+@app.get("/admin/memory/diff", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def memory_diff(limit: int = Query(default=20, ge=1, le=200)):
+    """Crescimento desde o snapshot anterior (start ou diff anterior)"""
+    try:
+        diff = memory_tracker.diff(limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"pid": os.getpid(), **memory_tracker.status(), "diff": diff}
+
+@app.post("/admin/memory/stop", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def memory_stop():
+    """Desliga o tracemalloc e descarta os snapshots"""
+    return {"pid": os.getpid(), **memory_tracker.stop()}
@@ -0,0 +1,185 @@
+"""
+Chunk Dedup - Remove chunks duplicados e quase duplicados antes do embedding
+
+Duplicatas exatas são detectadas pelo hash do texto normalizado (minúsculas,
+sem acentos, espaços colapsados). Quase duplicatas por MinHash sobre shingles
+de palavras, com LSH em bandas para achar candidatos sem comparar todos os
+pares; o candidato só é aceito se a similaridade de Jaccard real entre os
+conjuntos de shingles (guardados como arrays ordenados de uint32) passar do
+limiar, então a variância do MinHash não gera falsos positivos.
+
+O primeiro chunk visto fica como canônico; as fontes das cópias descartadas
+vão para o metadata dele (ALIAS_KEY, string única porque o Chroma só aceita
+valores escalares), para que todas continuem citáveis.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from lexical_index import fold_accents
+
+ALIAS_KEY = "alias_sources"
+ALIAS_SEPARATOR = " | "
+DUPLICATES_KEY = "duplicates"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SHIFT = np.uint64(32)
+
+
+def alias_sources(metadata: dict) -> List[str]:
+    """Fontes das cópias descartadas de um chunk canônico"""
+    aliases = metadata.get(ALIAS_KEY)
+    return aliases.split(ALIAS_SEPARATOR) if aliases else []
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(fold_accents(text))
+
+
+class MinHasher:
+    """Assinaturas MinHash de shingles de palavras (hash multiply-shift: (a*x + b) mod 2^64 >> 32)"""
+    
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # a ímpar de 64 bits; o overflow do uint64 é o "mod 2^64"
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    
+    def shingles(self, words: List[str]) -> np.ndarray:
+        """Hashes (crc32) distintos e ordenados dos shingles"""
+        n = self.shingle_size
+        grams = [" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))]
+        return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32))
+    
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        x = shingles.astype(np.uint64)
+        hashes = (self.a[:, None] * x[None, :] + self.b[:, None]) >> _SHIFT
+        return hashes.min(axis=1).astype(np.uint32)
+
+
+class ChunkDeduplicator:
+    """
+    Filtra lotes de chunks mantendo só um representante de cada grupo
+
+    Funciona em streaming: filter() pode ser chamado lote a lote. Chunks
+    canônicos de lotes anteriores que ganharam aliases depois de emitidos
+    ficam em `late_updates` (posição entre os mantidos -> metadata), para o
+    vector store atualizar o que já foi gravado.
+    """
+    
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, near_duplicates: bool = True, record_pairs: bool = False):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) precisa ser múltiplo de bands ({bands})")
+        self.threshold = threshold
+        self.near_duplicates = near_duplicates
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        
+        self.exact: Dict[bytes, int] = {}
+        self.buckets: Dict[tuple, List[int]] = {}
+        self.shingle_sets: List[Optional[np.ndarray]] = []
+        self.kept: List[dict] = []  # metadata dos canônicos, na ordem em que foram mantidos
+        self.late_updates: Dict[int, dict] = {}
+        self._emitted = 0
+        # (canônico, duplicata) para auditoria (benchmark); desligado por padrão
+        self.pairs: Optional[List[tuple]] = [] if record_pairs else None
+        
+        self.stats = {"chunks_in": 0, "kept": 0, "exact_duplicates": 0, "near_duplicates": 0,
+                      "chars_in": 0, "chars_kept": 0}
+    
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+    
+    def _find_near(self, shingles: np.ndarray, band_keys: List[tuple]) -> Optional[int]:
+        """Canônico mais parecido entre os candidatos do LSH (Jaccard real >= threshold)"""
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self.buckets.get(key, ()))
+        best, best_similarity = None, self.threshold
+        for position in sorted(candidates):
+            other = self.shingle_sets[position]
+            common = len(np.intersect1d(shingles, other, assume_unique=True))
+            similarity = common / (len(shingles) + len(other) - common)
+            if similarity >= best_similarity:
+                best, best_similarity = position, similarity
+        return best
+    
+    def _add_alias(self, position: int, chunk: Document):
+        canonical = self.kept[position]
+        metadata = chunk.metadata
+        if self.pairs is not None:
+            self.pairs.append((position, chunk.page_content))
+        source = metadata.get("source")
+        known = [canonical.get("source")] + alias_sources(canonical)
+        canonical[DUPLICATES_KEY] = canonical.get(DUPLICATES_KEY, 0) + 1
+        if source and source not in known:
+            canonical[ALIAS_KEY] = ALIAS_SEPARATOR.join(known[1:] + [source])
+        if position < self._emitted:
+            self.late_updates[position] = canonical
+    
+    def filter(self, chunks: List[Document]) -> List[Document]:
+        """Chunks do lote que não duplicam nenhum anterior (metadata dos canônicos é atualizado no lugar)"""
+        kept = []
+        for chunk in chunks:
+            self.stats["chunks_in"] += 1
+            self.stats["chars_in"] += len(chunk.page_content)
+            words = _words(chunk.page_content)
+            digest = hashlib.sha1(" ".join(words).encode("utf-8")).digest()
+            
+            position = self.exact.get(digest)
+            if position is not None:
+                self.stats["exact_duplicates"] += 1
+                self._add_alias(position, chunk)
+                continue
+            
+            shingles = band_keys = None
+            if self.near_duplicates and len(words) >= self.hasher.shingle_size:
+                shingles = self.hasher.shingles(words)
+                band_keys = self._band_keys(self.hasher.signature(shingles))
+                position = self._find_near(shingles, band_keys)
+                if position is not None:
+                    self.stats["near_duplicates"] += 1
+                    self._add_alias(position, chunk)
+                    continue
+            
+            position = len(self.kept)
+            self.exact[digest] = position
+            self.shingle_sets.append(shingles)
+            for key in band_keys or ():
+                self.buckets.setdefault(key, []).append(position)
+            self.kept.append(chunk.metadata)
+            kept.append(chunk)
+            self.stats["kept"] += 1
+            self.stats["chars_kept"] += len(chunk.page_content)
+        
+        self._emitted = len(self.kept)
+        return kept
+    
+    def report(self, embedding_dim: Optional[int] = None) -> dict:
+        """Chamadas de embedding economizadas e redução do índice"""
+        stats = dict(self.stats)
+        removed = stats["chunks_in"] - stats["kept"]
+        stats["embedding_calls_saved"] = removed
+        stats["index_reduction_pct"] = round(100 * removed / stats["chunks_in"], 2) if stats["chunks_in"] else 0.0
+        stats["text_reduction_pct"] = (round(100 * (1 - stats["chars_kept"] / stats["chars_in"]), 2)
+                                       if stats["chars_in"] else 0.0)
+        if embedding_dim:
+            stats["vector_bytes_saved"] = removed * embedding_dim * 4
+        stats["threshold"] = self.threshold
+        return stats
+
+
+def print_dedup_report(report: dict):
+    print(f"🧹 Dedup: {report['chunks_in']} chunks -> {report['kept']} "
+          f"({report['exact_duplicates']} exact, {report['near_duplicates']} near duplicates)")
+    print(f"   Embedding calls saved: {report['embedding_calls_saved']} | "
+          f"index -{report['index_reduction_pct']:.1f}% | text -{report['text_reduction_pct']:.1f}%")
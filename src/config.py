@@ -27,9 +27,11 @@ class Settings(BaseSettings):
     API_PORT: int = 8000
     API_RELOAD: bool = True
     API_WORKERS: int = 1
+    ADMIN_TOKEN: str = ""  # header X-Admin-Token dos endpoints /admin/*; vazio = desligados (404)
     
     # Gemini
     GEMINI_API_KEY: str = ""
+    GEMINI_BASE_URL: str = ""  # ex.: http://127.0.0.1:8766 (scripts/gemini_standin.py); vazio = API do Google
     
     # RAG
     KNOWLEDGE_BASE_PATH: str = "data/knowledge_base"
@@ -38,8 +40,61 @@ class Settings(BaseSettings):
     CHUNK_OVERLAP: int = 50
     RETRIEVAL_K: int = 3
     
+    # Índice HNSW do Chroma (fixado na criação da coleção; mudar exige rebuild)
+    HNSW_SPACE: str = "l2"  # l2 | cosine | ip (índice em memória e k adaptativo exigem l2)
+    HNSW_M: int = 16  # vizinhos por nó
+    HNSW_CONSTRUCTION_EF: int = 100
+    HNSW_SEARCH_EF: int = 10  # candidatos na busca: mais recall, mais latência
+    
+    # Vetores compactos (busca em memória com rescoring exato da shortlist)
+    VECTOR_PRECISION: str = "float32"  # float32 | float16 (~13x a latência do float32) | int8 (~2x)
+    VECTOR_DIMS: int = 0  # 0 = todas as dimensões
+    VECTOR_PROJECTION: str = "truncate"  # truncate | pca
+    VECTOR_RESCORE: int = 4  # shortlist = k * VECTOR_RESCORE
+    
+    # Busca hierárquica: centroides de categorias/documentos, depois chunks
+    HIERARCHICAL_SEARCH: bool = False
+    HIERARCHICAL_PROBE_DOCS: int = 8  # documentos cujos chunks são pontuados
+    HIERARCHICAL_PROBE_CATEGORIES: int = 0  # 0 = todas as categorias
+    
+    # Índice particionado entre processos locais (scatter-gather); 0/1 = sem shards
+    VECTOR_SHARDS: int = 0
+    
+    # Dedup de chunks antes do embedding (exato + MinHash/LSH)
+    DEDUP_CHUNKS: bool = True
+    DEDUP_THRESHOLD: float = 0.9  # Jaccard mínimo (shingles de 3 palavras) para quase duplicata
+    
+    # Retrieval adaptativo (k escolhido pela distribuição dos scores)
+    ADAPTIVE_FETCH_K: int = 10
+    ADAPTIVE_MIN_K: int = 1
+    ADAPTIVE_MAX_K: int = 8
+    ADAPTIVE_SCORE_THRESHOLD: float = 0.0  # distância máxima (0 = desativado)
+    ADAPTIVE_MIN_GAP: float = 0.05  # salto mínimo entre scores para cortar
+    
+    # Retrieval híbrido (BM25 + denso com Reciprocal Rank Fusion)
+    HYBRID_FETCH_K: int = 20
+    HYBRID_RRF_K: int = 60
+    HYBRID_LEXICAL_SHORTCUT: bool = True  # pular embedding em queries de palavra-chave
+    HYBRID_LEXICAL_MIN_SCORE: float = 10.0
+    HYBRID_LEXICAL_RATIO: float = 1.5  # top1 / top2 mínimo para confiar no BM25
+    
+    # Diversificação por Maximal Marginal Relevance
+    MMR_FETCH_K: int = 20  # candidatos buscados antes da seleção
+    MMR_LAMBDA: float = 0.5  # 1 = só relevância, 0 = só diversidade
+    
+    # Fast path estatístico (responde da stats table, sem LLM); carrega o roteador,
+    # cada pergunta opta com fast_path=true
+    STATS_FAST_PATH: bool = True
+    STATS_MIN_CONFIDENCE: float = 0.8
+    
+    # Dataset NHANES e cache colunar do engine analítico (/api/stats/query)
+    NHANES_CSV_PATH: str = "data/raw/nhanes_2015_2016.csv"
+    STATS_CACHE_PATH: str = "data/cache/nhanes_columns"
+    
     # Embeddings
     EMBEDDING_MODEL: str = "models/text-embedding-004"
+    EMBEDDING_BACKEND: str = "gemini"  # gemini (API) | local (CPU, sem rede)
+    LOCAL_EMBEDDING_DIM: int = 384
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -2,44 +2,118 @@
 Document Loader - Carrega documentos da Knowledge Base
 """
 
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 from langchain_core.documents import Document
 
+from kb_archive import open_archive, parse_source
+
 
 class KnowledgeBaseLoader:
-    """Carrega documentos .txt da knowledge base"""
+    """
+    Carrega documentos .txt da knowledge base
+    
+    Se existir um <kb>.kbpack em dia (ver kb_archive), os documentos vêm dele
+    via mmap, sem percorrer as pastas; senão, das pastas. check_archive_files
+    confere também cada arquivo ao validar o .kbpack (pega edições no lugar).
+    """
     
-    def __init__(self, knowledge_base_path: str = "data/knowledge_base"):
+    def __init__(self, knowledge_base_path: str = "data/knowledge_base",
+                 archive_path: Optional[str] = None, use_archive: bool = True,
+                 check_archive_files: bool = False):
         self.kb_path = Path(knowledge_base_path)
+        self.archive_path = archive_path
+        self.use_archive = use_archive
+        self.check_archive_files = check_archive_files
     
-    def load_documents(self) -> List[Document]:
-        """Carrega todos os .txt e retorna lista de Documents"""
-        documents = []
+    def _open_archive(self):
+        if not self.use_archive:
+            return None
+        return open_archive(self.kb_path, self.archive_path, self.check_archive_files)
+    
+    def iter_paths(self) -> Iterator[Path]:
+        """Arquivos .txt em ordem determinística (pastas e nomes ordenados), sem listar tudo antes"""
+        for root, dirs, files in os.walk(self.kb_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".txt"):
+                    yield Path(root) / name
+    
+    def _read_document(self, txt_file: Path) -> Optional[Document]:
+        try:
+            with open(txt_file, encoding='utf-8') as f:
+                # Metadados só da primeira linha; o resto é lido sem split por linhas
+                header = f.readline()
+                content = header + f.read()
+        except Exception as e:
+            print(f"⚠️ Error loading {txt_file}: {e}")
+            return None
+        
+        return Document(
+            page_content=content,
+            metadata={
+                "source": parse_source(header, txt_file.name),
+                "file": str(txt_file),
+                "category": txt_file.parent.name
+            }
+        )
+    
+    def _read_batch(self, paths: List[Path]) -> List[Document]:
+        return [doc for doc in map(self._read_document, paths) if doc is not None]
+    
+    def iter_documents(self, workers: int = 8, prefetch: int = 256, batch_size: int = 32) -> Iterator[Document]:
+        """
+        Gera os documentos na ordem de iter_paths, lendo em paralelo
         
-        for txt_file in self.kb_path.rglob("*.txt"):
+        Cada tarefa do pool lê `batch_size` arquivos e no máximo ~`prefetch`
+        arquivos ficam à frente do consumidor, então a memória fica limitada e
+        split/embedding começam antes do fim da leitura. Com o .kbpack, os
+        documentos saem dele na mesma ordem, sem pool.
+        """
+        archive = self._open_archive()
+        if archive:
+            with archive:
+                yield from archive.iter_documents()
+            return
+        
+        max_pending = max(1, prefetch // batch_size)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            window = deque()
+            batch = []
             try:
-                content = txt_file.read_text(encoding='utf-8')
-                
-                # Extrair source da primeira linha se existir
-                lines = content.split('\n')
-                source = txt_file.name
-                if lines[0].startswith('Source:'):
-                    source = lines[0].replace('Source:', '').strip()
+                for txt_file in self.iter_paths():
+                    batch.append(txt_file)
+                    if len(batch) < batch_size:
+                        continue
+                    window.append(pool.submit(self._read_batch, batch))
+                    batch = []
+                    if len(window) >= max_pending:
+                        yield from window.popleft().result()
                 
-                doc = Document(
-                    page_content=content,
-                    metadata={
-                        "source": source,
-                        "file": str(txt_file),
-                        "category": txt_file.parent.name
-                    }
-                )
-                documents.append(doc)
-                
-            except Exception as e:
-                print(f"⚠️ Error loading {txt_file}: {e}")
-        
+                if batch:
+                    window.append(pool.submit(self._read_batch, batch))
+                while window:
+                    yield from window.popleft().result()
+            finally:
+                # Consumidor parou antes do fim: descarta leituras pendentes
+                for future in window:
+                    future.cancel()
+    
+    def list_sources(self) -> List[dict]:
+        """Arquivos da KB (file, category, path) sem ler o conteúdo"""
+        archive = self._open_archive()
+        if archive:
+            with archive:
+                return archive.sources()
+        return [{"file": path.name, "category": path.parent.name, "path": str(path)}
+                for path in self.iter_paths()]
+    
+    def load_documents(self) -> List[Document]:
+        """Carrega todos os .txt e retorna lista de Documents"""
+        documents = list(self.iter_documents())
         print(f"✅ Loaded {len(documents)} documents")
         return documents
 
@@ -48,4 +122,4 @@ if __name__ == "__main__":
     loader = KnowledgeBaseLoader()
     docs = loader.load_documents()
     for doc in docs[:3]:
-        print(f"- {doc.metadata['file']}: {len(doc.page_content)} chars")
\ No newline at end of file
+        print(f"- {doc.metadata['file']}: {len(doc.page_content)} chars")
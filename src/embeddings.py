@@ -1,25 +1,42 @@
 """
 Embeddings usando Google Gemini API
 SEM PyTorch - imagem Docker muito menor!
+
+O backend é escolhido por EMBEDDING_BACKEND: "gemini" (API remota) ou "local"
+(HashingEmbeddings, CPU, sem rede). Cada backend tem uma `version` que
+identifica o espaço vetorial; o vector store grava a versão de quem o
+construiu, e o pipeline reconstrói o índice quando ela não bate.
 """
 
 import os
 import google.generativeai as genai
-from typing import List
+from typing import List, Optional
+
+from config import settings
+from gemini_client import configure_gemini
+from local_embeddings import HashingEmbeddings
+
+BACKENDS = ("gemini", "local")
 
 
 class GeminiEmbeddings:
     """Embeddings via Gemini API (gratuito)"""
     
+    MODEL = "models/embedding-001"
+    
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY não configurada")
         
-        genai.configure(api_key=api_key)
-        self.model = "models/embedding-001"
+        configure_gemini(api_key)
+        self.model = self.MODEL
         print(f"✅ Gemini Embeddings: {self.model}")
     
+    @property
+    def version(self) -> str:
+        return f"gemini:{self.model}"
+    
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Gera embeddings para documentos"""
         embeddings = []
@@ -48,12 +65,29 @@ class GeminiEmbeddings:
         return result['embedding']
 
 
+# Índices gravados antes do registro da versão foram todos construídos com o Gemini
+LEGACY_VERSION = f"gemini:{GeminiEmbeddings.MODEL}"
+
+
 class EmbeddingService:
-    """Wrapper para compatibilidade"""
+    """Escolhe o backend de embeddings (EMBEDDING_BACKEND, ou `backend`)"""
+    
+    def __init__(self, model_name: str = None, backend: Optional[str] = None):
+        backend = backend or settings.EMBEDDING_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"EMBEDDING_BACKEND deve ser um de {BACKENDS}, recebido '{backend}'")
+        
+        if backend == "local":
+            self.embeddings = HashingEmbeddings(dim=settings.LOCAL_EMBEDDING_DIM)
+            print(f"✅ Local Embeddings: {self.embeddings.version}")
+        else:
+            print("⏳ Initializing Gemini Embeddings...")
+            self.embeddings = GeminiEmbeddings()
+        self.backend = backend
     
-    def __init__(self, model_name: str = None):
-        print("⏳ Initializing Gemini Embeddings...")
-        self.embeddings = GeminiEmbeddings()
+    @property
+    def version(self) -> str:
+        return self.embeddings.version
     
     def get_embeddings(self):
         return self.embeddings
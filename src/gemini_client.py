@@ -0,0 +1,23 @@
+"""
+Gemini Client - Configuração do SDK google-generativeai
+
+GEMINI_BASE_URL aponta o SDK para outro endpoint, como o stand-in local
+(scripts/gemini_standin.py). Nesse caso o transporte é REST, que aceita
+http://; vazio = API do Google com o transporte padrão do SDK.
+"""
+
+from typing import Optional
+
+import google.generativeai as genai
+
+from config import settings
+
+
+def configure_gemini(api_key: str, base_url: Optional[str] = None):
+    """genai.configure com a chave e, se houver, o endpoint alternativo"""
+    base_url = settings.GEMINI_BASE_URL if base_url is None else base_url
+    if base_url:
+        genai.configure(api_key=api_key, transport="rest",
+                        client_options={"api_endpoint": base_url.rstrip("/")})
+    else:
+        genai.configure(api_key=api_key)
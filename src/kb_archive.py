@@ -0,0 +1,253 @@
+"""
+KB Archive - Knowledge base empacotada num único arquivo (.kbpack)
+
+Layout:
+    magic "NHKB" | versão (u16) | flags (u16) | tamanho do índice (u64)
+    índice JSON: [{path, category, source, offset, length, size, mtime, hash}, ...]
+    corpos dos documentos (crus ou zlib), um após o outro
+
+O leitor abre o arquivo com mmap e fatia os corpos sem copiar (memoryview);
+listar fontes só lê o índice. O índice guarda o mtime das pastas da KB: ao
+abrir, o loader compara só esses valores (um stat por pasta) e volta a ler as
+pastas se arquivos foram adicionados ou removidos depois do empacotamento.
+Edição no lugar não muda o mtime da pasta; o tamanho/mtime de cada arquivo
+também fica no índice, mas só é conferido com check_files=True, porque um
+stat por arquivo a cada abertura é o custo que o arquivo único evita (pior
+ainda em volumes de rede). O build (etapa archive) reempacota quando os .txt
+mudam.
+
+Os corpos são os bytes crus dos .txt: o loader de pastas lê em modo texto
+(\r\n vira \n), então arquivos com CRLF diferem entre pastas e .kbpack, a
+menos que as quebras de linha sejam normalizadas antes de empacotar.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+MAGIC = b"NHKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+FLAG_ZLIB = 1
+
+ARCHIVE_SUFFIX = ".kbpack"
+
+
+def default_archive_path(kb_path) -> Path:
+    """data/knowledge_base -> data/knowledge_base.kbpack"""
+    kb_path = Path(kb_path)
+    return kb_path.with_name(kb_path.name + ARCHIVE_SUFFIX)
+
+
+def parse_source(header_line: str, file_name: str) -> str:
+    """Fonte do documento: linha 'Source:' do topo ou o nome do arquivo"""
+    if header_line.startswith('Source:'):
+        return header_line.replace('Source:', '').strip()
+    return file_name
+
+
+def _dir_mtimes(kb_path: Path) -> Dict[str, int]:
+    mtimes = {}
+    for root, dirs, _ in os.walk(kb_path):
+        mtimes[os.path.relpath(root, kb_path)] = os.stat(root).st_mtime_ns
+    return mtimes
+
+
+def write_archive(kb_path, archive_path=None, compress: bool = False) -> dict:
+    """
+    Empacota os .txt da KB (mesma ordem do KnowledgeBaseLoader)
+
+    Escreve num arquivo temporário e troca no fim, então leitores nunca veem
+    um arquivo pela metade. Retorna um resumo (documentos, bytes).
+    """
+    from document_loader import KnowledgeBaseLoader
+    
+    kb_path = Path(kb_path)
+    archive_path = Path(archive_path) if archive_path else default_archive_path(kb_path)
+    
+    entries, bodies = [], []
+    offset = raw_bytes = 0
+    for txt_file in KnowledgeBaseLoader(kb_path, use_archive=False).iter_paths():
+        stat = txt_file.stat()
+        raw = txt_file.read_bytes()
+        first_line = raw.split(b"\n", 1)[0].decode("utf-8")
+        body = zlib.compress(raw, 6) if compress else raw
+        entries.append({
+            "path": txt_file.relative_to(kb_path).as_posix(),
+            "category": txt_file.parent.name,
+            "source": parse_source(first_line, txt_file.name),
+            "offset": offset,
+            "length": len(body),
+            "size": len(raw),
+            "mtime": stat.st_mtime_ns,
+            "hash": hashlib.sha256(raw).hexdigest(),
+        })
+        bodies.append(body)
+        offset += len(body)
+        raw_bytes += len(raw)
+    
+    index = json.dumps({"dirs": _dir_mtimes(kb_path), "entries": entries},
+                       ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_ZLIB if compress else 0, len(index)))
+        f.write(index)
+        for body in bodies:
+            f.write(body)
+    os.replace(tmp_path, archive_path)
+    
+    summary = {"documents": len(entries), "raw_bytes": raw_bytes,
+               "archive_bytes": archive_path.stat().st_size, "compressed": compress}
+    print(f"📦 Packed {len(entries)} documents into {archive_path} ({summary['archive_bytes'] / 1e6:.1f} MB)")
+    return summary
+
+
+class KBArchive:
+    """Leitor de um .kbpack via mmap (índice em memória, corpos sob demanda)"""
+    
+    def __init__(self, archive_path, kb_path=None):
+        self.path = Path(archive_path)
+        # Caminho usado no metadata "file" (igual ao do loader de pastas)
+        self.kb_path = Path(kb_path) if kb_path else self.path.with_name(self.path.name[:-len(ARCHIVE_SUFFIX)])
+        
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivo vazio não pode ser mapeado
+            self._file.close()
+            raise ValueError(f"Arquivo de KB inválido: {self.path}")
+        self._view = memoryview(self._mmap)
+        
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"Arquivo de KB inválido: {self.path}")
+        magic, version, flags, index_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Arquivo de KB inválido ou de outra versão: {self.path}")
+        
+        self.compressed = bool(flags & FLAG_ZLIB)
+        index = json.loads(str(self._view[HEADER.size:HEADER.size + index_size], "utf-8"))
+        self.entries: List[dict] = index["entries"]
+        self.dirs: Dict[str, int] = index["dirs"]
+        self._data_start = HEADER.size + index_size
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        if self._mmap.closed:
+            return
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+    
+    def is_stale(self, check_files: bool = False) -> bool:
+        """
+        True se a KB mudou desde o empacotamento
+        
+        Por padrão compara só o mtime das pastas (arquivos criados ou
+        removidos); check_files=True também confere tamanho/mtime de cada
+        arquivo, o que pega edições no lugar ao custo de um stat por arquivo.
+        """
+        if not self.kb_path.is_dir():
+            # Só o arquivo empacotado foi distribuído: ele é a KB
+            return False
+        for rel, mtime in self.dirs.items():
+            try:
+                if os.stat(self.kb_path / rel).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        if not check_files:
+            return False
+        # Edição no lugar não muda o mtime da pasta
+        for entry in self.entries:
+            try:
+                stat = os.stat(self.kb_path / entry["path"])
+            except FileNotFoundError:
+                return True
+            if stat.st_size != entry["size"] or stat.st_mtime_ns != entry.get("mtime"):
+                return True
+        return False
+    
+    def read_bytes(self, entry: dict) -> memoryview:
+        """Corpo cru do documento; sem compressão é uma fatia do mmap (sem cópia)"""
+        start = self._data_start + entry["offset"]
+        body = self._view[start:start + entry["length"]]
+        if self.compressed:
+            return memoryview(zlib.decompress(body))
+        return body
+    
+    def read_text(self, entry: dict) -> str:
+        return str(self.read_bytes(entry), "utf-8")
+    
+    def verify(self) -> List[str]:
+        """Caminhos cujo sha256 não bate com o índice"""
+        return [entry["path"] for entry in self.entries
+                if hashlib.sha256(self.read_bytes(entry)).hexdigest() != entry["hash"]]
+    
+    def sources(self) -> List[dict]:
+        """Fontes da KB direto do índice (nenhum corpo é lido)"""
+        # os.path em vez de pathlib: com 100k entradas o Path domina o tempo
+        root = str(self.kb_path)
+        return [{"file": entry["path"].rsplit("/", 1)[-1], "category": entry["category"],
+                 "path": os.path.join(root, entry["path"])} for entry in self.entries]
+    
+    def iter_documents(self) -> Iterator[Document]:
+        """Documentos no mesmo formato (conteúdo e metadata) do KnowledgeBaseLoader"""
+        root = str(self.kb_path)
+        for entry in self.entries:
+            yield Document(
+                page_content=self.read_text(entry),
+                metadata={
+                    "source": entry["source"],
+                    "file": os.path.join(root, entry["path"]),
+                    "category": entry["category"]
+                }
+            )
+
+
+def open_archive(kb_path, archive_path=None, check_files: bool = False) -> Optional[KBArchive]:
+    """Abre o .kbpack da KB se existir e estiver em dia; senão None (usar as pastas)"""
+    archive_path = Path(archive_path) if archive_path else default_archive_path(kb_path)
+    if not archive_path.is_file():
+        return None
+    try:
+        archive = KBArchive(archive_path, kb_path)
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Ignoring knowledge base archive {archive_path}: {e}")
+        return None
+    if archive.is_stale(check_files):
+        print(f"ℹ️ {archive_path} is older than {kb_path} - reading the folders instead")
+        archive.close()
+        return None
+    return archive
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Empacota a knowledge base num único arquivo")
+    parser.add_argument("--kb", default="data/knowledge_base")
+    parser.add_argument("--output", help="Padrão: <kb>.kbpack")
+    parser.add_argument("--compress", action="store_true", help="Comprimir os corpos com zlib")
+    args = parser.parse_args()
+    
+    write_archive(args.kb, args.output, compress=args.compress)
@@ -0,0 +1,165 @@
+"""
+Lexical Index - Índice invertido BM25 em memória para busca por palavras-chave
+"""
+
+import math
+import pickle
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Container, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from langchain_core.documents import Document
+
+
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e em entre era essa esse esta este foi
+ha isso mais mas na nas no nos o os ou para pela pelo por qual quais quando que
+se sem ser sao seu sua tem um uma umas uns
+an and are as at be by for from has how in is it its of on or that the their
+this to was what when which who why with
+""".split())
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold_accents(text: str) -> str:
+    """Minúsculas sem acentos ("Média" -> "media"; "R²" -> "r2")"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenização para português/inglês
+
+    Minúsculas, remoção de acentos (IMC == imc, média == media), "R²" vira
+    "r2" e nomes de variáveis como Peso_kg geram também as partes ("peso", "kg").
+    """
+    tokens = []
+    for word in _WORD_RE.findall(fold_accents(text)):
+        if word in STOPWORDS:
+            continue
+        tokens.append(word)
+        if "_" in word:
+            tokens.extend(p for p in word.split("_") if p and p not in STOPWORDS)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """Funde listas ranqueadas com Reciprocal Rank Fusion: score = Σ 1 / (k + rank)"""
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Índice invertido BM25 com posting lists compactas (array de ids e tfs)"""
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self.postings_docs: List[array] = []  # ids de chunk (crescentes) por termo
+        self.postings_tfs: List[array] = []   # frequência do termo em cada chunk
+        self.doc_lens = array("I")
+        self.texts: List[str] = []
+        self.metadatas: List[dict] = []
+    
+    @classmethod
+    def from_documents(cls, documents: List[Document], **kwargs) -> "BM25Index":
+        index = cls(**kwargs)
+        index.add_documents(documents)
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    @property
+    def avg_doc_len(self) -> float:
+        return sum(self.doc_lens) / len(self.doc_lens) if self.doc_lens else 0.0
+    
+    def add_documents(self, documents: List[Document]):
+        """Indexa documentos (chunks) ao final do índice"""
+        for doc in documents:
+            doc_id = len(self.texts)
+            tokens = tokenize(doc.page_content)
+            
+            for term, tf in Counter(tokens).items():
+                term_id = self.vocab.get(term)
+                if term_id is None:
+                    term_id = self.vocab[term] = len(self.postings_docs)
+                    self.postings_docs.append(array("I"))
+                    self.postings_tfs.append(array("H"))
+                self.postings_docs[term_id].append(doc_id)
+                self.postings_tfs[term_id].append(min(tf, 0xFFFF))
+            
+            self.doc_lens.append(len(tokens))
+            self.texts.append(doc.page_content)
+            self.metadatas.append(dict(doc.metadata))
+    
+    def _query_terms(self, query: str) -> List[int]:
+        terms = dict.fromkeys(tokenize(query))
+        return [self.vocab[t] for t in terms if t in self.vocab]
+    
+    def search(self, query: str, k: int = 10, doc_ids: Optional[Container[int]] = None) -> List[Tuple[int, float]]:
+        """Retorna [(chunk_id, score)] ordenado por score BM25 decrescente (só entre `doc_ids`, se passado)"""
+        n_docs = len(self.texts)
+        if not n_docs:
+            return []
+        
+        avgdl = self.avg_doc_len or 1.0
+        scores: Dict[int, float] = {}
+        
+        for term_id in self._query_terms(query):
+            docs = self.postings_docs[term_id]
+            tfs = self.postings_tfs[term_id]
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            
+            for doc_id, tf in zip(docs, tfs):
+                if doc_ids is not None and doc_id not in doc_ids:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    
+    def coverage(self, query: str, doc_id: int) -> float:
+        """Fração dos termos da query presentes no chunk"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0.0
+        
+        matched = 0
+        for term in tokens:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            docs = self.postings_docs[term_id]
+            pos = bisect_left(docs, doc_id)
+            if pos < len(docs) and docs[pos] == doc_id:
+                matched += 1
+        return matched / len(tokens)
+    
+    def get_document(self, doc_id: int) -> Document:
+        return Document(page_content=self.texts[doc_id], metadata=dict(self.metadatas[doc_id]))
+    
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path) -> "BM25Index":
+        index = cls()
+        with open(Path(path), "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+
+if __name__ == "__main__":
+    print(tokenize("Qual o IMC médio? Correlação entre Peso_kg e R² no NHANES"))
@@ -5,12 +5,55 @@ LLM Service - Integração com Google Gemini (FREE)
 import google.generativeai as genai
 from typing import List, Optional
 
+from chunk_dedup import alias_sources
+from gemini_client import configure_gemini
+
+
+PROMPT_TEMPLATE = """Você é um assistente especializado em análise de dados de saúde NHANES e estatística.
+
+Use APENAS o contexto fornecido para responder à pergunta.
+Se a informação não estiver no contexto, diga "Não encontrei essa informação na base de conhecimento."
+
+Responda em português de forma clara e objetiva.
+
+CONTEXTO:
+{context}
+
+PERGUNTA: {query}
+
+RESPOSTA:"""
+
+
+def build_prompt(query: str, context: str) -> str:
+    """Monta o prompt enviado ao LLM"""
+    return PROMPT_TEMPLATE.format(context=context, query=query)
+
+
+def build_context(documents: List) -> tuple:
+    """Monta o contexto numerado a partir dos documentos; retorna (contexto, fontes)"""
+    context_parts = []
+    sources = []
+    
+    for i, doc in enumerate(documents):
+        source = doc.metadata.get('source', 'Unknown')
+        context_parts.append(f"[Fonte {i+1}]: {doc.page_content}")
+        sources.append(source)
+        # Fontes de chunks duplicados removidos no dedup continuam citáveis
+        sources.extend(alias_sources(doc.metadata))
+    
+    return "\n\n".join(context_parts), sources
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token)"""
+    return (len(text) + 3) // 4
+
 
 class GeminiService:
     """Serviço de LLM usando Google Gemini"""
     
     def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
+        configure_gemini(api_key)
         
         # Listar modelos disponíveis e usar o primeiro
         models = [m.name for m in genai.list_models() 
@@ -24,19 +67,7 @@ class GeminiService:
     def generate_response(self, query: str, context: str) -> str:
         """Gera resposta usando o contexto fornecido"""
         
-        prompt = f"""Você é um assistente especializado em análise de dados de saúde NHANES e estatística.
-
-Use APENAS o contexto fornecido para responder à pergunta.
-Se a informação não estiver no contexto, diga "Não encontrei essa informação na base de conhecimento."
-
-Responda em português de forma clara e objetiva.
-
-CONTEXTO:
-{context}
-
-PERGUNTA: {query}
-
-RESPOSTA:"""
+        prompt = build_prompt(query, context)
 
         try:
             response = self.model.generate_content(prompt)
@@ -48,15 +79,7 @@ RESPOSTA:"""
         """Gera resposta e retorna com as fontes usadas"""
         
         # Montar contexto a partir dos documentos
-        context_parts = []
-        sources = []
-        
-        for i, doc in enumerate(documents):
-            source = doc.metadata.get('source', 'Unknown')
-            context_parts.append(f"[Fonte {i+1}]: {doc.page_content}")
-            sources.append(source)
-        
-        context = "\n\n".join(context_parts)
+        context, sources = build_context(documents)
         
         answer = self.generate_response(query, context)
         
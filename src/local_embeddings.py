@@ -0,0 +1,64 @@
+"""
+Local Embeddings - Embedder determinístico em CPU (sem rede, sem modelo)
+
+Feature hashing de termos (tokenize do índice BM25) e bigramas de termos num
+vetor de `dim` posições, com sinal pelo hash e peso 1 + log(tf), normalizado
+(L2). Textos iguais geram sempre o mesmo vetor, em qualquer máquina, então
+serve para benchmarks reprodutíveis e para rodar o pipeline offline; a
+qualidade semântica é a de uma busca lexical (sem sinônimos).
+"""
+
+import hashlib
+import math
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+from lexical_index import tokenize
+
+
+class HashingEmbeddings:
+    """Embeddings por feature hashing (interface embed_documents/embed_query do LangChain)"""
+    
+    def __init__(self, dim: int = 384, bigrams: bool = True):
+        self.dim = dim
+        self.bigrams = bigrams
+        self._bucket_cache = {}
+    
+    @property
+    def version(self) -> str:
+        return f"hashing-v1-d{self.dim}" + ("-bigrams" if self.bigrams else "")
+    
+    def _bucket(self, feature: str):
+        """(posição, sinal) da feature; blake2b para não depender do hash() do processo"""
+        cached = self._bucket_cache.get(feature)
+        if cached is None:
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            cached = (value % self.dim, 1.0 if (value >> 63) & 1 else -1.0)
+            if len(self._bucket_cache) < 200_000:
+                self._bucket_cache[feature] = cached
+        return cached
+    
+    def _features(self, text: str) -> Counter:
+        tokens = tokenize(text)
+        features = Counter(tokens)
+        if self.bigrams:
+            features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return features
+    
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            position, sign = self._bucket(feature)
+            vector[position] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector.tolist()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
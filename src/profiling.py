@@ -0,0 +1,138 @@
+"""
+Profiling - Perfis sob demanda de um worker em produção
+
+Três ferramentas, todas desligadas por padrão (sem hook nem thread enquanto
+ninguém pede um perfil):
+    sample_stacks   amostra a pilha de todas as threads por N segundos e devolve
+                    stacks colapsadas (flamegraph.pl, speedscope, inferno)
+    profile_call    roda uma chamada sob cProfile e devolve o relatório do pstats
+    MemoryTracker   tracemalloc: top alocações e diff entre snapshots
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional, Tuple
+
+MAX_SAMPLE_SECONDS = 60.0
+MIN_SAMPLE_INTERVAL = 0.001
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float = 10.0, interval: float = 0.005) -> Tuple[str, dict]:
+    """
+    Amostrador de pilhas por tempo limitado (bloqueia por `seconds`)
+    
+    Returns:
+        (stacks colapsadas "thread;raiz;...;folha contagem" por linha, resumo)
+    """
+    seconds = min(max(seconds, 0.0), MAX_SAMPLE_SECONDS)
+    interval = max(interval, MIN_SAMPLE_INTERVAL)
+    me = threading.get_ident()
+    counts = Counter()
+    samples = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            counts[";".join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+    
+    collapsed = "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+    return collapsed, {"seconds": seconds, "interval": interval, "samples": samples, "stacks": len(counts)}
+
+
+def profile_call(func, *args, sort: str = "cumulative", limit: int = 40, **kwargs):
+    """Executa func sob cProfile; retorna (resultado, relatório do pstats)"""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, out.getvalue()
+
+
+class MemoryTracker:
+    """tracemalloc sob demanda: start, top das alocações atuais e diff desde o último snapshot"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+    
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def start(self, frames: int = 10) -> dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._previous = self._snapshot()
+            return self.status()
+    
+    def stop(self) -> dict:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+            return {"active": False}
+    
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {"active": self.active, "traced_mb": round(current / 1e6, 2), "peak_mb": round(peak / 1e6, 2),
+                "overhead_mb": round(tracemalloc.get_tracemalloc_memory() / 1e6, 2)}
+    
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # Alocações do próprio tracemalloc/importlib só poluem o relatório
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+    
+    @staticmethod
+    def _stat(stat, diff: bool = False) -> dict:
+        frame = stat.traceback[0]
+        entry = {"location": f"{frame.filename}:{frame.lineno}", "size_kb": round(stat.size / 1024, 1),
+                 "count": stat.count}
+        if diff:
+            entry.update({"size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff})
+        return entry
+    
+    def top(self, limit: int = 20, group_by: str = "lineno") -> list:
+        """Maiores alocações vivas agora"""
+        if not self.active:
+            raise RuntimeError("tracemalloc desligado (iniciar com start)")
+        return [self._stat(s) for s in self._snapshot().statistics(group_by)[:limit]]
+    
+    def diff(self, limit: int = 20, group_by: str = "lineno") -> list:
+        """
+        Crescimento desde o snapshot anterior (start ou diff); o atual vira a nova referência
+        
+        Sem snapshot anterior (tracemalloc ligado fora de start) retorna lista vazia.
+        """
+        with self._lock:
+            if not self.active:
+                raise RuntimeError("tracemalloc desligado (iniciar com start)")
+            snapshot = self._snapshot()
+            previous, self._previous = self._previous, snapshot
+        if previous is None:
+            # tracemalloc ligado fora de start: este snapshot vira a primeira referência
+            return []
+        stats = snapshot.compare_to(previous, group_by)
+        return [self._stat(s, diff=True) for s in stats[:limit]]
@@ -3,14 +3,26 @@ RAG Pipeline - Pipeline completo de Retrieval-Augmented Generation
 """
 
 import os
+import shutil
+import time
 from pathlib import Path
 from typing import Optional
 
+from chromadb.api.client import SharedSystemClient
+
+from config import settings
 from document_loader import KnowledgeBaseLoader
 from text_splitter import DocumentSplitter
-from embeddings import EmbeddingService
-from vector_store import VectorStoreService
+from chunk_dedup import ChunkDeduplicator
+from embeddings import LEGACY_VERSION, EmbeddingService
+from vector_store import VectorStoreService, hnsw_metadata
 from llm_service import GeminiService
+from stats_engine import StatsEngine
+from stats_router import StatsRouter
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
 
 
 class RAGPipeline:
@@ -34,77 +46,208 @@ class RAGPipeline:
         self.embedding_service = EmbeddingService()
         self.embeddings = self.embedding_service.get_embeddings()
         
-        self.vector_store_service = VectorStoreService(vector_store_path)
+        self.vector_store_service = VectorStoreService(
+            vector_store_path,
+            precision=settings.VECTOR_PRECISION,
+            dims=settings.VECTOR_DIMS,
+            projection=settings.VECTOR_PROJECTION,
+            rescore=settings.VECTOR_RESCORE,
+            hierarchical=settings.HIERARCHICAL_SEARCH,
+            probe_docs=settings.HIERARCHICAL_PROBE_DOCS,
+            probe_categories=settings.HIERARCHICAL_PROBE_CATEGORIES,
+            shards=settings.VECTOR_SHARDS,
+            hnsw=hnsw_metadata(
+                space=settings.HNSW_SPACE,
+                m=settings.HNSW_M,
+                construction_ef=settings.HNSW_CONSTRUCTION_EF,
+                search_ef=settings.HNSW_SEARCH_EF
+            )
+        )
         self.llm_service = GeminiService(self.api_key)
         
+        # Engine analítico sobre o CSV (endpoint /api/stats/query e fast path)
+        self.stats_engine = self._load_stats_engine()
+        
+        # Fast path: perguntas de estatística respondidas direto da stats table
+        self.stats_router = None
+        if settings.STATS_FAST_PATH:
+            self.stats_router = StatsRouter.from_file(
+                Path(self.kb_path) / "estatisticas" / "stats_table.json",
+                min_confidence=settings.STATS_MIN_CONFIDENCE,
+                engine=self.stats_engine
+            )
+        
         # Carregar ou criar vector store
         self._initialize_vector_store()
     
+    def _load_stats_engine(self) -> Optional[StatsEngine]:
+        """Carrega o cache colunar do dataset (convertendo o CSV na primeira vez)"""
+        try:
+            return StatsEngine(settings.NHANES_CSV_PATH, settings.STATS_CACHE_PATH)
+        except FileNotFoundError:
+            print("ℹ️ Dataset NHANES não encontrado - consultas estatísticas desativadas")
+            return None
+    
     def _initialize_vector_store(self):
         """Carrega vector store existente ou cria novo"""
         chroma_path = Path(self.vs_path)
         
         if (chroma_path / "chroma.sqlite3").exists():
-            print("📂 Loading existing vector store...")
-            self.vector_store_service.load_vectorstore(self.embeddings)
-        else:
-            print("🔨 Building new vector store...")
-            self._build_vector_store()
+            # Vetores de outro embedder não são comparáveis com as queries atuais
+            stored = self.vector_store_service.stored_embedder() or LEGACY_VERSION
+            if stored == self.embedding_service.version:
+                print("📂 Loading existing vector store...")
+                self.vector_store_service.load_vectorstore(self.embeddings)
+                return
+            print(f"⚠️ Vector store built with '{stored}', current embedder is "
+                  f"'{self.embedding_service.version}': rebuilding...")
+            shutil.rmtree(chroma_path)
+        
+        print("🔨 Building new vector store...")
+        self._build_vector_store()
     
     def _build_vector_store(self):
         """Constrói vector store do zero"""
-        # Carregar documentos
+        # Carregar, dividir e indexar em streaming: os primeiros lotes de
+        # chunks vão para o embedding enquanto o resto ainda está sendo lido
         loader = KnowledgeBaseLoader(self.kb_path)
-        documents = loader.load_documents()
+        splitter = DocumentSplitter(chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP)
+        batches = splitter.iter_split(loader.iter_documents())
         
-        # Dividir em chunks
-        splitter = DocumentSplitter(chunk_size=500, chunk_overlap=50)
-        chunks = splitter.split_documents(documents)
-        
-        # Criar vector store
-        self.vector_store_service.create_vectorstore(chunks, self.embeddings)
+        # Duplicatas e quase duplicatas saem antes do embedding
+        dedup = ChunkDeduplicator(threshold=settings.DEDUP_THRESHOLD) if settings.DEDUP_CHUNKS else None
+        self.vector_store_service.create_vectorstore_from_batches(batches, self.embeddings, dedup=dedup)
     
     def rebuild_index(self):
         """Reconstrói o índice (útil após adicionar novos documentos)"""
-        import shutil
-        
         # Remover índice antigo
         chroma_path = Path(self.vs_path)
         if chroma_path.exists():
             shutil.rmtree(chroma_path)
+        # O cliente do Chroma fica em cache por caminho, ainda ligado ao SQLite apagado
+        SharedSystemClient.clear_system_cache()
         
         # Reconstruir
         self._build_vector_store()
         print("✅ Index rebuilt successfully!")
     
-    def query(self, question: str, k: int = 3) -> dict:
+    def retrieve(self, question: str, k: int = 3, adaptive: bool = False,
+                 hybrid: bool = False, mmr: bool = False, category: Optional[str] = None,
+                 source: Optional[str] = None) -> tuple:
+        """
+        Recupera documentos para a pergunta (opcionalmente só de uma categoria/fonte)
+        
+        Returns:
+            (documents, info) onde info traz o k escolhido e o motivo do corte
+        """
+        if hybrid:
+            return self.vector_store_service.hybrid_search(
+                question,
+                k=k,
+                fetch_k=settings.HYBRID_FETCH_K,
+                rrf_k=settings.HYBRID_RRF_K,
+                lexical_shortcut=settings.HYBRID_LEXICAL_SHORTCUT,
+                lexical_min_score=settings.HYBRID_LEXICAL_MIN_SCORE,
+                lexical_ratio=settings.HYBRID_LEXICAL_RATIO,
+                category=category,
+                source=source
+            )
+        
+        if mmr:
+            return self.vector_store_service.mmr_search(
+                question,
+                k=k,
+                fetch_k=max(settings.MMR_FETCH_K, k),
+                lambda_mult=settings.MMR_LAMBDA,
+                category=category,
+                source=source
+            )
+        
+        if adaptive:
+            results, info = self.vector_store_service.adaptive_search(
+                question,
+                min_k=settings.ADAPTIVE_MIN_K,
+                max_k=settings.ADAPTIVE_MAX_K,
+                fetch_k=settings.ADAPTIVE_FETCH_K,
+                score_threshold=settings.ADAPTIVE_SCORE_THRESHOLD,
+                min_gap=settings.ADAPTIVE_MIN_GAP,
+                category=category,
+                source=source
+            )
+            return [doc for doc, _ in results], info
+        
+        documents = self.vector_store_service.similarity_search(question, k=k, category=category, source=source)
+        return documents, {"k": len(documents), "cutoff_reason": "fixed_k"}
+    
+    def query(self, question: str, k: Optional[int] = None, adaptive: bool = False,
+              hybrid: bool = False, fast_path: bool = False, mmr: bool = False,
+              category: Optional[str] = None, source: Optional[str] = None) -> dict:
         """
         Processa uma pergunta e retorna resposta com fontes
         
         Args:
             question: Pergunta do usuário
-            k: Número de documentos a recuperar
+            k: Número de documentos a recuperar (padrão: RETRIEVAL_K)
+            adaptive: Escolher k pela distribuição dos scores (ignora `k`)
+            hybrid: Busca híbrida BM25 + densa (tem precedência sobre `mmr` e `adaptive`)
+            fast_path: Responder perguntas estatísticas direto da stats table (opt-in)
+            mmr: Diversificar os chunks por MMR (precedência sobre `adaptive`)
+            category: Restringe a busca a uma categoria (wikipedia, papers, conceitos, estatisticas)
+            source: Restringe a busca a uma fonte (metadata `source`)
         
         Returns:
-            dict com answer, sources, e metadata
+            dict com answer, sources, e metadata (timings: ms por etapa)
         """
+        k = k or settings.RETRIEVAL_K
+        timings = {}
+        
+        # 0. Fast path estatístico (sem retrieval nem LLM), se os filtros não excluem as estatísticas
+        if fast_path and self.stats_router and source is None and category in (None, "estatisticas"):
+            start = time.perf_counter()
+            result = self.stats_router.answer(question)
+            timings["stats_ms"] = _elapsed_ms(start)
+            if result:
+                result.update({"k_used": 0, "cutoff_reason": "stats_fast_path", "route": "stats",
+                               "timings": timings})
+                return result
+        
         # 1. Buscar documentos relevantes
-        documents = self.vector_store_service.similarity_search(question, k=k)
+        start = time.perf_counter()
+        documents, info = self.retrieve(question, k=k, adaptive=adaptive, hybrid=hybrid, mmr=mmr,
+                                        category=category, source=source)
+        timings["retrieve_ms"] = _elapsed_ms(start)
         
         if not documents:
             return {
                 "answer": "Não encontrei documentos relevantes para sua pergunta.",
                 "sources": [],
-                "num_sources": 0
+                "num_sources": 0,
+                "k_used": 0,
+                "cutoff_reason": info["cutoff_reason"],
+                "route": "rag",
+                "timings": timings
             }
         
         # 2. Gerar resposta com Gemini
+        start = time.perf_counter()
         result = self.llm_service.generate_response_with_sources(question, documents)
+        timings["generate_ms"] = _elapsed_ms(start)
+        result["k_used"] = info["k"]
+        result["cutoff_reason"] = info["cutoff_reason"]
+        result["route"] = "rag"
+        result["timings"] = timings
         
         return result
     
-    def query_with_scores(self, question: str, k: int = 3) -> dict:
+    def query_stats(self, column: str, metric: str = "mean", **kwargs) -> dict:
+        """Agregação sob demanda no dataset NHANES (ver StatsEngine.query)"""
+        if not self.stats_engine:
+            raise ValueError("Dataset NHANES não disponível")
+        return self.stats_engine.query(column, metric, **kwargs)
+    
+    def query_with_scores(self, question: str, k: Optional[int] = None) -> dict:
         """Query com scores de similaridade"""
+        k = k or settings.RETRIEVAL_K
         results = self.vector_store_service.similarity_search_with_score(question, k=k)
         
         documents = [doc for doc, score in results]
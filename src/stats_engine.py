@@ -0,0 +1,258 @@
+"""
+Stats Engine - Agregações sob demanda sobre o dataset NHANES em cache colunar
+
+As colunas ficam em .npy e são abertas com mmap: np.load devolve o array já
+pronto, sem decodificar nada a cada processo, enquanto Parquet descomprime e
+converte a coluna inteira a cada leitura. O cache Parquet dos ciclos XPT
+(scripts/nhanes_ingest.py) é outro caso: só o build o lê, e lá o formato
+vale pela compressão.
+"""
+
+import copy
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_VERSION = 1
+
+# Colunas liberadas para consulta
+NUMERIC_COLUMNS = ("Idade", "Altura_cm", "Peso_kg", "IMC")
+
+# Mesmas faixas de generate_csv_stats (intervalos fechados à direita)
+AGE_BINS = [18, 29, 44, 59, 120]
+AGE_LABELS = ["18-29", "30-44", "45-59", "60+"]
+
+CATEGORICAL_LABELS = {
+    "Sexo": ["Masculino", "Feminino"],
+    "FaixaEtaria": AGE_LABELS,
+}
+
+METRICS = ("count", "mean", "median", "std", "min", "max", "percentile", "corr")
+
+
+class StatsEngine:
+    """Consultas group-by, percentis e correlações sobre colunas NumPy memory-mapped"""
+    
+    def __init__(
+        self,
+        csv_path: str = "data/raw/nhanes_2015_2016.csv",
+        cache_dir: str = "data/cache/nhanes_columns",
+        memo_size: int = 1024
+    ):
+        self.source = str(csv_path)
+        self.csv_path = Path(csv_path)
+        self.cache_dir = Path(cache_dir)
+        self.columns: Dict[str, np.ndarray] = {}
+        
+        self._load_or_build()
+        self._memo = lru_cache(maxsize=memo_size)(self._compute)
+    
+    @property
+    def n_rows(self) -> int:
+        return len(self.columns["Idade"])
+    
+    # =========================================================================
+    # CACHE COLUNAR
+    # =========================================================================
+    
+    def _fingerprint(self) -> Optional[dict]:
+        if not self.csv_path.exists():
+            return None
+        stat = self.csv_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "version": CACHE_VERSION}
+    
+    def _load_or_build(self):
+        """Usa o cache se ele corresponde ao CSV atual; senão converte o CSV uma vez"""
+        meta_path = self.cache_dir / "meta.json"
+        fingerprint = self._fingerprint()
+        
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            # Sem o CSV (ex.: container só com o cache) o cache existente é usado
+            if fingerprint is None or meta.get("fingerprint") == fingerprint:
+                self._load_cache()
+                return
+        
+        if fingerprint is None:
+            raise FileNotFoundError(f"Dataset NHANES não encontrado: {self.csv_path}")
+        self.build_cache()
+        self._load_cache()
+    
+    def build_cache(self):
+        """Converte o CSV em colunas tipadas (.npy): float32 numéricas, int8 categóricas"""
+        print(f"⏳ Building columnar cache from {self.csv_path}...")
+        
+        df = pd.read_csv(self.csv_path, usecols=lambda c: c in NUMERIC_COLUMNS or c == "Sexo")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        for col in NUMERIC_COLUMNS:
+            np.save(self.cache_dir / f"{col}.npy", df[col].to_numpy(dtype=np.float32))
+        
+        # Categóricas como códigos int8 (-1 = ausente)
+        sexo = df["Sexo"].map({1: 0, 2: 1}).fillna(-1).to_numpy(dtype=np.int8)
+        np.save(self.cache_dir / "Sexo.npy", sexo)
+        
+        faixa = pd.cut(df["Idade"], bins=AGE_BINS, labels=AGE_LABELS).cat.codes
+        np.save(self.cache_dir / "FaixaEtaria.npy", faixa.to_numpy(dtype=np.int8))
+        
+        meta = {"fingerprint": self._fingerprint(), "rows": len(df), "source": self.source}
+        with open(self.cache_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        
+        print(f"✅ Columnar cache: {len(df):,} rows in {self.cache_dir}")
+    
+    def _load_cache(self):
+        for col in list(NUMERIC_COLUMNS) + list(CATEGORICAL_LABELS):
+            self.columns[col] = np.load(self.cache_dir / f"{col}.npy", mmap_mode="r")
+    
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+    
+    def _validate(self, column, metric, group_by, percentiles, with_column):
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"Coluna não permitida: {column} (use {', '.join(NUMERIC_COLUMNS)})")
+        if metric not in METRICS:
+            raise ValueError(f"Métrica inválida: {metric} (use {', '.join(METRICS)})")
+        for group in group_by:
+            if group not in CATEGORICAL_LABELS:
+                raise ValueError(f"Agrupamento não permitido: {group} "
+                                 f"(use {', '.join(CATEGORICAL_LABELS)})")
+        if metric == "percentile" and not percentiles:
+            raise ValueError("Informe os percentis para metric=percentile")
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("Percentis devem estar entre 0 e 100")
+        if metric == "corr" and with_column not in NUMERIC_COLUMNS:
+            raise ValueError(f"metric=corr requer with_column em {', '.join(NUMERIC_COLUMNS)}")
+    
+    def query(
+        self,
+        column: str,
+        metric: str = "mean",
+        group_by: Sequence[str] = (),
+        percentiles: Sequence[float] = (),
+        with_column: Optional[str] = None,
+        min_age: Optional[float] = 18
+    ) -> dict:
+        """
+        Agregação de uma coluna numérica, opcionalmente por grupos
+
+        Args:
+            column: Coluna numérica (IMC, Peso_kg, Altura_cm, Idade)
+            metric: count, mean, median, std, min, max, percentile ou corr
+            group_by: Colunas categóricas (Sexo, FaixaEtaria)
+            percentiles: Percentis (0-100) para metric=percentile
+            with_column: Segunda coluna para metric=corr
+            min_age: Idade mínima (18 = adultos, como na knowledge base)
+        """
+        key = (
+            column,
+            metric,
+            tuple(group_by),
+            tuple(float(p) for p in percentiles) if metric == "percentile" else (),
+            with_column if metric == "corr" else None,
+            min_age
+        )
+        self._validate(*key[:5])
+        
+        hits = self._memo.cache_info().hits
+        start = time.perf_counter()
+        # Cópia profunda: o resultado memoizado não pode ser alterado por quem chamou
+        result = copy.deepcopy(self._memo(key))
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        result["cached"] = self._memo.cache_info().hits > hits
+        return result
+    
+    def _compute(self, key) -> dict:
+        column, metric, group_by, percentiles, with_column, min_age = key
+        
+        values = np.asarray(self.columns[column], dtype=np.float64)
+        mask = ~np.isnan(values)
+        other = None
+        if with_column:
+            other = np.asarray(self.columns[with_column], dtype=np.float64)
+            mask &= ~np.isnan(other)
+        if min_age is not None:
+            mask &= self.columns["Idade"] >= min_age
+        
+        # Chave de grupo em base mista: código_1 * n_2 + código_2 ...
+        keys = np.zeros(len(values), dtype=np.int64)
+        for group in group_by:
+            codes = np.asarray(self.columns[group], dtype=np.int64)
+            mask &= codes >= 0
+            keys = keys * len(CATEGORICAL_LABELS[group]) + codes
+        
+        keys, values = keys[mask], values[mask]
+        order = np.argsort(keys, kind="stable")
+        keys, values = keys[order], values[order]
+        if other is not None:
+            other = other[mask][order]
+        
+        unique_keys, starts = np.unique(keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        
+        groups = []
+        for group_key, begin, end in zip(unique_keys, starts, ends):
+            segment = values[begin:end]
+            other_segment = other[begin:end] if other is not None else None
+            groups.append({
+                "group": self._decode(int(group_key), group_by),
+                "n": int(end - begin),
+                "value": self._aggregate(metric, segment, other_segment, percentiles),
+            })
+        
+        return {
+            "column": column,
+            "metric": metric,
+            "group_by": list(group_by),
+            "with_column": with_column,
+            "min_age": min_age,
+            "groups": groups,
+            "source": self.source,
+        }
+    
+    @staticmethod
+    def _aggregate(metric, segment, other, percentiles):
+        n = len(segment)
+        if metric == "count":
+            return n
+        if metric == "percentile":
+            return {f"p{p:g}": round(float(v), 4) for p, v in zip(percentiles, np.percentile(segment, percentiles))}
+        if metric == "std":
+            value = segment.std(ddof=1) if n > 1 else float("nan")
+        elif metric == "corr":
+            value = np.corrcoef(segment, other)[0, 1] if n > 1 else float("nan")
+        else:
+            value = {"mean": np.mean, "median": np.median, "min": np.min, "max": np.max}[metric](segment)
+        value = float(value)
+        return None if np.isnan(value) else round(value, 4)
+    
+    @staticmethod
+    def _decode(group_key: int, group_by: Sequence[str]) -> Dict[str, str]:
+        labels = {}
+        for group in reversed(group_by):
+            size = len(CATEGORICAL_LABELS[group])
+            labels[group] = CATEGORICAL_LABELS[group][group_key % size]
+            group_key //= size
+        return {group: labels[group] for group in group_by}
+
+
+if __name__ == "__main__":
+    engine = StatsEngine()
+    for spec in [
+        {"column": "IMC", "metric": "mean", "group_by": ["Sexo", "FaixaEtaria"]},
+        {"column": "IMC", "metric": "percentile", "percentiles": [5, 50, 95]},
+        {"column": "Peso_kg", "metric": "corr", "with_column": "Altura_cm", "group_by": ["Sexo"]},
+    ]:
+        for _ in range(2):
+            result = engine.query(**spec)
+            print(f"{spec} -> {result['elapsed_ms']} ms (cached={result['cached']})")
+        for group in result["groups"]:
+            print(f"   {group}")
@@ -0,0 +1,323 @@
+"""
+Stats Router - Responde perguntas estatísticas direto da stats table (sem LLM)
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from lexical_index import fold_accents
+
+
+# Sinônimos (já sem acento) -> nome da coluna/estatística na stats table
+VARIABLE_ALIASES = {
+    "IMC": ["imc", "bmi", "indice de massa corporal", "body mass index", "massa corporal"],
+    "Peso_kg": ["peso_kg", "peso", "weight"],
+    "Altura_cm": ["altura_cm", "altura", "estatura", "height"],
+    "Idade": ["idade", "age"],
+}
+
+STATISTIC_ALIASES = {
+    "percentile": ["percentil", "percentis", "percentile", "quartil", "quartis", "quartile"],
+    "corr": ["correlacao", "correlacoes", "correlacionado", "correlacionada", "correlacionados",
+             "correlacionadas", "correlation", "correlated"],
+    "median": ["mediana", "median"],
+    "std": ["desvio padrao", "desvio-padrao", "standard deviation", "dp"],
+    "min": ["minimo", "minima", "minimum", "menor valor"],
+    "max": ["maximo", "maxima", "maximum", "maior valor"],
+    "count": ["quantos", "quantas", "numero de registros", "how many", "tamanho da amostra"],
+    "mean": ["media", "medio", "average", "mean"],
+}
+
+GROUP_ALIASES = {
+    "FaixaEtaria": ["faixa etaria", "faixas etarias", "grupo etario", "grupos etarios",
+                    "por idade", "age group", "by age"],
+    "Sexo": ["por sexo", "sexo", "genero", "homens e mulheres", "by sex", "gender",
+             "mulheres", "mulher", "homens", "homem", "feminino", "masculino",
+             "women", "woman", "men", "man", "female", "male"],
+}
+
+# Ordem fixa dos grupos na resposta (a stats table e o StatsEngine ordenam diferente)
+GROUP_ORDER = {
+    "Sexo": ["Masculino", "Feminino"],
+    "FaixaEtaria": ["18-29", "30-44", "45-59", "60+"],
+}
+
+# Palavras que não restringem a pergunta; qualquer outra sobra (ex.: "fumantes",
+# "50 anos") é um filtro que a stats table não conhece
+NEUTRAL_WORDS = {
+    "qual", "quais", "quanto", "quanta", "e", "sao", "o", "a", "os", "as", "um", "uma", "de", "do", "da",
+    "dos", "das", "no", "na", "nos", "nas", "em", "entre", "por", "para", "pelo", "pela", "valor",
+    "valores", "geral", "total", "todos", "todas", "adulto", "adultos", "pessoa", "pessoas", "populacao",
+    "amostra", "dataset", "dados", "nhanes", "grupo", "grupos", "cm", "kg", "calcule", "mostre",
+    "what", "which", "is", "are", "the", "of", "in", "for", "by", "between", "and", "group", "groups",
+    "overall", "all", "adults", "people", "population", "sample", "data", "show",
+}
+
+# Perguntas explicativas vão para o RAG mesmo citando uma variável
+EXPLANATORY_CUES = ["por que", "porque", "explique", "interprete", "interpretar", "interpretacao",
+                    "o que e", "o que significa", "como calcular", "como funciona", "why", "explain",
+                    "interpret", "interpretation", "what is a", "what is an", "what does", "how to"]
+
+STATISTIC_LABELS = {
+    "count": "N", "mean": "média", "median": "mediana", "std": "desvio padrão",
+    "min": "mínimo", "max": "máximo", "corr": "correlação de Pearson", "percentile": "percentis",
+}
+
+VARIABLE_LABELS = {"IMC": "IMC", "Peso_kg": "Peso (kg)", "Altura_cm": "Altura (cm)", "Idade": "Idade"}
+
+GROUP_LABELS = {"FaixaEtaria": "faixa etária", "Sexo": "sexo"}
+
+# "percentil 90", "p90", "percentis 10 e 90", "percentis 10, 50 e 90"
+_NUMBER = r"\d{1,2}(?:\.\d+)?"
+_PERCENTILE_RE = re.compile(rf"\b(?:percentil(?:e)?s?|percentis|p)\s*({_NUMBER}(?:\s*(?:,|\be\b|\band\b)\s*{_NUMBER})*)\b")
+
+_EXPLANATORY_RE = re.compile(r"\b(?:" + "|".join(re.escape(cue) for cue in EXPLANATORY_CUES) + r")\b")
+
+
+def _blank(text: str, begin: int, end: int) -> str:
+    return text[:begin] + " " * (end - begin) + text[end:]
+
+
+def _blank_all(text: str, aliases: List[str]) -> str:
+    """Apaga todas as ocorrências dos aliases (mesma regra de palavra inteira do _find)"""
+    for alias in sorted(aliases, key=len, reverse=True):
+        text = re.sub(rf"\b{re.escape(alias)}s?\b", lambda m: " " * len(m.group()), text)
+    return text
+
+
+def _rank(group_by: Optional[str], group: str) -> int:
+    """Posição do grupo em GROUP_ORDER (desconhecidos no fim; o sort estável mantém a ordem)"""
+    order = GROUP_ORDER.get(group_by, [])
+    return order.index(group) if group in order else len(order)
+
+
+def _find(text: str, aliases: List[str]) -> Optional[Tuple[int, int]]:
+    """Posição (início, fim) da primeira ocorrência de algum alias como palavra inteira (ou no plural em -s)"""
+    best = None
+    for alias in aliases:
+        match = re.search(rf"\b{re.escape(alias)}s?\b", text)
+        if match and (best is None or match.start() < best[0]):
+            best = (match.start(), match.end())
+    return best
+
+
+class StatsRouter:
+    """
+    Roteia perguntas de estatística (variável x estatística x grupo) para a stats table
+    
+    Combinações que não estão na tabela (ex.: IMC por sexo e faixa etária,
+    percentis) são calculadas pelo StatsEngine, se disponível.
+    """
+    
+    def __init__(self, table: dict, min_confidence: float = 0.8, engine=None):
+        self.engine = engine
+        default_source = engine.source if engine else "data/raw/nhanes_2015_2016.csv"
+        self.source = table.get("source", default_source)
+        self.population = table.get("population", "adultos 18+")
+        self.min_confidence = min_confidence
+        
+        # (variável, agrupamento, estatística, with) -> [(grupo, valor)]
+        self.index = {}
+        for row in table.get("rows", []):
+            key = (row["variable"], row.get("group_by"), row["statistic"], row.get("with"))
+            self.index.setdefault(key, []).append((row["group"], row["value"]))
+    
+    @classmethod
+    def from_file(cls, path, min_confidence: float = 0.8, engine=None) -> Optional["StatsRouter"]:
+        """Carrega a stats table gerada pelo builder (None se não existir nem houver engine)"""
+        path = Path(path)
+        if not path.exists():
+            return cls({}, min_confidence=min_confidence, engine=engine) if engine else None
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), min_confidence=min_confidence, engine=engine)
+    
+    def parse(self, question: str) -> dict:
+        """Extrai variáveis, estatística e agrupamento da pergunta, com uma confiança (0-1)"""
+        text = fold_accents(question)
+        
+        # Agrupamentos primeiro, removendo os trechos para não confundir
+        # "por idade" (grupo) com a variável Idade
+        found = []
+        for name, aliases in GROUP_ALIASES.items():
+            pos = _find(text, aliases)
+            if pos:
+                found.append((pos, name))
+        for (begin, end), _ in found:
+            text = _blank(text, begin, end)
+        groups = [name for _, name in sorted(found)]
+        # Texto do que ainda não foi reconhecido (todas as ocorrências apagadas)
+        rest = _PERCENTILE_RE.sub(" ", text)
+        for aliases in GROUP_ALIASES.values():
+            rest = _blank_all(rest, aliases)
+        
+        found = []
+        for name, aliases in VARIABLE_ALIASES.items():
+            pos = _find(text, aliases)
+            if pos:
+                found.append((pos[0], name))
+            rest = _blank_all(rest, aliases)
+        variables = [name for _, name in sorted(found)]
+        
+        statistics = []
+        for name, aliases in STATISTIC_ALIASES.items():
+            if _find(text, aliases):
+                statistics.append(name)
+                rest = _blank_all(rest, aliases)
+        if "percentile" not in statistics and _PERCENTILE_RE.search(text):
+            statistics.insert(0, "percentile")  # "p10 e p90"
+        statistic = statistics[0] if statistics else None
+        
+        percentiles = []
+        if statistic == "percentile":
+            for match in _PERCENTILE_RE.finditer(text):
+                percentiles += [float(p) for p in re.findall(_NUMBER, match.group(1))]
+            percentiles = percentiles or [25.0, 50.0, 75.0]
+        
+        # Palavras que nenhuma regra consumiu (números, "fumantes"...) restringem a pergunta
+        unparsed = [word for word in re.findall(r"\w+", rest) if word not in NEUTRAL_WORDS]
+        
+        confidence = 0.0
+        if variables:
+            confidence += 0.5
+        if statistic:
+            confidence += 0.3
+        if statistic == "corr" or groups or len(variables) == 1:
+            confidence += 0.2
+        if _EXPLANATORY_RE.search(text):
+            confidence -= 0.5
+        # Filtro desconhecido ou várias estatísticas: a tabela responderia outra pergunta
+        if unparsed or len(statistics) > 1:
+            confidence -= 0.5
+        
+        return {
+            "variables": variables,
+            "statistic": statistic,
+            "groups": groups,
+            "percentiles": percentiles,
+            "unparsed": unparsed,
+            "confidence": round(max(confidence, 0.0), 2),
+        }
+    
+    def _lookup(self, intent: dict) -> Optional[List[str]]:
+        """Linhas de resposta a partir da stats table (None se a combinação não existe)"""
+        variables = intent["variables"]
+        statistic = intent["statistic"] or "mean"
+        groups = intent["groups"]
+        
+        if len(groups) > 1 or statistic == "percentile" or (statistic == "corr" and groups):
+            return None
+        group_by = groups[0] if groups else None
+        
+        if statistic == "corr":
+            pairs = []
+            targets = variables[1:] or [None]
+            for other in targets:
+                for with_var, value in self._correlations(variables[0], other):
+                    pairs.append(f"- {VARIABLE_LABELS[variables[0]]} × "
+                                 f"{VARIABLE_LABELS.get(with_var, with_var)}: r = {value:.3f}")
+            return pairs or None
+        
+        if len(variables) != 1:
+            return None
+        
+        values = self.index.get((variables[0], group_by, statistic, None))
+        if not values:
+            return None
+        
+        counts = dict(self.index.get((variables[0], group_by, "count", None), []))
+        lines = []
+        for group, value in sorted(values, key=lambda item: _rank(group_by, item[0])):
+            n = f" (N={int(counts[group]):,})" if group in counts and statistic != "count" else ""
+            formatted = f"{int(value):,}" if statistic == "count" else f"{value:.2f}"
+            lines.append(f"- {group}: {formatted}{n}")
+        return lines
+    
+    def _engine_lookup(self, intent: dict) -> Optional[List[str]]:
+        """Linhas de resposta calculadas sob demanda pelo StatsEngine"""
+        variables = intent["variables"]
+        statistic = intent["statistic"] or "mean"
+        
+        if statistic == "corr":
+            if len(variables) < 2:
+                return None
+            result = self.engine.query(variables[0], "corr", group_by=intent["groups"],
+                                       with_column=variables[1])
+        elif len(variables) == 1:
+            result = self.engine.query(variables[0], statistic, group_by=intent["groups"],
+                                       percentiles=intent["percentiles"])
+        else:
+            return None
+        
+        lines = []
+        groups = sorted(result["groups"],
+                        key=lambda g: tuple(_rank(column, value) for column, value in g["group"].items()))
+        for group in groups:
+            label = " / ".join(group["group"].values()) or "Total"
+            value = group["value"]
+            if value is None:
+                formatted = "n/d"
+            elif statistic == "percentile":
+                formatted = ", ".join(f"{name}: {v:.2f}" for name, v in value.items())
+            elif statistic == "count":
+                formatted = f"{value:,}"
+            elif statistic == "corr":
+                formatted = f"r = {value:.3f}"
+            else:
+                formatted = f"{value:.2f}"
+            n = f" (N={group['n']:,})" if statistic != "count" else ""
+            lines.append(f"- {label}: {formatted}{n}")
+        return lines or None
+    
+    def _correlations(self, variable: str, other: Optional[str]):
+        for (var, _, statistic, with_var), values in self.index.items():
+            if var == variable and statistic == "corr" and (other is None or with_var == other):
+                yield with_var, values[0][1]
+    
+    def answer(self, question: str) -> Optional[dict]:
+        """Resposta direta da stats table, ou None para seguir pelo RAG"""
+        intent = self.parse(question)
+        if not intent["variables"] or intent["confidence"] < self.min_confidence:
+            return None
+        
+        source = self.source
+        lines = self._lookup(intent)
+        if not lines and self.engine:
+            lines = self._engine_lookup(intent)
+            source = self.engine.source
+        if not lines:
+            return None
+        
+        statistic = intent["statistic"] or "mean"
+        if statistic == "corr" and intent["groups"]:
+            first, second = (VARIABLE_LABELS[v] for v in intent["variables"][:2])
+            title = f"Correlação de Pearson {first} × {second}"
+        elif statistic == "corr":
+            title = "Correlações de Pearson"
+        else:
+            title = f"{STATISTIC_LABELS[statistic].capitalize()} de {VARIABLE_LABELS[intent['variables'][0]]}"
+        if intent["groups"]:
+            title += " por " + " e ".join(GROUP_LABELS[g] for g in intent["groups"])
+        
+        population = f", {self.population}" if self.population else ""
+        answer = f"{title} (NHANES 2015-2016{population}):\n\n" + "\n".join(lines)
+        
+        return {
+            "answer": answer,
+            "sources": [source],
+            "num_sources": 1,
+            "confidence": intent["confidence"],
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    
+    router = StatsRouter.from_file("data/knowledge_base/estatisticas/stats_table.json")
+    question = " ".join(sys.argv[1:]) or "Qual o IMC médio por faixa etária?"
+    if router is None:
+        print("⚠️ stats_table.json não encontrada (rode o builder com o CSV)")
+    else:
+        print(router.parse(question))
+        print(router.answer(question))
@@ -2,27 +2,171 @@
 Text Splitter - Divide documentos em chunks
 """
 
-from typing import List
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Tuple
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+SEPARATORS = ["\n\n", "\n", ".", " ", ""]
+
+
+class Chunk(NamedTuple):
+    """Chunk como posição no texto do documento (text[start:end])"""
+    doc_id: int
+    start: int
+    end: int
+
+
+class OffsetChunker:
+    """
+    Mesmo algoritmo do RecursiveCharacterTextSplitter (keep_separator=True,
+    strip_whitespace=True, length_function=len), mas sobre offsets
+
+    Cada nível escolhe o primeiro separador presente no trecho e o corta em
+    pedaços que começam no separador; pedaços menores que chunk_size são
+    agrupados com overlap e os maiores descem para o próximo separador. Como
+    os pedaços de um nível são contíguos, um chunk é só (start, end) no texto
+    original: nenhuma string intermediária é criada.
+    """
+    
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50,
+                 separators: Sequence[str] = SEPARATORS):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) maior que chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) de cada chunk; text[start:end] é o chunk do LangChain"""
+        spans = []
+        self._split(text, 0, len(text), 0, spans)
+        return spans
+    
+    def _split(self, text: str, start: int, end: int, level: int, out: list):
+        separators = self.separators
+        separator, next_level = separators[-1], len(separators)
+        for i in range(level, len(separators)):
+            if separators[i] == "":
+                separator = ""
+                break
+            if text.find(separators[i], start, end) != -1:
+                separator, next_level = separators[i], i + 1
+                break
+        
+        good = []
+        for a, b in self._pieces(text, start, end, separator):
+            if b - a < self.chunk_size:
+                good.append((a, b))
+                continue
+            if good:
+                self._merge(text, good, out)
+                good = []
+            if next_level >= len(separators):
+                out.append((a, b))
+            else:
+                self._split(text, a, b, next_level, out)
+        if good:
+            self._merge(text, good, out)
+    
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> Iterator[Tuple[int, int]]:
+        """Pedaços não vazios; a partir do 2º, cada um começa com o separador"""
+        if not separator:
+            for i in range(start, end):
+                yield i, i + 1
+            return
+        
+        step = len(separator)
+        pos = text.find(separator, start, end)
+        if pos == -1:
+            if end > start:
+                yield start, end
+            return
+        if pos > start:
+            yield start, pos
+        while pos != -1:
+            following = text.find(separator, pos + step, end)
+            yield pos, (end if following == -1 else following)
+            pos = following
+    
+    def _merge(self, text: str, splits: List[Tuple[int, int]], out: list):
+        """Agrupa pedaços consecutivos em chunks de até chunk_size, com overlap"""
+        total = 0
+        first = 0  # início da janela atual em splits
+        for j, (a, b) in enumerate(splits):
+            length = b - a
+            if total + length > self.chunk_size and j > first:
+                self._emit(text, splits[first][0], splits[j - 1][1], out)
+                # Mantém no fim da janela só o que cabe no overlap
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    total -= splits[first][1] - splits[first][0]
+                    first += 1
+            total += length
+        self._emit(text, splits[first][0], splits[-1][1], out)
+    
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: list):
+        # Equivalente a .strip() sem criar a string
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            out.append((start, end))
 
 
 class DocumentSplitter:
     """Divide documentos em chunks para embedding"""
     
     def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ".", " ", ""]
-        )
+        self.chunker = OffsetChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    
+    def split_offsets(self, documents: Sequence[Document]) -> List[Chunk]:
+        """Chunks como (índice do documento, start, end), sem criar strings"""
+        return [Chunk(doc_id, start, end)
+                for doc_id, doc in enumerate(documents)
+                for start, end in self.chunker.split_spans(doc.page_content)]
+    
+    @staticmethod
+    def chunk_document(document: Document, start: int, end: int) -> Document:
+        """
+        Document do chunk; start_index/end_index no metadata dão o trecho exato
+        para citação (metadata copiado raso, não deepcopy)
+        """
+        metadata = dict(document.metadata)
+        metadata["start_index"] = start
+        metadata["end_index"] = end
+        # Campos já válidos (str e dict): construct pula a validação do pydantic
+        return Document.construct(page_content=document.page_content[start:end], metadata=metadata)
+    
+    def _split_document(self, document: Document) -> List[Document]:
+        return [self.chunk_document(document, start, end)
+                for start, end in self.chunker.split_spans(document.page_content)]
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """Divide lista de documentos em chunks menores"""
-        chunks = self.splitter.split_documents(documents)
+        chunks = [chunk for doc in documents for chunk in self._split_document(doc)]
         print(f"✅ Created {len(chunks)} chunks from {len(documents)} documents")
         return chunks
+    
+    def iter_split(self, documents: Iterable[Document], batch_size: int = 256) -> Iterator[List[Document]]:
+        """
+        Divide documentos à medida que chegam, em lotes de ~batch_size chunks
+
+        Mesmos chunks (e ordem) de split_documents, sem esperar todos os documentos.
+        """
+        batch = []
+        n_docs = n_chunks = 0
+        for doc in documents:
+            batch.extend(self._split_document(doc))
+            n_docs += 1
+            if len(batch) >= batch_size:
+                n_chunks += len(batch)
+                yield batch
+                batch = []
+        if batch:
+            n_chunks += len(batch)
+            yield batch
+        print(f"✅ Created {n_chunks} chunks from {n_docs} documents")
 
 
 if __name__ == "__main__":
@@ -36,4 +180,4 @@ if __name__ == "__main__":
     
     print(f"\nExample chunk:")
     print(f"Content: {chunks[0].page_content[:200]}...")
-    print(f"Metadata: {chunks[0].metadata}")
\ No newline at end of file
+    print(f"Metadata: {chunks[0].metadata}")
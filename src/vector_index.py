@@ -0,0 +1,347 @@
+"""
+Vector Index - Índice vetorial em memória (NumPy) com representação compacta
+
+Os vetores vêm da coleção do Chroma e são pontuados em NumPy com a mesma
+métrica do Chroma (distância L2 ao quadrado). Opcionalmente:
+    precision  float16 ou int8 (escala por vetor: v ≈ code * scale)
+    dims       truncar (primeiras dims) ou projetar por PCA para menos dimensões
+Com representação compacta, a busca pontua todos os vetores compactos, separa
+uma shortlist (k * rescore) e reordena pela distância exata, lida dos vetores
+float32 completos mapeados do disco (np.load com mmap): só as linhas da
+shortlist são lidas, e a memória residente é a dos códigos compactos.
+
+Latência do float16: o NumPy não multiplica matrizes em half, então cada bloco
+de códigos é convertido para float32 em toda busca (conversão em software,
+mais lenta que o próprio produto). Com 5k × 768 a busca leva ~11 ms contra
+~0.8 ms do float32 e ~2 ms do int8; um buffer float32 reaproveitado não
+ajuda (np.copyto converte ainda mais devagar que astype). float16 só compensa
+quando a memória pesa mais que a latência; senão, int8.
+"""
+
+import json
+import pickle
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+PROJECTIONS = ("truncate", "pca")
+INDEX_VERSION = 1
+
+# Linhas pontuadas por vez (limita a cópia float32 temporária dos códigos)
+BLOCK_ROWS = 2048
+
+
+class VectorIndex:
+    """Vetores de chunks + textos/metadata, com busca exata ou compacta + rescoring"""
+    
+    def __init__(self, full: np.ndarray, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[dict],
+                 precision: str = "float32", dims: Optional[int] = None, projection: str = "truncate",
+                 rescore: int = 4):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision deve ser um de {PRECISIONS}, recebido '{precision}'")
+        if projection not in PROJECTIONS:
+            raise ValueError(f"projection deve ser um de {PROJECTIONS}, recebido '{projection}'")
+        
+        self.full = full
+        self.ids = list(ids)
+        self.texts = list(texts)
+        self.metadatas = list(metadatas)
+        self.precision = precision
+        self.dims = dims if dims and dims < full.shape[1] else None
+        self.projection = projection
+        self.rescore = rescore
+        
+        self.mean = self.components = None
+        self.codes = self.scales = self.sq_norms = None
+    
+    @classmethod
+    def build(cls, embeddings, ids, texts, metadatas, **options) -> "VectorIndex":
+        full = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        index = cls(full, ids, texts, metadatas, **options)
+        index._encode()
+        return index
+    
+    # ------------------------------------------------------------------
+    # Codificação
+    # ------------------------------------------------------------------
+    
+    @property
+    def compact(self) -> bool:
+        return self.precision != "float32" or self.dims is not None
+    
+    @property
+    def options(self) -> dict:
+        return {"precision": self.precision, "dims": self.dims, "projection": self.projection}
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def _fit_pca(self, sample_size: int = 20_000, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        rows = self.full if len(self.full) <= sample_size else self.full[rng.choice(len(self.full), sample_size, replace=False)]
+        self.mean = rows.mean(axis=0)
+        # Componentes principais = vetores singulares à direita
+        _, _, vt = np.linalg.svd(rows - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.dims].T, dtype=np.float32)
+    
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Leva vetores (n, d) ou (d,) para o espaço reduzido"""
+        if self.dims is None:
+            return vectors
+        if self.projection == "pca":
+            return (vectors - self.mean) @ self.components
+        return vectors[..., :self.dims]
+    
+    def _encode(self):
+        if self.dims is not None and self.projection == "pca":
+            self._fit_pca()
+        reduced = np.ascontiguousarray(self.project(self.full), dtype=np.float32)
+        self.sq_norms = np.einsum("ij,ij->i", reduced, reduced)
+        
+        if self.precision == "int8":
+            self.scales = np.abs(reduced).max(axis=1) / 127.0
+            self.scales[self.scales == 0] = 1.0
+            self.codes = np.round(reduced / self.scales[:, None]).astype(np.int8)
+        elif self.precision == "float16":
+            self.codes = reduced.astype(np.float16)
+        else:
+            self.codes = reduced
+    
+    def memory_bytes(self) -> int:
+        """Bytes residentes usados na busca (sem os vetores completos, se compacto)"""
+        arrays = [self.codes, self.scales, self.sq_norms, self.mean, self.components]
+        return sum(a.nbytes for a in arrays if a is not None)
+    
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+    
+    def _approx_distances(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        q = np.asarray(self.project(query), dtype=np.float32)
+        n = len(self) if rows is None else len(rows)
+        out = np.empty(n, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = slice(start, min(start + BLOCK_ROWS, n))
+            selector = block if rows is None else rows[block]
+            dots = self.codes[selector].astype(np.float32, copy=False) @ q
+            if self.scales is not None:
+                dots *= self.scales[selector]
+            out[block] = self.sq_norms[selector] - 2 * dots
+        return out + float(q @ q)
+    
+    def exact_distances(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        diff = np.asarray(self.full[rows], dtype=np.float32) - query
+        return np.einsum("ij,ij->i", diff, diff)
+    
+    def search(self, query, k: int = 3, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (linhas, distâncias L2²) dos k vizinhos mais próximos, em ordem crescente
+
+        `rows` restringe a busca a um subconjunto de linhas (ex.: filtro por
+        categoria): só essas linhas são lidas e pontuadas.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        n = len(self) if rows is None else len(rows)
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        distances = self._approx_distances(query, rows)
+        shortlist_size = min(n, k * self.rescore if self.compact else k)
+        shortlist = np.argpartition(distances, shortlist_size - 1)[:shortlist_size]
+        candidates = shortlist if rows is None else np.asarray(rows)[shortlist]
+        
+        if self.compact:
+            # Rescoring exato só na shortlist
+            scores = self.exact_distances(query, candidates)
+        else:
+            scores = distances[shortlist]
+        
+        order = np.argsort(scores, kind="stable")[:k]
+        return candidates[order], scores[order]
+    
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+    
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "full.npy", self.full)
+        # Sem compactação os códigos são os próprios vetores completos
+        names = ("codes", "scales", "sq_norms", "mean", "components") if self.compact else ("sq_norms",)
+        arrays = {name: getattr(self, name) for name in names if getattr(self, name) is not None}
+        np.savez(directory / "codes.npz", **arrays)
+        with open(directory / "rows.pkl", "wb") as f:
+            pickle.dump({"ids": self.ids, "texts": self.texts, "metadatas": self.metadatas}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "count": len(self), "rescore": self.rescore, **self.options}, f)
+    
+    @classmethod
+    def load(cls, directory, row_range: Optional[Tuple[int, int]] = None) -> "VectorIndex":
+        """
+        Carrega o índice persistido
+
+        Com `row_range` (start, end) carrega só essa fatia dos vetores, sem
+        textos nem metadata (ids = linhas globais): é o que um shard precisa.
+        """
+        directory = Path(directory)
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Índice vetorial de outra versão em {directory}")
+        
+        compact = meta["precision"] != "float32" or meta["dims"] is not None
+        # Vetores completos ficam no disco (mmap) quando só servem ao rescoring
+        full = np.load(directory / "full.npy", mmap_mode="r" if compact or row_range else None)
+        if row_range:
+            start, end = row_range
+            full = full[start:end] if compact else np.array(full[start:end])
+            ids, texts, metadatas = range(start, end), (), ()
+        else:
+            with open(directory / "rows.pkl", "rb") as f:
+                rows = pickle.load(f)
+            ids, texts, metadatas = rows["ids"], rows["texts"], rows["metadatas"]
+        
+        index = cls(full, ids, texts, metadatas, precision=meta["precision"],
+                    dims=meta["dims"], projection=meta["projection"], rescore=meta["rescore"])
+        with np.load(directory / "codes.npz") as arrays:
+            for name in arrays.files:
+                array = arrays[name]
+                if row_range and name in ("codes", "scales", "sq_norms"):
+                    array = np.ascontiguousarray(array[start:end])
+                setattr(index, name, array)
+        if not compact:
+            index.codes = index.full
+        return index
+
+
+def group_rows(metadatas: Sequence[dict], key: str) -> Dict[str, np.ndarray]:
+    """Linhas de cada valor de um campo do metadata (ex.: category -> [linhas])"""
+    groups: Dict[str, List[int]] = {}
+    for row, metadata in enumerate(metadatas):
+        groups.setdefault(str(metadata.get(key, "")), []).append(row)
+    return {value: np.asarray(rows, dtype=np.int64) for value, rows in groups.items()}
+
+
+class MetadataFilter:
+    """
+    Linhas pré-computadas de cada categoria e de cada fonte
+
+    Com `aliases` (ex.: chunk_dedup.alias_sources), uma fonte também casa com
+    os chunks canônicos que a têm entre as fontes das duplicatas descartadas. A busca filtrada pontua só a
+    interseção das listas, então o custo acompanha o tamanho do subconjunto.
+    """
+    
+    def __init__(self, metadatas: Sequence[dict], aliases: Optional[Callable[[dict], List[str]]] = None):
+        self.categories = group_rows(metadatas, "category")
+        by_source: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(metadatas):
+            sources = {str(metadata.get("source", ""))}
+            if aliases:
+                sources.update(aliases(metadata))
+            for source in sources:
+                by_source.setdefault(source, []).append(row)
+        self.sources = {source: np.asarray(rows, dtype=np.int64) for source, rows in by_source.items()}
+    
+    def rows(self, category: Optional[str] = None, source: Optional[str] = None) -> Optional[np.ndarray]:
+        """Linhas (ordenadas) que passam nos filtros; None se não há filtro"""
+        selected = None
+        for groups, value in ((self.categories, category), (self.sources, source)):
+            if value is None:
+                continue
+            rows = groups.get(value, np.empty(0, dtype=np.int64))
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        return selected
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 5, seed: int = 0) -> np.ndarray:
+    """Lloyd simples para os sub-centroides de um documento grande"""
+    rng = np.random.default_rng(seed)
+    centers = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        distances = ((vectors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        for c in range(n_clusters):
+            members = vectors[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return centers
+
+
+class CentroidRouter:
+    """
+    Busca em dois níveis sobre um VectorIndex: centroides, depois chunks
+
+    Cada documento (`doc_key`, padrão "file") tem 1 centroide, ou alguns
+    (k-means) quando tem muitos chunks; cada categoria tem o centroide dos
+    seus chunks. A busca escolhe as `probe_categories` categorias mais
+    próximas (0 = todas), os `probe` documentos mais próximos dentro delas
+    e só então pontua os chunks desses documentos.
+    """
+    
+    def __init__(self, index: VectorIndex, doc_key: str = "file", category_key: str = "category",
+                 chunks_per_centroid: int = 32, max_centroids: int = 8):
+        self.index = index
+        
+        by_doc = group_rows(index.metadatas, doc_key)
+        self.doc_names = list(by_doc)
+        self.doc_rows = [by_doc[name] for name in self.doc_names]
+        
+        centroids, owners, doc_sums = [], [], []
+        for doc_id, rows in enumerate(self.doc_rows):
+            vectors = np.asarray(index.full[np.sort(rows)], dtype=np.float32)
+            n_centroids = min(max_centroids, max(1, len(rows) // chunks_per_centroid))
+            doc_centroids = vectors.mean(axis=0, keepdims=True) if n_centroids == 1 else _kmeans(vectors, n_centroids)
+            centroids.append(doc_centroids)
+            owners.extend([doc_id] * len(doc_centroids))
+            doc_sums.append(vectors.sum(axis=0))
+        dim = index.full.shape[1]
+        self.centroids = np.vstack(centroids).astype(np.float32) if centroids else np.empty((0, dim), np.float32)
+        self.owners = np.asarray(owners, dtype=np.int64)
+        
+        # Categoria: centroide dos seus chunks e linhas (em self.centroids) dos seus documentos
+        by_category: Dict[str, List[int]] = {}
+        for doc_id, rows in enumerate(self.doc_rows):
+            by_category.setdefault(str(index.metadatas[rows[0]].get(category_key, "")), []).append(doc_id)
+        self.category_names = sorted(by_category)
+        self.category_centroids = np.asarray([
+            np.sum([doc_sums[d] for d in by_category[name]], axis=0)
+            / sum(len(self.doc_rows[d]) for d in by_category[name])
+            for name in self.category_names
+        ], dtype=np.float32).reshape(len(self.category_names), dim)
+        self.category_centroid_rows = [np.flatnonzero(np.isin(self.owners, by_category[name]))
+                                       for name in self.category_names]
+    
+    def memory_bytes(self) -> int:
+        return self.centroids.nbytes + self.category_centroids.nbytes + self.owners.nbytes
+    
+    def search(self, query, k: int = 3, probe: int = 8, probe_categories: int = 0):
+        """(linhas, distâncias L2², info) — info traz documentos e linhas pontuadas"""
+        query = np.asarray(query, dtype=np.float32)
+        
+        centroid_rows = None
+        if probe_categories and probe_categories < len(self.category_names):
+            category_distances = ((self.category_centroids - query) ** 2).sum(axis=1)
+            chosen = np.argsort(category_distances)[:probe_categories]
+            centroid_rows = np.concatenate([self.category_centroid_rows[c] for c in chosen])
+        
+        centroids = self.centroids if centroid_rows is None else self.centroids[centroid_rows]
+        owners = self.owners if centroid_rows is None else self.owners[centroid_rows]
+        distances = ((centroids - query) ** 2).sum(axis=1)
+        
+        # Distância do documento = a do seu centroide mais próximo
+        docs = []
+        for position in np.argsort(distances):
+            doc_id = owners[position]
+            if doc_id not in docs:
+                docs.append(doc_id)
+                if len(docs) == probe:
+                    break
+        
+        rows = np.concatenate([self.doc_rows[d] for d in docs]) if docs else np.empty(0, dtype=np.int64)
+        found, found_distances = self.index.search(query, k=k, rows=rows)
+        info = {"docs_probed": len(docs), "rows_scanned": int(len(rows)), "total_rows": len(self.index)}
+        return found, found_distances, info
@@ -0,0 +1,119 @@
+"""
+Vector Shards - Índice vetorial particionado entre processos locais
+
+As linhas do VectorIndex persistido são divididas em N fatias contíguas de
+tamanho equilibrado; cada shard é um processo que carrega só a sua fatia
+(vetores lidos do mesmo full.npy/codes.npz, via mmap) e responde buscas.
+Uma query é enviada a todos os shards antes de esperar qualquer resposta
+(scatter) e os top-k de cada um, já ordenados, são intercalados com um heap
+(gather). O transporte é local: cada shard fala por um Pipe duplex, que no
+Linux é um par de sockets Unix.
+
+Os limites das fatias são recalculados a cada rebuild do índice
+(rebalanceamento): os shards antigos são encerrados e novos são iniciados
+sobre o índice novo.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import threading
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex
+
+# spawn: os shards não herdam threads/conexões do processo da API (Chroma, uvicorn)
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def shard_bounds(n_rows: int, n_shards: int) -> List[Tuple[int, int]]:
+    """Fatias [start, end) contíguas, com tamanhos diferindo em no máximo 1"""
+    n_shards = max(1, min(n_shards, n_rows))
+    size, extra = divmod(n_rows, n_shards)
+    bounds, start = [], 0
+    for shard in range(n_shards):
+        end = start + size + (1 if shard < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _serve_shard(conn, directory: str, start: int, end: int, rescore: int):
+    """Loop do processo shard: recebe (query, k), devolve (linhas globais, distâncias)"""
+    index = VectorIndex.load(directory, row_range=(start, end))
+    index.rescore = rescore
+    conn.send(("ready", len(index)))
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        query, k = message
+        rows, distances = index.search(query, k=k)
+        conn.send((rows + start, distances))
+    conn.close()
+
+
+class ShardedIndex:
+    """Busca scatter-gather sobre shards de um VectorIndex persistido em `directory`"""
+    
+    def __init__(self, directory, n_rows: int, n_shards: int, rescore: int = 4):
+        self.directory = Path(directory)
+        self.bounds = shard_bounds(n_rows, n_shards)
+        self.connections = []
+        self.processes = []
+        # Um Pipe por shard: buscas concorrentes (threads da API) são serializadas
+        self._lock = threading.Lock()
+        
+        for start, end in self.bounds:
+            parent_conn, child_conn = _CONTEXT.Pipe(duplex=True)
+            process = _CONTEXT.Process(
+                target=_serve_shard,
+                args=(child_conn, str(self.directory), start, end, rescore),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        
+        for conn, (start, end) in zip(self.connections, self.bounds):
+            try:
+                conn.recv()
+            except EOFError:
+                self.close()
+                raise RuntimeError(f"Shard [{start}, {end}) falhou ao iniciar")
+    
+    def __len__(self) -> int:
+        return len(self.bounds)
+    
+    def search(self, query, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """(linhas globais, distâncias L2²) dos k vizinhos mais próximos entre todos os shards"""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            # Scatter: todos os shards trabalham em paralelo
+            for conn in self.connections:
+                conn.send((query, k))
+            partials = [conn.recv() for conn in self.connections]
+        
+        # Gather: cada parcial já vem ordenada por distância
+        merged = heapq.merge(*(zip(distances.tolist(), rows.tolist()) for rows, distances in partials))
+        top = list(itertools.islice(merged, k))
+        return (np.asarray([row for _, row in top], dtype=np.int64),
+                np.asarray([distance for distance, _ in top], dtype=np.float32))
+    
+    def close(self):
+        with self._lock:
+            for conn in self.connections:
+                try:
+                    conn.send(None)
+                    conn.close()
+                except (BrokenPipeError, OSError):
+                    pass
+            for process in self.processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self.connections, self.processes = [], []
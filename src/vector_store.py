@@ -2,60 +2,590 @@
 Vector Store - ChromaDB para armazenamento e busca
 """
 
+import json
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 from langchain_core.documents import Document
 from langchain_community.vectorstores import Chroma
 
+from chunk_dedup import ALIAS_KEY, ChunkDeduplicator, alias_sources, print_dedup_report
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from vector_index import CentroidRouter, MetadataFilter, VectorIndex
+from vector_shards import ShardedIndex
+
+
+LEXICAL_INDEX_FILE = "bm25_index.pkl"
+DEDUP_REPORT_FILE = "dedup_report.json"
+EMBEDDER_FILE = "embedder.json"
+VECTOR_INDEX_DIR = "vector_index"
+
+
+def select_adaptive_k(
+    scores: Sequence[float],
+    min_k: int = 1,
+    max_k: int = 8,
+    score_threshold: float = 0.0,
+    min_gap: float = 0.05
+) -> Tuple[int, str]:
+    """
+    Escolhe quantos resultados manter a partir das distâncias (crescentes)
+    
+    Retorna (k, motivo do corte). O corte acontece no primeiro score acima
+    de `score_threshold` (se > 0) ou, senão, no maior salto entre scores
+    consecutivos, desde que o salto seja >= `min_gap`.
+    """
+    candidates = list(scores[:max_k])
+    if not candidates:
+        return 0, "no_results"
+    
+    min_k = max(1, min(min_k, len(candidates)))
+    
+    # 1. Limiar absoluto de distância
+    if score_threshold > 0:
+        within = 0
+        for score in candidates:
+            if score > score_threshold:
+                break
+            within += 1
+        if within < len(candidates):
+            if within < min_k:
+                return min_k, "min_k"
+            return within, "score_threshold"
+    
+    # 2. Maior salto entre scores consecutivos (respeitando min_k)
+    best_cut, best_gap = 0, 0.0
+    for i in range(min_k, len(candidates)):
+        gap = candidates[i] - candidates[i - 1]
+        if gap > best_gap:
+            best_cut, best_gap = i, gap
+    if best_cut and best_gap >= min_gap:
+        return best_cut, "largest_gap"
+    
+    if len(candidates) < max_k:
+        return len(candidates), "exhausted"
+    return len(candidates), "max_k"
+
+
+HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+def hnsw_metadata(space: str = "l2", m: int = 16, construction_ef: int = 100, search_ef: int = 10) -> dict:
+    """Metadata de coleção do Chroma com os parâmetros do índice HNSW (padrões = os do Chroma)"""
+    if space not in HNSW_SPACES:
+        raise ValueError(f"space deve ser um de {HNSW_SPACES}, recebido '{space}'")
+    return {"hnsw:space": space, "hnsw:M": m, "hnsw:construction_ef": construction_ef,
+            "hnsw:search_ef": search_ef}
+
+
+def select_mmr(query_vector, candidate_vectors, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """
+    Maximal Marginal Relevance: posições de k candidatos relevantes e pouco redundantes
+    
+    As similaridades de cosseno query × candidato e candidato × candidato são
+    calculadas de uma vez (matriz C×C); a seleção gulosa só mantém, para cada
+    candidato, a maior similaridade com os já escolhidos. `lambda_mult` = 1
+    é o ranking por relevância, 0 é diversidade máxima.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    k = min(k, len(candidates))
+    if k <= 0:
+        return []
+    
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    unit = candidates / np.where(norms == 0, 1.0, norms)
+    query = np.asarray(query_vector, dtype=np.float32)
+    relevance = unit @ (query / (np.linalg.norm(query) or 1.0))
+    similarity = unit @ unit.T
+    
+    first = int(np.argmax(relevance))
+    selected = [first]
+    redundancy = similarity[first].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[first] = False
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
+
 
 class VectorStoreService:
-    """Gerencia o ChromaDB vector store"""
+    """
+    Gerencia o ChromaDB vector store
     
-    def __init__(self, persist_directory: str = "data/chroma_db"):
+    Com precision float16/int8 ou dims (truncate/pca), a busca vetorial usa um
+    VectorIndex compacto em memória montado a partir da coleção, com rescoring
+    exato da shortlist; o Chroma continua sendo o armazenamento. Com
+    hierarchical, a busca passa antes pelos centroides de categorias e
+    documentos (CentroidRouter) e só pontua os chunks dos documentos escolhidos.
+    Com shards > 1, o índice é particionado entre processos locais e cada
+    busca é distribuída a todos (ShardedIndex); a busca hierárquica, quando
+    ligada, tem precedência.
+    
+    `hnsw` (ver hnsw_metadata) configura o índice HNSW do Chroma; os
+    parâmetros são fixados quando a coleção é criada, então mudá-los exige
+    reconstruir o vector store. O índice em memória e o k adaptativo medem
+    L2², então só aceitam o espaço l2; cosine/ip ficam com a busca do Chroma.
+    
+    Filtros por categoria/fonte: com o índice em memória, usam listas de
+    linhas pré-computadas (MetadataFilter) e só os vetores do subconjunto são
+    pontuados; sem ele, viram um `where` na consulta do Chroma, cujo custo
+    cresce com o subconjunto (ver bench_filtered_search.py --chroma).
+    """
+    
+    def __init__(self, persist_directory: str = "data/chroma_db", precision: str = "float32",
+                 dims: Optional[int] = None, projection: str = "truncate", rescore: int = 4,
+                 hierarchical: bool = False, probe_docs: int = 8, probe_categories: int = 0,
+                 shards: int = 0, hnsw: Optional[dict] = None):
         self.persist_dir = Path(persist_directory)
         self.persist_dir.mkdir(parents=True, exist_ok=True)
         self.vectorstore = None
+        self.lexical_index = None
+        self.vector_index = None
+        self.router = None
+        self.sharded = None
+        self._filters = {}  # nome -> (índice de origem, MetadataFilter)
+        self.index_options = {"precision": precision, "dims": dims or None, "projection": projection,
+                              "rescore": rescore}
+        self.hierarchical = hierarchical
+        self.probe_docs = probe_docs
+        self.probe_categories = probe_categories
+        self.shards = shards
+        self.collection_metadata = hnsw or None
+        self.space = (hnsw or {}).get("hnsw:space", "l2")
+        if self.space != "l2" and self.uses_vector_index:
+            raise ValueError(f"HNSW_SPACE='{self.space}' não combina com o índice vetorial em memória "
+                             f"(precision/dims, hierarchical, shards), que mede L2²: use l2")
+    
+    @property
+    def compact(self) -> bool:
+        return self.index_options["precision"] != "float32" or bool(self.index_options["dims"])
+    
+    @property
+    def uses_vector_index(self) -> bool:
+        """Busca vetorial pelo índice em memória em vez do Chroma"""
+        return self.compact or self.hierarchical or self.shards > 1
     
-    def create_vectorstore(self, chunks: List[Document], embeddings) -> Chroma:
-        """Cria novo vector store a partir dos chunks"""
+    def _reset_indexes(self):
+        """Descarta os índices derivados da coleção anterior (reconstruídos a partir da nova)"""
+        self.close()
+        self.vector_index = None
+        self.router = None
+        self._filters = {}
+    
+    def _save_dedup_report(self, dedup: ChunkDeduplicator):
+        """Relatório do dedup (chamadas de embedding economizadas, redução do índice)"""
+        # Dimensão lida de um vetor já gravado (sem nova chamada de embedding)
+        stored = self.vectorstore.get(limit=1, include=["embeddings"])["embeddings"]
+        dim = len(stored[0]) if stored else None
+        report = dedup.report(embedding_dim=dim)
+        with open(self.persist_dir / DEDUP_REPORT_FILE, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print_dedup_report(report)
+    
+    def _save_embedder(self, embeddings):
+        """Registra qual embedder construiu o índice (a versão define o espaço vetorial)"""
+        version = getattr(embeddings, "version", type(embeddings).__name__)
+        with open(self.persist_dir / EMBEDDER_FILE, "w", encoding="utf-8") as f:
+            json.dump({"version": version}, f)
+    
+    def stored_embedder(self) -> Optional[str]:
+        """Versão do embedder que construiu o índice persistido (None se não registrada)"""
+        try:
+            with open(self.persist_dir / EMBEDDER_FILE, encoding="utf-8") as f:
+                return json.load(f).get("version")
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def create_vectorstore(self, chunks: List[Document], embeddings,
+                           dedup: Optional[ChunkDeduplicator] = None) -> Chroma:
+        """Cria novo vector store a partir dos chunks (sem duplicatas, se dedup for passado)"""
+        if dedup:
+            chunks = dedup.filter(chunks)
         print(f"⏳ Creating vector store with {len(chunks)} chunks...")
+        self._reset_indexes()
         
         self.vectorstore = Chroma.from_documents(
             documents=chunks,
             embedding=embeddings,
-            persist_directory=str(self.persist_dir)
+            persist_directory=str(self.persist_dir),
+            collection_metadata=self.collection_metadata
         )
+        self._save_embedder(embeddings)
+        self._build_lexical_index(chunks)
+        if dedup:
+            self._save_dedup_report(dedup)
+        if self.uses_vector_index:
+            self.build_vector_index()
         
         print(f"✅ Vector store created and persisted")
         return self.vectorstore
     
+    def create_vectorstore_from_batches(self, batches: Iterable[List[Document]], embeddings,
+                                        dedup: Optional[ChunkDeduplicator] = None) -> Chroma:
+        """
+        Cria o vector store adicionando lotes de chunks à medida que são gerados
+        
+        Com dedup, cada lote é filtrado antes do embedding; canônicos de lotes
+        já gravados que ganharam aliases depois são atualizados no fim.
+        """
+        print("⏳ Creating vector store from streamed chunks...")
+        self._reset_indexes()
+        
+        self.vectorstore = Chroma(
+            persist_directory=str(self.persist_dir),
+            embedding_function=embeddings,
+            collection_metadata=self.collection_metadata
+        )
+        self.lexical_index = BM25Index()
+        
+        total = 0
+        for batch in batches:
+            if dedup:
+                batch = dedup.filter(batch)
+                if not batch:
+                    continue
+            # IDs pela posição, para poder atualizar o metadata depois
+            ids = [f"chunk-{total + i}" for i in range(len(batch))]
+            self.vectorstore.add_documents(batch, ids=ids)
+            self.lexical_index.add_documents(batch)
+            total += len(batch)
+        
+        if dedup:
+            if dedup.late_updates:
+                positions = sorted(dedup.late_updates)
+                self.vectorstore._collection.update(
+                    ids=[f"chunk-{p}" for p in positions],
+                    metadatas=[dedup.late_updates[p] for p in positions]
+                )
+                for p in positions:
+                    self.lexical_index.metadatas[p] = dict(dedup.late_updates[p])
+            self._save_dedup_report(dedup)
+        
+        self._save_embedder(embeddings)
+        self.lexical_index.save(self.persist_dir / LEXICAL_INDEX_FILE)
+        print(f"✅ BM25 index: {len(self.lexical_index.vocab)} terms")
+        if self.uses_vector_index:
+            self.build_vector_index()
+        print(f"✅ Vector store created and persisted ({total} chunks)")
+        return self.vectorstore
+    
     def load_vectorstore(self, embeddings) -> Chroma:
         """Carrega vector store existente"""
         print(f"⏳ Loading vector store from {self.persist_dir}...")
         
+        # Sem collection_metadata: o Chroma sobrescreveria a metadata da coleção
+        # existente, mas o índice HNSW continuaria com os parâmetros da criação
         self.vectorstore = Chroma(
             persist_directory=str(self.persist_dir),
             embedding_function=embeddings
         )
+        self._warn_hnsw_mismatch()
+        self._load_lexical_index()
+        if self.uses_vector_index:
+            self._load_vector_index()
         
         print(f"✅ Vector store loaded")
         return self.vectorstore
     
-    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
-        """Busca semântica por documentos similares"""
+    def _warn_hnsw_mismatch(self):
+        """Avisa se a coleção existente foi criada com outros parâmetros HNSW"""
+        if not self.collection_metadata:
+            return
+        # Chaves ausentes na coleção valem os padrões do Chroma
+        current = {**hnsw_metadata(), **(self.vectorstore._collection.metadata or {})}
+        differing = {key: current.get(key) for key, value in self.collection_metadata.items()
+                     if current.get(key) != value}
+        if differing:
+            print(f"⚠️ HNSW da coleção difere da configuração {differing}; reconstrua o índice para aplicar")
+    
+    def build_vector_index(self) -> VectorIndex:
+        """Monta (e persiste) o índice vetorial em memória a partir da coleção do Chroma"""
+        data = self.vectorstore.get(include=["embeddings", "documents", "metadatas"])
+        self.vector_index = VectorIndex.build(
+            data["embeddings"], data["ids"], data["documents"],
+            [metadata or {} for metadata in data["metadatas"]],
+            **self.index_options
+        )
+        self.vector_index.save(self.persist_dir / VECTOR_INDEX_DIR)
+        mb = self.vector_index.memory_bytes() / 1e6
+        print(f"✅ Vector index: {len(self.vector_index)} vectors, {mb:.1f} MB ({self.vector_index.options})")
+        self._build_router()
+        self._start_shards()
+        return self.vector_index
+    
+    def _build_router(self):
+        if self.hierarchical:
+            self.router = CentroidRouter(self.vector_index)
+            print(f"✅ Centroid router: {len(self.router.doc_rows)} documents, "
+                  f"{len(self.router.centroids)} centroids, {len(self.router.category_names)} categories")
+    
+    def _start_shards(self):
+        """(Re)inicia os shards sobre o índice persistido, com as fatias rebalanceadas"""
+        if self.sharded:
+            self.sharded.close()
+            self.sharded = None
+        if self.shards > 1 and not self.router:
+            self.sharded = ShardedIndex(self.persist_dir / VECTOR_INDEX_DIR, len(self.vector_index),
+                                        self.shards, rescore=self.index_options["rescore"])
+            sizes = [end - start for start, end in self.sharded.bounds]
+            print(f"✅ Vector shards: {len(self.sharded)} processes, {min(sizes)}-{max(sizes)} vectors each")
+    
+    def close(self):
+        """Encerra os processos shard, se houver"""
+        if self.sharded:
+            self.sharded.close()
+            self.sharded = None
+    
+    def _load_vector_index(self):
+        """Carrega o índice persistido se bater com a coleção e as opções; senão reconstrói"""
+        index_dir = self.persist_dir / VECTOR_INDEX_DIR
+        try:
+            index = VectorIndex.load(index_dir)
+            options = {key: value for key, value in self.index_options.items() if key != "rescore"}
+            if index.options == options and len(index) == self.vectorstore._collection.count():
+                index.rescore = self.index_options["rescore"]
+                self.vector_index = index
+                self._build_router()
+                self._start_shards()
+                return
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        self.build_vector_index()
+    
+    def _metadata_filter(self, name: str, index) -> MetadataFilter:
+        """Listas de linhas por categoria/fonte de um índice (refeitas quando o índice muda)"""
+        cached = self._filters.get(name)
+        if not cached or cached[0] is not index:
+            cached = (index, MetadataFilter(index.metadatas, aliases=alias_sources))
+            self._filters[name] = cached
+        return cached[1]
+    
+    def filter_rows(self, category: Optional[str] = None, source: Optional[str] = None) -> Optional[np.ndarray]:
+        """Linhas do índice vetorial em memória que passam nos filtros (None = sem filtro)"""
+        if category is None and source is None:
+            return None
+        return self._metadata_filter("vector", self.vector_index).rows(category, source)
+    
+    def chroma_where(self, category: Optional[str] = None, source: Optional[str] = None) -> Optional[dict]:
+        """
+        Filtro `where` do Chroma equivalente ao MetadataFilter (None = sem filtro)
+        
+        Uma fonte também casa com os canônicos que a têm entre as fontes das
+        duplicatas descartadas: os valores de ALIAS_KEY que a contêm vêm do
+        metadata do índice BM25, que espelha a coleção.
+        """
+        clauses = []
+        if category is not None:
+            clauses.append({"category": category})
+        if source is not None:
+            aliased = sorted({metadata[ALIAS_KEY] for metadata in self.lexical_index.metadatas
+                              if source in alias_sources(metadata)})
+            if aliased:
+                clauses.append({"$or": [{"source": source}, {ALIAS_KEY: {"$in": aliased}}]})
+            else:
+                clauses.append({"source": source})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    
+    def _index_rows(self, query_vector, k: int, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(linhas, distâncias L2²) no índice em memória, opcionalmente só em `rows`"""
+        if rows is not None:
+            return self.vector_index.search(query_vector, k=k, rows=rows)
+        if self.router:
+            found, distances, _ = self.router.search(query_vector, k=k, probe=self.probe_docs,
+                                                     probe_categories=self.probe_categories)
+            return found, distances
+        if self.sharded:
+            return self.sharded.search(query_vector, k=k)
+        return self.vector_index.search(query_vector, k=k)
+    
+    def _index_search(self, query: str, k: int, rows: Optional[np.ndarray] = None) -> List[Tuple[Document, float]]:
+        """Busca no índice vetorial em memória (mesma métrica do Chroma: L2²), opcionalmente só em `rows`"""
+        query_vector = self.vectorstore.embeddings.embed_query(query)
+        found, distances = self._index_rows(query_vector, k, rows)
+        return [(self._row_document(row), float(distance)) for row, distance in zip(found, distances)]
+    
+    def _row_document(self, row: int) -> Document:
+        return Document(page_content=self.vector_index.texts[row], metadata=dict(self.vector_index.metadatas[row]))
+    
+    def _build_lexical_index(self, chunks: List[Document]):
+        """Constrói e persiste o índice BM25 a partir dos mesmos chunks"""
+        self.lexical_index = BM25Index.from_documents(chunks)
+        self.lexical_index.save(self.persist_dir / LEXICAL_INDEX_FILE)
+        print(f"✅ BM25 index: {len(self.lexical_index.vocab)} terms")
+    
+    def _load_lexical_index(self):
+        """Carrega o índice BM25 persistido (ou reconstrói a partir da coleção)"""
+        index_path = self.persist_dir / LEXICAL_INDEX_FILE
+        if index_path.exists():
+            self.lexical_index = BM25Index.load(index_path)
+            return
+        
+        data = self.vectorstore.get(include=["documents", "metadatas"])
+        chunks = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(data["documents"], data["metadatas"])
+        ]
+        self._build_lexical_index(chunks)
+    
+    def similarity_search(self, query: str, k: int = 3, category: Optional[str] = None,
+                          source: Optional[str] = None) -> List[Document]:
+        """Busca semântica por documentos similares (opcionalmente de uma categoria/fonte)"""
         if not self.vectorstore:
             raise ValueError("Vector store not initialized")
         
-        results = self.vectorstore.similarity_search(query, k=k)
+        if self.uses_vector_index:
+            return [doc for doc, _ in self._index_search(query, k, self.filter_rows(category, source))]
+        
+        results = self.vectorstore.similarity_search(query, k=k, filter=self.chroma_where(category, source))
         return results
     
-    def similarity_search_with_score(self, query: str, k: int = 3):
-        """Busca com scores de similaridade"""
+    def similarity_search_with_score(self, query: str, k: int = 3, category: Optional[str] = None,
+                                     source: Optional[str] = None):
+        """Busca com scores de similaridade (opcionalmente de uma categoria/fonte)"""
         if not self.vectorstore:
             raise ValueError("Vector store not initialized")
         
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        if self.uses_vector_index:
+            return self._index_search(query, k, self.filter_rows(category, source))
+        
+        results = self.vectorstore.similarity_search_with_score(query, k=k,
+                                                                filter=self.chroma_where(category, source))
         return results
+    
+    def adaptive_search(
+        self,
+        query: str,
+        min_k: int = 1,
+        max_k: int = 8,
+        fetch_k: int = 10,
+        score_threshold: float = 0.0,
+        min_gap: float = 0.05,
+        category: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Tuple[List[Tuple[Document, float]], dict]:
+        """Busca com k adaptativo: over-fetch e corte pela distribuição dos scores"""
+        if self.space != "l2":
+            # score_threshold e min_gap são distâncias L2²
+            raise ValueError(f"k adaptativo exige HNSW_SPACE=l2 (coleção em '{self.space}')")
+        results = self.similarity_search_with_score(query, k=max(fetch_k, max_k), category=category, source=source)
+        
+        k, reason = select_adaptive_k(
+            [score for _, score in results],
+            min_k=min_k,
+            max_k=max_k,
+            score_threshold=score_threshold,
+            min_gap=min_gap
+        )
+        
+        info = {"k": k, "cutoff_reason": reason, "fetched": len(results)}
+        return results[:k], info
+    
+    def mmr_search(
+        self,
+        query: str,
+        k: int = 3,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        category: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Tuple[List[Document], dict]:
+        """Busca diversificada: over-fetch de `fetch_k` candidatos (com vetores) e seleção por MMR"""
+        if not self.vectorstore:
+            raise ValueError("Vector store not initialized")
+        
+        query_vector = self.vectorstore.embeddings.embed_query(query)
+        if self.uses_vector_index:
+            found, _ = self._index_rows(query_vector, fetch_k, self.filter_rows(category, source))
+            vectors = self.vector_index.full[found]
+            documents = [self._row_document(row) for row in found]
+        else:
+            # Uma única consulta ao Chroma já traz os vetores dos candidatos
+            data = self.vectorstore._collection.query(
+                query_embeddings=[query_vector], n_results=fetch_k,
+                where=self.chroma_where(category, source),
+                include=["documents", "metadatas", "embeddings"]
+            )
+            vectors = data["embeddings"][0]
+            documents = [Document(page_content=text, metadata=metadata or {})
+                         for text, metadata in zip(data["documents"][0], data["metadatas"][0])]
+        
+        selected = select_mmr(query_vector, vectors, k, lambda_mult=lambda_mult)
+        return [documents[i] for i in selected], {"k": len(selected), "cutoff_reason": "mmr",
+                                                  "fetched": len(documents)}
+    
+    def lexical_search(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Busca apenas lexical (BM25), sem chamada de embedding"""
+        if not self.lexical_index:
+            raise ValueError("Lexical index not initialized")
+        
+        return [
+            (self.lexical_index.get_document(doc_id), score)
+            for doc_id, score in self.lexical_index.search(query, k=k)
+        ]
+    
+    def _lexical_is_confident(self, query: str, hits, min_score: float, ratio: float) -> bool:
+        """BM25 é confiável se o top1 cobre todos os termos, tem score alto e se destaca"""
+        if not hits or hits[0][1] < min_score:
+            return False
+        if len(hits) > 1 and hits[0][1] < ratio * hits[1][1]:
+            return False
+        return self.lexical_index.coverage(query, hits[0][0]) == 1.0
+    
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 3,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        lexical_shortcut: bool = True,
+        lexical_min_score: float = 10.0,
+        lexical_ratio: float = 1.5,
+        category: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Tuple[List[Document], dict]:
+        """Busca híbrida: BM25 + densa fundidas por Reciprocal Rank Fusion"""
+        if not self.vectorstore or not self.lexical_index:
+            raise ValueError("Vector store not initialized")
+        
+        doc_ids = None
+        if category is not None or source is not None:
+            doc_ids = set(self._metadata_filter("lexical", self.lexical_index).rows(category, source).tolist())
+        lexical_hits = self.lexical_index.search(query, k=fetch_k, doc_ids=doc_ids)
+        
+        # Query de palavra-chave com resultado claro: nem calcula o embedding
+        if lexical_shortcut and self._lexical_is_confident(
+            query, lexical_hits, lexical_min_score, lexical_ratio
+        ):
+            documents = [self.lexical_index.get_document(i) for i, _ in lexical_hits[:k]]
+            return documents, {"k": len(documents), "cutoff_reason": "lexical_confident",
+                               "embedding_skipped": True}
+        
+        # Chunks identificados pelo conteúdo, comum aos dois índices
+        by_content = {}
+        dense_ranking = []
+        for doc in self.similarity_search(query, k=fetch_k, category=category, source=source):
+            by_content.setdefault(doc.page_content, doc)
+            dense_ranking.append(doc.page_content)
+        
+        lexical_ranking = []
+        for doc_id, _ in lexical_hits:
+            text = self.lexical_index.texts[doc_id]
+            if text not in by_content:
+                by_content[text] = self.lexical_index.get_document(doc_id)
+            lexical_ranking.append(text)
+        
+        fused = reciprocal_rank_fusion([dense_ranking, lexical_ranking], k=rrf_k)[:k]
+        documents = [by_content[text] for text, _ in fused]
+        return documents, {"k": len(documents), "cutoff_reason": "rrf",
+                           "embedding_skipped": False}
 
 
 if __name__ == "__main__":